@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,11 +49,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -139,4 +144,110 @@ AUTH_USER_MODEL = 'core.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'component.pagination.IdCursorPagination',
+    'PAGE_SIZE': 100,
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
+
+# MessagePack is negotiated with Accept / Content-Type: application/msgpack
+# when msgpack is installed.
+
+if find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].insert(
+        1, 'core.renderers.MessagePackRenderer',
+    )
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].insert(
+        1, 'core.parsers.MessagePackParser',
+    )
+
+# API tokens expire TOKEN_EXPIRY after they are issued. Token lookups are
+# cached per process, so revoked tokens keep working in other worker
+# processes for up to TOKEN_CACHE_TIMEOUT seconds.
+
+TOKEN_EXPIRY = timedelta(days=int(os.environ.get('TOKEN_EXPIRY_DAYS', 30)))
+
+TOKEN_CACHE_TIMEOUT = int(os.environ.get('TOKEN_CACHE_TIMEOUT', 60))
+
+TOKEN_CACHE_SIZE = 10_000
+
+# Per-route request metrics, served to Prometheus at /api/metrics/
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+# Staff profile single requests by sending the header "X-Profile: 1".
+# Profiles are written to PROFILE_DIR, which the app user must be able to
+# write to, and listed in the admin.
+
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '1') == '1'
+
+PROFILE_HEADER = 'X-Profile'
+
+PROFILE_DIR = os.environ.get(
+    'PROFILE_DIR',
+    Path(tempfile.gettempdir()) / 'wms-profiles',
+)
+
+# Cache of component list, detail and subtree responses per user,
+# invalidated by signals on components and mass properties. The version
+# of each user's data is kept in the same cache, so every worker must see
+# the same one: the cache is off by default with the per-process
+# LocMemCache, and on with a shared backend, e.g. FileBasedCache for the
+# workers of one host or a Redis or memcached server for several hosts.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': os.environ.get(
+            'RESPONSE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache',
+        ),
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION', 'responses'),
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(
+                os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1000)
+            ),
+        },
+    },
+}
+
+RESPONSE_CACHE = 'responses'
+
+RESPONSE_CACHE_SHARED = not CACHES[RESPONSE_CACHE]['BACKEND'].endswith(
+    '.LocMemCache',
+)
+
+RESPONSE_CACHE_ENABLED = os.environ.get(
+    'RESPONSE_CACHE_ENABLED',
+    '1' if RESPONSE_CACHE_SHARED else '0',
+) == '1'
+
+# Largest page size clients may request with ?page_size=
+
+MAX_PAGE_SIZE = 1000
+
+# Rows fetched per query when streaming whole lists with ?stream=true
+
+STREAM_CHUNK_SIZE = 500
+
+# Upper bound of the ?limit= of a component search
+
+SEARCH_MAX_RESULTS = 200
+
+# Monte Carlo analysis of mass and CoG uncertainty
+
+MONTE_CARLO_MAX_SAMPLES = 1_000_000
+
+MONTE_CARLO_MAX_WORKERS = int(
+    os.environ.get('MONTE_CARLO_MAX_WORKERS', os.cpu_count() or 1)
+)
@@ -21,6 +21,8 @@ from drf_spectacular.views import (     # type: ignore
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
@@ -32,4 +34,5 @@ urlpatterns = [
     ),
     path('api/user/', include('user.urls')),
     path('api/component/', include('component.urls')),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
 ]
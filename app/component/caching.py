@@ -0,0 +1,142 @@
+"""
+Cache of serialized component responses, and their ETags.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils.http import parse_etags, quote_etag
+
+from rest_framework import status                # type: ignore
+from rest_framework.response import Response    # type: ignore
+
+from core.caching import get_cache, get_version, response_key
+from core.models import MassProperties
+
+
+def cache_response(handler):
+    """Serve a view action from the cache of the requesting user.
+
+    Successful responses are cached by their absolute URL, so query
+    parameters and the host of pagination links are part of the key.
+    Streamed responses are never cached.
+    """
+    @wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return handler(view, request, *args, **kwargs)
+
+        cache = get_cache()
+        key = response_key(request.user.id, request.build_absolute_uri())
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'hit'
+            return response
+
+        response = handler(view, request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(key, response.data)
+        response['X-Cache'] = 'miss'
+
+        return response
+
+    return wrapper
+
+
+def components_etag(queryset, representation, mass_properties=True):
+    """Return a strong ETag for components and their mass properties.
+
+    The ETag is derived from the number, highest id and revisions of the
+    components and, unless `mass_properties` is false, of their mass
+    property links, so any insert, update, delete or relink changes it,
+    without serializing anything. Return None when the queryset is empty.
+    """
+    queryset = queryset.prefetch_related(None).order_by()
+    components = queryset.aggregate(
+        count=Count('id'),
+        last_id=Max('id'),
+        revisions=Sum('revision'),
+    )
+    if not components['count']:
+        return None
+
+    links = {}
+    if mass_properties:
+        links = MassProperties.objects.filter(
+            component__in=queryset.values('id'),
+        ).aggregate(
+            count=Count('id'),
+            revisions=Sum('revision'),
+        )
+    signature = '|'.join(map(str, [
+        representation,
+        *components.values(),
+        *links.values(),
+    ]))
+
+    return quote_etag(hashlib.md5(signature.encode()).hexdigest())
+
+
+def get_etag(view, request):
+    """Return the ETag of a view's response to a request.
+
+    With the response cache, the ETag is derived from the version of the
+    user's data, which every write bumps, and remembered under it, so a
+    miss only checks the response is not empty and repeated conditional
+    requests run no queries. Without it, the ETag is aggregated from the
+    components by components_etag(). Return None for empty responses.
+    """
+    representation = (
+        f'{request.build_absolute_uri()}|{request.accepted_media_type}'
+    )
+    queryset = view.get_etag_queryset()
+    if settings.RESPONSE_CACHE_ENABLED:
+        cache = get_cache()
+        key = f'etag:{response_key(request.user.id, representation)}'
+        etag = cache.get(key)
+        if etag is None and queryset.exists():
+            signature = f'{representation}|{get_version(request.user.id)}'
+            etag = quote_etag(hashlib.md5(signature.encode()).hexdigest())
+            cache.set(key, etag)
+        return etag
+
+    fields = view.get_selected_fields()
+    return components_etag(
+        queryset,
+        representation,
+        mass_properties=fields is None or 'mass_properties' in fields,
+    )
+
+
+def etag_response(handler):
+    """Tag a view action's responses and answer conditional GETs.
+
+    A request whose If-None-Match matches the current ETag gets an empty
+    304 response without the action running.
+    """
+    @wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        etag = get_etag(view, request)
+        if etag is None:
+            return handler(view, request, *args, **kwargs)
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            etags = {
+                tag.removeprefix('W/') for tag in parse_etags(if_none_match)
+            }
+            if etag in etags or '*' in etags:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response['ETag'] = etag
+                return response
+
+        response = handler(view, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+
+        return response
+
+    return wrapper
@@ -0,0 +1,168 @@
+"""
+Monte Carlo analysis of assembly mass and CoG uncertainty.
+
+Each mass property link of a subtree is one part. Part masses are drawn
+from triangular or PERT distributions over [LSL, LIKELY, USL] and part
+CoGs uniformly within their transformed bounds, vectorized over samples.
+Samples are split into shards that can run in a process pool, each shard
+returning its totals and fixed-edge histograms so they merge exactly.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.models import Component
+
+from component.rollup import load_links, transform_bounds
+
+
+DISTRIBUTIONS = ['triangular', 'pert']
+PERCENTILES = [1, 5, 25, 50, 75, 95, 99]
+# Upper bound of samples x parts held in memory at once by a shard.
+CHUNK_ELEMENTS = 1_000_000
+
+
+def sample_masses(rng, mass, size, distribution):
+    """Return (size, parts) mass samples for [LSL, LIKELY, USL] rows."""
+    low, mode, high = mass.T
+    width = high - low
+    u = rng.random((size, len(mass)))
+
+    if distribution == 'pert':
+        safe = np.where(width > 0, width, 1.0)
+        alpha = 1 + 4 * (mode - low) / safe
+        beta = 1 + 4 * (high - mode) / safe
+        return low + rng.beta(alpha, beta, size=u.shape) * width
+
+    split = np.divide(
+        mode - low, width, out=np.zeros_like(width), where=width > 0,
+    )
+    # Inverse CDF with a single square root per sample.
+    below = u < split
+    offset = np.where(below, u * (width * (mode - low)),
+                      (1 - u) * (width * (high - mode)))
+    np.sqrt(offset, out=offset)
+    return np.where(below, low + offset, high - offset)
+
+
+def simulate(mass, lower, upper, size, seed, distribution, edges):
+    """Run one shard of samples, returning totals and histograms.
+
+    Returns the (size,) mass totals, the (size, 3) CoGs, and histogram
+    counts over the given mass and per-axis CoG bin edges.
+    """
+    rng = np.random.default_rng(seed)
+    chunk = max(1, CHUNK_ELEMENTS // max(1, len(mass)))
+    width = upper - lower
+    totals = np.empty(size)
+    cogs = np.empty((size, 3))
+
+    for start in range(0, size, chunk):
+        stop = min(size, start + chunk)
+        masses = sample_masses(rng, mass, stop - start, distribution)
+        # Sum of m * (lower + u * width), one axis at a time.
+        moments = masses @ lower
+        for axis in range(3):
+            weights = rng.random(masses.shape)
+            weights *= masses
+            moments[:, axis] += weights @ width[:, axis]
+
+        totals[start:stop] = masses.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cogs[start:stop] = moments / totals[start:stop, None]
+
+    counts = [np.histogram(totals, bins=edges[0])[0]]
+    for axis in range(3):
+        values = cogs[np.isfinite(cogs[:, axis]), axis]
+        counts.append(np.histogram(values, bins=edges[axis + 1])[0])
+
+    return totals, cogs, counts
+
+
+def bin_edges(low, high, bins):
+    """Return the edges of `bins` equal bins over [low, high].
+
+    An empty range is widened by half a unit on both sides, so the bins
+    still hold the values sampled on it.
+    """
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+
+    return np.linspace(low, high, bins + 1)
+
+
+def describe(values, edges, counts):
+    """Return summary statistics and a histogram of sampled values."""
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return None
+
+    return {
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'percentiles': {
+            f'p{q}': float(value)
+            for q, value in zip(
+                PERCENTILES,
+                np.percentile(values, PERCENTILES),
+            )
+        },
+        'histogram': {
+            'edges': edges.tolist(),
+            'counts': counts.tolist(),
+        },
+    }
+
+
+def analyze_subtree(component, samples, distribution='triangular', bins=50,
+                    seed=None, workers=1):
+    """Return the sampled mass and CoG distribution of a subtree."""
+    subtree = Component.objects.filter(
+        user_id=component.user_id,
+        path__startswith=component.path,
+    )
+    owners, mass, cog_lsl, cog_usl, xform = load_links(subtree)
+    mass = np.sort(mass, axis=1)
+    lower, upper = transform_bounds(cog_lsl, cog_usl, xform)
+
+    if len(owners):
+        low, high = lower.min(axis=0), upper.max(axis=0)
+    else:
+        low = high = np.zeros(3)
+    edges = [bin_edges(mass[:, 0].sum(), mass[:, 2].sum(), bins)]
+    for axis in range(3):
+        edges.append(bin_edges(low[axis], high[axis], bins))
+
+    workers = max(1, min(workers, samples))
+    shards = [
+        samples // workers + (i < samples % workers) for i in range(workers)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    jobs = [
+        (mass, lower, upper, size, shard_seed, distribution, edges)
+        for size, shard_seed in zip(shards, seeds)
+    ]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(simulate, *zip(*jobs)))
+    else:
+        results = [simulate(*job) for job in jobs]
+
+    totals = np.concatenate([result[0] for result in results])
+    cogs = np.concatenate([result[1] for result in results])
+    counts = [
+        sum(result[2][i] for result in results) for i in range(4)
+    ]
+
+    return {
+        'id': component.id,
+        'parts': len(owners),
+        'samples': samples,
+        'distribution': distribution,
+        'mass': describe(totals, edges[0], counts[0]),
+        'cog': {
+            axis: describe(cogs[:, i], edges[i + 1], counts[i + 1])
+            for i, axis in enumerate('xyz')
+        },
+    }
@@ -0,0 +1,22 @@
+"""
+Pagination for the Component APIs.
+"""
+
+from django.conf import settings
+
+from rest_framework.pagination import CursorPagination      # type: ignore
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination ordered on the primary key.
+
+    Every page is fetched as `id > <cursor> ORDER BY id LIMIT <size>`, so
+    deep pages cost the same as the first one. Unlike offsets, a cursor
+    also stays stable while rows are inserted or deleted.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return settings.MAX_PAGE_SIZE
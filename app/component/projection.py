@@ -0,0 +1,65 @@
+"""
+Sparse fieldsets for the Component APIs.
+
+GET requests may select response fields with `?fields=id,name` or drop
+them with `?omit=mass_properties`. Views push the selection down into
+the SQL, so unselected columns and relations are never fetched.
+"""
+
+from rest_framework.exceptions import ValidationError       # type: ignore
+
+
+def parse_fields(query_params, available):
+    """Return the fields selected by ?fields= and ?omit=, in their order.
+
+    Returns None when neither parameter is given.
+    """
+    def names(param):
+        value = query_params.get(param, '')
+        selected = {name.strip() for name in value.split(',')} - {''}
+        unknown = selected - set(available)
+        if unknown:
+            raise ValidationError({
+                param: f'Unknown fields: {", ".join(sorted(unknown))}.',
+            })
+        return selected
+
+    if not query_params.get('fields') and not query_params.get('omit'):
+        return None
+
+    selected = names('fields') or set(available)
+    omitted = names('omit')
+
+    return [
+        field for field in available
+        if field in selected and field not in omitted
+    ]
+
+
+class SparseFieldsMixin:
+    """Trim the serializer of GET requests to the selected fields."""
+
+    def get_selected_fields(self):
+        """Return the fields selected for the response, or None for all."""
+        if self.request.method != 'GET':
+            return None
+        if not hasattr(self, '_selected_fields'):
+            available = list(self.get_serializer_class()().fields)
+            self._selected_fields = parse_fields(
+                self.request.query_params,
+                available,
+            )
+
+        return self._selected_fields
+
+    def get_serializer(self, *args, **kwargs):
+        """Return the serializer without the unselected fields."""
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_selected_fields()
+        if fields is not None:
+            target = getattr(serializer, 'child', serializer)
+            for name in list(target.fields):
+                if name not in fields:
+                    target.fields.pop(name)
+
+        return serializer
@@ -0,0 +1,92 @@
+"""
+Lean read path for component lists.
+
+Builds the same dicts as `ComponentSerializer` from `.values()` rows,
+without model instances or per-field serializer calls, and with the
+mass properties of all components loaded in one query.
+"""
+
+from core.models import Component
+
+from component.serializers import (
+    ComponentSerializer,
+    FloatArrayField,
+    MassPropertiesSerializer,
+    format_vector,
+)
+
+
+COMPONENT_FIELDS = [
+    field for field in ComponentSerializer.Meta.fields
+    if field != 'mass_properties'
+]
+MASS_PROPERTIES_FIELDS = MassPropertiesSerializer.Meta.fields
+VECTOR_FIELDS = {
+    name for name, field in MassPropertiesSerializer._declared_fields.items()
+    if isinstance(field, FloatArrayField)
+}
+
+
+def component_rows(queryset, fields=None):
+    """Return the queryset as rows of the selected component fields.
+
+    The id is always fetched, as pagination and mass properties need it.
+    """
+    columns = [
+        field for field in COMPONENT_FIELDS
+        if fields is None or field in fields
+    ]
+
+    return queryset.prefetch_related(None).values(
+        *dict.fromkeys(['id', *columns]),
+    )
+
+
+def attach_mass_properties(rows):
+    """Add the serialized mass properties to component rows, in id order."""
+    for row in rows:
+        row['mass_properties'] = []
+    by_id = {row['id']: row for row in rows}
+
+    Through = Component.mass_properties.through
+    links = Through.objects.filter(
+        component_id__in=list(by_id),
+    ).order_by('massproperties_id').values_list(
+        'component_id',
+        *[f'massproperties__{field}' for field in MASS_PROPERTIES_FIELDS],
+    )
+
+    serialized = {}
+    for component_id, *values in links:
+        mp_id = values[0]
+        if mp_id not in serialized:
+            serialized[mp_id] = {
+                field: format_vector(value) if field in VECTOR_FIELDS
+                else value
+                for field, value in zip(MASS_PROPERTIES_FIELDS, values)
+            }
+        by_id[component_id]['mass_properties'].append(serialized[mp_id])
+
+    return rows
+
+
+def serialize_rows(rows, fields=None):
+    """Return the output for component rows, limited to the given fields.
+
+    Mass properties are only queried when selected. Rows are copied when
+    their id is dropped, so a paginator can still read it.
+    """
+    if fields is None or 'mass_properties' in fields:
+        attach_mass_properties(rows)
+    if fields is not None and 'id' not in fields:
+        rows = [
+            {key: value for key, value in row.items() if key != 'id'}
+            for row in rows
+        ]
+
+    return rows
+
+
+def serialize_components(queryset, fields=None):
+    """Return the `ComponentSerializer` output of a queryset, in its order."""
+    return serialize_rows(list(component_rows(queryset, fields)), fields)
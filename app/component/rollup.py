@@ -0,0 +1,226 @@
+"""
+Mass property roll-up for component trees.
+
+The mass properties of a subtree are loaded into flat NumPy arrays and
+aggregated level by level, so the cost is a handful of vector operations
+per tree level instead of Python work per component. Results are cached
+on each component and only recomputed for components marked stale.
+
+Components carry no transform of their own, so nothing is composed along
+the tree: every `xform_matrix` must map its CoG bounds into the absolute
+frame of the assembly. `is_csys_local` only records where the CSYS was
+defined and does not change the roll-up.
+"""
+
+import numpy as np
+
+from django.db import connection, transaction
+
+from core.models import Component
+
+
+ORIGIN = [0.0, 0.0, 0.0]
+IDENTITY = np.eye(4).ravel().tolist()
+# Number of roll-up totals per component, see aggregate().
+TOTALS = 10
+# Corners of the unit box, used to pick the lower or upper bound per axis.
+CORNERS = np.array(
+    [[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)],
+    dtype=bool,
+)
+
+
+def vector(values, size, default):
+    """Return the values if they form a complete vector, else the default."""
+    return values if len(values) == size else default
+
+
+def transform_bounds(cog_lsl, cog_usl, xform):
+    """Return the bounding box of CoG boxes transformed by 4x4 matrices.
+
+    `cog_lsl` and `cog_usl` are (n, 3) arrays. `xform` is (n, 4, 4) and
+    follows the CAD convention of row vectors, so the translation is held
+    in the last row (elements 30, 31 and 32).
+    """
+    corners = np.where(CORNERS[None], cog_usl[:, None], cog_lsl[:, None])
+    points = np.einsum('nkj,nji->nki', corners, xform[:, :3, :3])
+    points += xform[:, None, 3, :3]
+
+    return points.min(axis=1), points.max(axis=1)
+
+
+def aggregate(parent_index, depth, link_index, mass, cog_lsl, cog_usl,
+              xform, initial=None):
+    """Roll mass properties up a tree, returning per-node totals.
+
+    Nodes are given by `parent_index` (-1 for roots) and `depth`. Each
+    mass property link `i` belongs to node `link_index[i]`. The result is
+    an (n, 10) array of [mass LSL, LIKELY, USL, LIKELY mass moments of the
+    lower CoG bound (x, y, z), of the upper CoG bound (x, y, z), and the
+    number of nodes]. `initial` optionally seeds the totals, e.g. with
+    cached subtrees.
+    """
+    totals = np.zeros((len(parent_index), TOTALS))
+    totals[:, 9] = 1
+    if initial is not None:
+        totals += initial
+
+    if len(link_index):
+        lower, upper = transform_bounds(cog_lsl, cog_usl, xform)
+        likely = mass[:, 1:2]
+        np.add.at(
+            totals,
+            link_index,
+            np.hstack([
+                mass,
+                likely * lower,
+                likely * upper,
+                np.zeros((len(link_index), 1)),
+            ]),
+        )
+
+    for level in range(depth.max(initial=0), 0, -1):
+        nodes = np.flatnonzero((depth == level) & (parent_index >= 0))
+        np.add.at(totals, parent_index[nodes], totals[nodes])
+
+    return totals
+
+
+def summarize(totals):
+    """Return the size, mass and CoG bounds of a row of roll-up totals."""
+    mass = totals[:3]
+    if mass[1] == 0:
+        return {
+            'components': int(totals[9]),
+            'mass': mass.tolist(),
+            'cog_lsl': None,
+            'cog_usl': None,
+        }
+
+    return {
+        'components': int(totals[9]),
+        'mass': mass.tolist(),
+        'cog_lsl': (totals[3:6] / mass[1]).tolist(),
+        'cog_usl': (totals[6:9] / mass[1]).tolist(),
+    }
+
+
+def load_links(components):
+    """Return the mass property link arrays of the given components."""
+    Through = Component.mass_properties.through
+    rows = Through.objects.filter(component__in=components).values_list(
+        'component_id',
+        'massproperties__mass',
+        'massproperties__cog_lsl',
+        'massproperties__cog_usl',
+        'massproperties__xform_matrix',
+    )
+
+    owners, mass, cog_lsl, cog_usl, xform = [], [], [], [], []
+    for component_id, mp_mass, mp_lsl, mp_usl, mp_xform in rows:
+        lower = vector(mp_lsl, 3, ORIGIN)
+        owners.append(component_id)
+        mass.append(vector(mp_mass, 3, ORIGIN))
+        cog_lsl.append(lower)
+        cog_usl.append(vector(mp_usl, 3, lower))
+        xform.append(vector(mp_xform, 16, IDENTITY))
+
+    return (
+        owners,
+        np.array(mass, dtype=float).reshape(-1, 3),
+        np.array(cog_lsl, dtype=float).reshape(-1, 3),
+        np.array(cog_usl, dtype=float).reshape(-1, 3),
+        np.array(xform, dtype=float).reshape(-1, 4, 4),
+    )
+
+
+def array_literal(values):
+    """Return the values as one Postgres array literal, "{1,2,3}".
+
+    A literal is parsed once, where a list parameter would be sent as an
+    ARRAY[...] of one constant per value, which is slow to plan.
+    """
+    return '{' + ','.join(map(repr, values)) + '}'
+
+
+def store_totals(ids, totals):
+    """Cache the roll-up totals of components and mark them up to date.
+
+    Row `i` of `totals` belongs to component `ids[i]`. All rows are
+    written by one UPDATE joined to the unnested id and total columns.
+    Neither column is indexed and the table leaves free space on its
+    pages, so the rows are mostly updated in place (HOT), without new
+    entries in every index of the table.
+    """
+    table = connection.ops.quote_name(Component._meta.db_table)
+    columns = [f'total{i}' for i in range(totals.shape[1])]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} '
+            f'SET rollup = ARRAY[{", ".join(columns)}], rollup_dirty = false '
+            f'FROM unnest(%s::bigint[]'
+            f'{", %s::float8[]" * len(columns)}) '
+            f'AS totals(id, {", ".join(columns)}) '
+            f'WHERE {table}.id = totals.id',
+            [array_literal(column) for column in (ids, *totals.T.tolist())],
+        )
+
+
+@transaction.atomic
+def rollup_subtree(component):
+    """Return the rolled-up mass and CoG bounds of a component's subtree.
+
+    Masses are summed as [LSL, LIKELY, USL]. The CoG bounds are the
+    LIKELY-mass weighted averages of each part's lower and upper CoG
+    bounds, after transforming them by the part's `xform_matrix`.
+
+    Totals are cached per component. Only the stale components of the
+    subtree are recomputed, from their own mass properties and the cached
+    totals of their up-to-date children.
+    """
+    stale = Component.objects.filter(
+        user_id=component.user_id,
+        path__startswith=component.path,
+        rollup_dirty=True,
+    )
+
+    position = {}
+    parents, depth = [], []
+    nodes = stale.select_for_update().values_list('id', 'parent', 'path')
+    for i, (pk, parent, path) in enumerate(nodes):
+        position[pk] = i
+        parents.append(parent)
+        depth.append(path.count('/'))
+
+    if component.id not in position:
+        component.refresh_from_db(fields=['rollup'])
+        return summarize(np.array(component.rollup))
+
+    parent_index = np.array(
+        [position.get(parent, -1) for parent in parents],
+        dtype=int,
+    )
+    initial = np.zeros((len(position), TOTALS))
+    children = Component.objects.filter(
+        user_id=component.user_id,
+        parent__in=stale.values('id'),
+        rollup_dirty=False,
+    ).values_list('parent', 'rollup')
+    for parent, totals in children:
+        initial[position[parent]] += totals
+
+    owners, mass, cog_lsl, cog_usl, xform = load_links(stale)
+    totals = aggregate(
+        parent_index,
+        np.array(depth, dtype=int),
+        np.array([position[pk] for pk in owners], dtype=int),
+        mass,
+        cog_lsl,
+        cog_usl,
+        xform,
+        initial=initial,
+    )
+
+    store_totals(list(position), totals)
+
+    return summarize(totals[position[component.id]])
@@ -0,0 +1,75 @@
+"""
+Full-text search over components and their mass properties.
+
+Components store the words of their name, type and description, weighted
+in that order, in the generated `search` column, and mass properties the
+words of their CSYS name; both are GIN indexed. Every word of a search
+is matched as a prefix, so `brack lh` finds "BRACKET_LH_001". Results
+are ranked by how well the component's own words match; components only
+found through a mass property come last.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Case, F, When
+
+from core.models import Component
+
+
+def search_terms(text):
+    """Return the words of a search text, lowercased.
+
+    Underscores separate words, as they do in the indexed text.
+    """
+    return re.findall(r'[^\W_]+', text.lower())
+
+
+def search_query(text):
+    """Return a query matching every word of the text as a prefix."""
+    return SearchQuery(
+        ' & '.join(f'{term}:*' for term in search_terms(text)),
+        config='simple',
+        search_type='raw',
+    )
+
+
+def ranked_matches(user, query):
+    """Return the ids of the user's components matching, best first."""
+    return Component.objects.filter(
+        user=user,
+        search=query,
+    ).annotate(
+        rank=SearchRank(F('search'), query),
+    ).order_by('-rank', 'id').values_list('id', flat=True)
+
+
+def linked_matches(user, query):
+    """Return the ids of components linked to matching mass properties."""
+    Through = Component.mass_properties.through
+    return Through.objects.filter(
+        massproperties__user=user,
+        massproperties__search=query,
+    ).order_by('component_id').values_list('component_id', flat=True)
+
+
+def search_components(user, text, limit):
+    """Return the user's best `limit` components matching a search.
+
+    The best component matches are ranked first; only when there are
+    fewer than `limit` are the components of matching mass properties
+    added. Only the chosen rows are then read, in rank order.
+    """
+    query = search_query(text)
+    ids = list(ranked_matches(user, query)[:limit])
+    if len(ids) < limit:
+        ids += linked_matches(user, query).exclude(
+            component_id__in=ids,
+        ).distinct()[:limit - len(ids)]
+
+    if not ids:
+        return Component.objects.none()
+
+    return Component.objects.filter(user=user, id__in=ids).order_by(Case(
+        *[When(id=pk, then=position) for position, pk in enumerate(ids)],
+    ))
@@ -2,13 +2,87 @@
 Serializers for Component APIs
 """
 
+import re
+
+from django.conf import settings
+
 from rest_framework import serializers       # type: ignore
 
+from core.metrics import measure
 from core.models import Component, MassProperties
 
+from component.montecarlo import DISTRIBUTIONS
+from component.search import search_terms
+
+
+NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+def format_vector(values):
+    """Return an array of numbers as a formatted string."""
+    if not values:
+        return ''
+
+    # A list of floats reprs as "[1.0, 2.5]", joined in C.
+    return repr(list(map(float, values)))
+
+
+class FloatArrayField(serializers.Field):
+    """Array of floats exchanged as a formatted string, e.g. "[x, y, z]"."""
+    default_error_messages = {
+        'invalid': 'Expected a formatted string of {size} numbers.',
+    }
+
+    def __init__(self, size, **kwargs):
+        self.size = size
+        kwargs.setdefault('required', False)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, (list, tuple)):
+            values = data
+        elif isinstance(data, str):
+            values = NUMBER_RE.findall(data)
+            if not values and not data.strip():
+                return []
+        else:
+            self.fail('invalid', size=self.size)
+
+        try:
+            values = [float(value) for value in values]
+        except (TypeError, ValueError):
+            self.fail('invalid', size=self.size)
+        if len(values) != self.size:
+            self.fail('invalid', size=self.size)
+
+        return values
+
+    def to_representation(self, value):
+        return format_vector(value)
+
+
+class MeasuredSerializerMixin:
+    """Record the serialize time of a root serializer in the metrics."""
 
-class MassPropertiesSerializer(serializers.ModelSerializer):
+    @property
+    def data(self):
+        with measure('serialize'):
+            return super().data
+
+
+class MeasuredListSerializer(MeasuredSerializerMixin,
+                             serializers.ListSerializer):
+    """List serializer recording its serialize time in the metrics."""
+
+
+class MassPropertiesSerializer(MeasuredSerializerMixin,
+                               serializers.ModelSerializer):
     """Serializer for Mass Properties object."""
+    xform_matrix = FloatArrayField(size=16)
+    position = FloatArrayField(size=3)
+    mass = FloatArrayField(size=3)
+    cog_lsl = FloatArrayField(size=3)
+    cog_usl = FloatArrayField(size=3)
 
     class Meta:
         model = MassProperties
@@ -17,9 +91,29 @@ class MassPropertiesSerializer(serializers.ModelSerializer):
             'cog_usl',
         ]
         read_only_fields = ['id']
+        list_serializer_class = MeasuredListSerializer
 
+    def validate(self, attrs):
+        """Ensure an update does not duplicate other mass properties."""
+        if self.instance is not None:
+            mp_obj = MassProperties(user=self.instance.user, **{
+                field: attrs.get(field, getattr(self.instance, field))
+                for field in MassProperties.HASHED_FIELDS
+            })
+            duplicate = MassProperties.objects.filter(
+                user=self.instance.user,
+                content_hash=mp_obj.compute_content_hash(),
+            ).exclude(id=self.instance.id)
+            if duplicate.exists():
+                raise serializers.ValidationError(
+                    'Identical mass properties already exist.'
+                )
 
-class ComponentSerializer(serializers.ModelSerializer):
+        return attrs
+
+
+class ComponentSerializer(MeasuredSerializerMixin,
+                          serializers.ModelSerializer):
     """Serializer for Component object."""
     mass_properties = MassPropertiesSerializer(many=True, required=False)
 
@@ -30,22 +124,39 @@ class ComponentSerializer(serializers.ModelSerializer):
             'skeleton', 'mass_properties',
         ]
         read_only_fields = ['id']
+        list_serializer_class = MeasuredListSerializer
+
+    def validate_parent(self, parent):
+        """Ensure a component is not moved below its own subtree."""
+        if self.instance is not None and parent is not None:
+            in_subtree = Component.objects.filter(
+                user=self.instance.user,
+                id=parent,
+                path__startswith=self.instance.path,
+            ).exists()
+            if in_subtree:
+                raise serializers.ValidationError(
+                    'A component cannot be its own ancestor.'
+                )
+
+        return parent
 
-    def _get_or_create_mass_properties(self, mass_properties, component):
+    def _get_or_create_mass_properties(self, mass_properties):
         """Handle getting or creating mass properties as needed."""
         auth_user = self.context['request'].user
-        for mp in mass_properties:
-            mp_obj, create = MassProperties.objects.get_or_create(
-                user=auth_user,
-                **mp
-            )
-            component.mass_properties.add(mp_obj)
+        return MassProperties.objects.get_or_create_many(
+            auth_user,
+            mass_properties,
+        )
 
     def create(self, validated_data):
         """Create a new Component object."""
         mass_properties = validated_data.pop('mass_properties', [])
         component = Component.objects.create(**validated_data)
-        self._get_or_create_mass_properties(mass_properties, component)
+        component.mass_properties.add(
+            *self._get_or_create_mass_properties(mass_properties)
+        )
+        Component.objects.mark_rollup_dirty([component.path])
 
         return component
 
@@ -53,13 +164,19 @@ class ComponentSerializer(serializers.ModelSerializer):
         """Update an existing Component object."""
         mass_properties = validated_data.pop('mass_properties', None)
         if mass_properties is not None:
-            instance.mass_properties.clear()
-            self._get_or_create_mass_properties(mass_properties, instance)
+            # set() only deletes the removed links and inserts the new ones.
+            instance.mass_properties.set(
+                self._get_or_create_mass_properties(mass_properties)
+            )
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
+        old_path = instance.path
         instance.save()
+        if mass_properties is not None or instance.path != old_path:
+            Component.objects.mark_rollup_dirty([old_path, instance.path])
+
         return instance
 
 
@@ -68,3 +185,171 @@ class ComponentDetailSerializer(ComponentSerializer):
 
     class Meta(ComponentSerializer.Meta):
         fields = ComponentSerializer.Meta.fields + ['description']
+
+
+class ComponentImportItemSerializer(ComponentDetailSerializer):
+    """Serializer for a single component of a bulk assembly import."""
+    ref = serializers.CharField(write_only=True, max_length=255)
+    parent_ref = serializers.CharField(
+        write_only=True,
+        required=False,
+        allow_null=True,
+        max_length=255,
+    )
+
+    class Meta(ComponentDetailSerializer.Meta):
+        fields = ComponentDetailSerializer.Meta.fields + ['ref', 'parent_ref']
+
+    def validate(self, attrs):
+        """Ensure the parent is referenced in only one way."""
+        if attrs.get('parent_ref') is not None and \
+                attrs.get('parent') is not None:
+            raise serializers.ValidationError(
+                'Provide either parent or parent_ref, not both.'
+            )
+
+        return attrs
+
+
+class ComponentImportSerializer(serializers.Serializer):
+    """Serializer for importing a whole component tree in one request.
+
+    Components reference each other through `ref`/`parent_ref`. They are
+    written with batched inserts, one batch per tree level, so parents
+    always have their ids before their children are inserted.
+    """
+    components = ComponentImportItemSerializer(many=True, allow_empty=False)
+
+    batch_size = 1000
+
+    def validate_components(self, components):
+        """Check the refs and group the components by tree level."""
+        by_ref = {}
+        for item in components:
+            if item['ref'] in by_ref:
+                raise serializers.ValidationError(
+                    f"Duplicate ref '{item['ref']}'."
+                )
+            by_ref[item['ref']] = item
+
+        depth = {}
+        for item in components:
+            chain, seen = [], set()
+            ref = item['ref']
+            while ref is not None and ref not in depth:
+                if ref not in by_ref:
+                    raise serializers.ValidationError(
+                        f"Unknown parent_ref '{ref}'."
+                    )
+                if ref in seen:
+                    raise serializers.ValidationError(
+                        f"Cyclic parent_ref at '{ref}'."
+                    )
+                chain.append(ref)
+                seen.add(ref)
+                ref = by_ref[ref].get('parent_ref')
+
+            level = -1 if ref is None else depth[ref]
+            for ref in reversed(chain):
+                level += 1
+                depth[ref] = level
+
+        levels = [[] for _ in range(max(depth.values()) + 1)]
+        for item in components:
+            levels[depth[item['ref']]].append(item)
+
+        return levels
+
+    def create(self, validated_data):
+        """Insert the components level by level and link mass properties."""
+        return Component.objects.create_tree(
+            validated_data['user'],
+            validated_data['components'],
+            batch_size=self.batch_size,
+        )
+
+    def to_representation(self, instance):
+        """Return the ids assigned to each imported ref."""
+        return {
+            'created': len(instance),
+            'ids': {ref: component.id for ref, component in instance.items()},
+        }
+
+
+class ComponentMoveSerializer(serializers.Serializer):
+    """Serializer for moving a component below another parent."""
+    parent = serializers.IntegerField(allow_null=True)
+    index = serializers.IntegerField(required=False, min_value=0)
+
+    def validate_parent(self, parent):
+        """Ensure the parent exists outside of the moved subtree."""
+        if parent is None:
+            return parent
+
+        path = Component.objects.filter(
+            user=self.instance.user,
+            id=parent,
+        ).values_list('path', flat=True).first()
+        if path is None:
+            raise serializers.ValidationError('Component not found.')
+        if path.startswith(self.instance.path):
+            raise serializers.ValidationError(
+                'A component cannot be its own ancestor.'
+            )
+
+        return parent
+
+
+class ComponentBulkDeleteSerializer(serializers.Serializer):
+    """Serializer for deleting many components at once."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+    )
+    subtree = serializers.BooleanField(default=False)
+    collect_mass_properties = serializers.BooleanField(default=False)
+
+
+class ComponentFilterSerializer(serializers.Serializer):
+    """Serializer for the filter parameters of the component list."""
+    skeleton = serializers.CharField(required=False)
+    type = serializers.CharField(required=False)
+    level = serializers.IntegerField(required=False)
+    parent = serializers.IntegerField(required=False)
+    version = serializers.CharField(required=False)
+
+
+class ComponentSearchSerializer(serializers.Serializer):
+    """Serializer for the parameters of a component search."""
+    q = serializers.CharField(max_length=255)
+    limit = serializers.IntegerField(
+        default=20,
+        min_value=1,
+        max_value=settings.SEARCH_MAX_RESULTS,
+    )
+
+    def validate_q(self, q):
+        """Require at least one word to search for."""
+        if not search_terms(q):
+            raise serializers.ValidationError('Enter at least one word.')
+        return q
+
+
+class MonteCarloSerializer(serializers.Serializer):
+    """Serializer for the parameters of a Monte Carlo analysis."""
+    samples = serializers.IntegerField(
+        default=10000,
+        min_value=1,
+        max_value=settings.MONTE_CARLO_MAX_SAMPLES,
+    )
+    distribution = serializers.ChoiceField(
+        choices=DISTRIBUTIONS,
+        default='triangular',
+    )
+    bins = serializers.IntegerField(default=50, min_value=1, max_value=1000)
+    seed = serializers.IntegerField(required=False, min_value=0)
+    workers = serializers.IntegerField(default=1, min_value=1)
+
+    def validate_workers(self, workers):
+        """Cap the number of worker processes to the configured maximum."""
+        return min(workers, settings.MONTE_CARLO_MAX_WORKERS)
@@ -0,0 +1,40 @@
+"""
+Streaming JSON responses for the Component APIs.
+"""
+
+from itertools import islice
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from core.renderers import json_dumps
+
+
+def stream_json_array(queryset, serialize, chunk_size=None):
+    """Yield the serialized queryset as a JSON array, one chunk at a time.
+
+    Rows are read through a server-side cursor `chunk_size` at a time and
+    each chunk is passed to `serialize`, which returns a list of data to
+    encode, so only one chunk is held in memory.
+    """
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    rows = queryset.iterator(chunk_size=chunk_size)
+
+    yield b'['
+    separator = b''
+    while chunk := list(islice(rows, chunk_size)):
+        data = serialize(chunk)
+        content = separator + json_dumps(data)[1:-1]
+        # Release the chunk before the next one is fetched.
+        del chunk, data
+        yield content
+        separator = b','
+    yield b']'
+
+
+def streaming_response(queryset, serialize):
+    """Return a response streaming the serialized queryset as JSON."""
+    return StreamingHttpResponse(
+        stream_json_array(queryset, serialize),
+        content_type='application/json',
+    )
@@ -0,0 +1,177 @@
+"""
+Tests for the bulk component delete API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import testing
+from core.models import Component, MassProperties
+
+
+BULK_DELETE_URL = reverse('component:component-bulk-delete')
+COMPONENT_URL = reverse('component:component-list')
+
+
+class PublicBulkDeleteAPITests(TestCase):
+    """Test unauthenticated bulk delete requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to delete components."""
+        res = self.client.post(BULK_DELETE_URL, {}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateBulkDeleteAPITests(testing.ScalingTestMixin, TestCase):
+    """Test authenticated bulk delete requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.root, self.child, self.grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+
+    def delete(self, ids, **params):
+        """Bulk delete the components and return the response."""
+        return self.client.post(
+            BULK_DELETE_URL,
+            {'ids': ids, **params},
+            format='json',
+        )
+
+    def test_delete_subtree(self):
+        """Test deleting a whole subtree and its mass property links."""
+        res = self.delete([self.child.id], subtree=True)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'components': 2, 'mass_properties': 0})
+        self.assertEqual(
+            list(Component.objects.values_list('id', flat=True)),
+            [self.root.id],
+        )
+        Through = Component.mass_properties.through
+        self.assertEqual(Through.objects.count(), 2)
+        self.assertEqual(MassProperties.objects.count(), 6)
+
+    def test_delete_nested_subtrees(self):
+        """Test subtrees listed inside other listed subtrees are deleted."""
+        sibling = testing.create_components(self.user, 1, self.root)[0]
+
+        res = self.delete(
+            [self.grandchild.id, self.child.id, sibling.id],
+            subtree=True,
+        )
+
+        self.assertEqual(res.data['components'], 3)
+        self.assertEqual(Component.objects.count(), 1)
+
+    def test_delete_ids_reroots_descendants(self):
+        """Test deleting listed components makes their children roots."""
+        leaf = testing.create_components(
+            self.user, 1, self.grandchild,
+        )[0]
+
+        res = self.delete([self.root.id, self.grandchild.id])
+
+        self.assertEqual(res.data['components'], 2)
+        self.child.refresh_from_db()
+        leaf.refresh_from_db()
+        self.assertEqual(self.child.path, f'/{self.child.id}/')
+        self.assertEqual(leaf.path, f'/{leaf.id}/')
+        for component in (self.child, leaf):
+            self.assertIsNone(component.parent)
+            self.assertEqual(component.level, 0)
+
+    def test_delete_ids_shifts_deeper_descendants(self):
+        """Test descendants below a new root keep their parents."""
+        self.delete([self.root.id])
+
+        self.grandchild.refresh_from_db()
+        self.assertEqual(
+            self.grandchild.path,
+            f'/{self.child.id}/{self.grandchild.id}/',
+        )
+        self.assertEqual(self.grandchild.parent, self.child.id)
+        self.assertEqual(self.grandchild.level, 1)
+
+    def test_collect_mass_properties(self):
+        """Test unlinked mass properties are deleted, shared ones kept."""
+        shared = MassProperties.objects.create(user=self.user, csys_name='S')
+        self.child.mass_properties.add(shared)
+        self.root.mass_properties.add(shared)
+
+        res = self.delete(
+            [self.child.id],
+            subtree=True,
+            collect_mass_properties=True,
+        )
+
+        self.assertEqual(res.data, {'components': 2, 'mass_properties': 4})
+        self.assertTrue(MassProperties.objects.filter(id=shared.id).exists())
+        self.assertEqual(MassProperties.objects.count(), 3)
+
+    def test_other_users_components_kept(self):
+        """Test another user's components cannot be deleted."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123'
+        )
+        component = testing.create_components(other, 1)[0]
+
+        res = self.delete([component.id], subtree=True)
+
+        self.assertEqual(res.data['components'], 0)
+        self.assertTrue(Component.objects.filter(id=component.id).exists())
+
+    def test_invalid_payload_rejected(self):
+        """Test an empty or malformed id list returns an error."""
+        for ids in ([], ['one']):
+            res = self.delete(ids)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_delete_invalidates_cached_list(self):
+        """Test deleted components disappear from the cached list."""
+        self.client.get(COMPONENT_URL)
+
+        self.delete([self.root.id], subtree=True)
+
+        res = self.client.get(COMPONENT_URL)
+        self.assertEqual(res.data['results'], [])
+
+    def test_delete_subtree_scales(self):
+        """Test deleting a subtree runs a flat query count as it grows."""
+        root = testing.create_components(self.user, 1)[0]
+
+        def delete_subtree(size):
+            # Roll back, so every request deletes the whole subtree.
+            with transaction.atomic():
+                res = self.delete(
+                    [root.id],
+                    subtree=True,
+                    collect_mass_properties=True,
+                )
+                transaction.set_rollback(True)
+            return res
+
+        res = self.assertScales(
+            'component-bulk-delete',
+            delete_subtree,
+            lambda count: testing.create_components(self.user, count, root),
+        )
+
+        self.assertEqual(res.data['components'], testing.SIZES[-1] + 1)
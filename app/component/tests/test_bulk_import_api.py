@@ -0,0 +1,254 @@
+"""
+Tests for the bulk assembly import API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import testing
+from core.models import Component, MassProperties
+
+
+BULK_IMPORT_URL = reverse('component:component-bulk-import')
+
+
+def component_payload(ref, parent_ref=None, **params):
+    """Create and return a component entry for an import payload."""
+    payload = {
+        'ref': ref,
+        'parent_ref': parent_ref,
+        'name': f'Component {ref}',
+        'version': '1.0',
+        'type': 'PART',
+        'level': 0,
+        'index': 0,
+        'skeleton': 'Test Skeleton',
+    }
+    payload.update(params)
+    return payload
+
+
+class PublicBulkImportAPITests(TestCase):
+    """Test unauthenticated bulk import requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """Test auth is required to import components."""
+        res = self.client.post(BULK_IMPORT_URL, {}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateBulkImportAPITests(testing.ScalingTestMixin, TestCase):
+    """Test authenticated bulk import requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_import_tree_resolves_parents(self):
+        """Test importing a tree links children to their parents' ids."""
+        def import_tree(size):
+            payload = {'components': [
+                component_payload('child', parent_ref='root', level=1),
+                component_payload('root'),
+                component_payload('grandchild', parent_ref='child', level=2),
+            ] + [
+                component_payload(
+                    f'leaf{i}',
+                    parent_ref='grandchild',
+                    level=3,
+                    mass_properties=[{'csys_name': f'LEAF_{size}_{i}'}],
+                )
+                for i in range(size)
+            ]}
+            return self.client.post(BULK_IMPORT_URL, payload, format='json')
+
+        # The number of queries does not depend on the tree size.
+        res = self.assertScales('component-bulk-import', import_tree)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 3 + testing.SIZES[-1])
+        ids = res.data['ids']
+        root = Component.objects.get(id=ids['root'])
+        child = Component.objects.get(id=ids['child'])
+        grandchild = Component.objects.get(id=ids['grandchild'])
+        leaf = Component.objects.get(id=ids['leaf0'])
+        self.assertIsNone(root.parent)
+        self.assertEqual(child.parent, root.id)
+        self.assertEqual(grandchild.parent, child.id)
+        self.assertEqual(leaf.parent, grandchild.id)
+        self.assertEqual(root.user, self.user)
+        self.assertEqual(
+            grandchild.path,
+            f'/{root.id}/{child.id}/{grandchild.id}/',
+        )
+
+    def test_import_deep_tree_inserts_final_paths(self):
+        """Test the query count of an import does not grow with its depth."""
+        def import_chain(depth):
+            payload = {'components': [
+                component_payload(
+                    f'{depth}_{i}',
+                    parent_ref=f'{depth}_{i - 1}' if i else None,
+                    level=i,
+                )
+                for i in range(depth)
+            ]}
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(
+                    BULK_IMPORT_URL,
+                    payload,
+                    format='json',
+                )
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return res, queries
+
+        shallow = import_chain(1)[1]
+        res, deep = import_chain(6)
+
+        self.assertEqual(len(deep), len(shallow))
+        self.assertFalse(any(
+            query['sql'].startswith('UPDATE "core_component"')
+            for query in deep
+        ))
+        ids = [res.data['ids'][f'6_{i}'] for i in range(6)]
+        self.assertEqual(
+            Component.objects.get(id=ids[-1]).path,
+            '/' + ''.join(f'{pk}/' for pk in ids),
+        )
+
+    def test_import_non_ascii_text(self):
+        """Test imported text outside of ASCII is stored unchanged."""
+        payload = {'components': [component_payload(
+            'a',
+            name='Gehäuse',
+            mass_properties=[{'csys_name': 'Ø_CSYS'}],
+        )]}
+
+        res = self.client.post(BULK_IMPORT_URL, payload, format='json')
+
+        component = Component.objects.get(id=res.data['ids']['a'])
+        self.assertEqual(component.name, 'Gehäuse')
+        self.assertEqual(component.mass_properties.get().csys_name, 'Ø_CSYS')
+
+    def test_import_with_existing_parent(self):
+        """Test importing components under an existing component."""
+        existing = Component.objects.create(
+            user=self.user,
+            name='Existing',
+            version='1.0',
+            type='ASM',
+            level=0,
+            index=0,
+        )
+        payload = {'components': [
+            component_payload('a', parent=existing.id, level=1),
+        ]}
+
+        res = self.client.post(BULK_IMPORT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        component = Component.objects.get(id=res.data['ids']['a'])
+        self.assertEqual(component.parent, existing.id)
+        self.assertEqual(component.path, f'/{existing.id}/{component.id}/')
+
+    def test_import_mass_properties_are_shared(self):
+        """Test identical mass properties are stored once and linked."""
+        existing = MassProperties.objects.create(
+            user=self.user,
+            csys_name='DEFAULT',
+        )
+        payload = {'components': [
+            component_payload('a', mass_properties=[
+                {'csys_name': 'DEFAULT'},
+                {'csys_name': 'DEFAULT_1', 'mass': '[1, 2, 3]'},
+            ]),
+            component_payload('b', mass_properties=[
+                {'csys_name': 'DEFAULT_1', 'mass': '[1, 2, 3]'},
+            ]),
+        ]}
+
+        res = self.client.post(BULK_IMPORT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(MassProperties.objects.count(), 2)
+        a = Component.objects.get(id=res.data['ids']['a'])
+        b = Component.objects.get(id=res.data['ids']['b'])
+        self.assertIn(existing, a.mass_properties.all())
+        self.assertEqual(a.mass_properties.count(), 2)
+        self.assertEqual(
+            b.mass_properties.get().id,
+            MassProperties.objects.get(csys_name='DEFAULT_1').id,
+        )
+
+    def test_import_large_tree_in_batches(self):
+        """Test a large import inserts mass properties in bounded batches."""
+        payload = {'components': [
+            component_payload(
+                str(i),
+                mass_properties=[
+                    {'csys_name': f'CSYS_{i}_{j}'} for j in range(2)
+                ],
+            )
+            for i in range(2500)
+        ]}
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(BULK_IMPORT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(MassProperties.objects.count(), 5000)
+        inserts = [
+            query for query in queries
+            if query['sql'].startswith('INSERT INTO "core_massproperties"')
+        ]
+        self.assertEqual(len(inserts), 5)
+
+    def test_import_unknown_parent_ref_error(self):
+        """Test importing with an unknown parent_ref fails atomically."""
+        payload = {'components': [
+            component_payload('a'),
+            component_payload('b', parent_ref='missing'),
+        ]}
+
+        res = self.client.post(BULK_IMPORT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Component.objects.exists())
+
+    def test_import_cyclic_parent_ref_error(self):
+        """Test importing components that reference each other fails."""
+        payload = {'components': [
+            component_payload('a', parent_ref='b'),
+            component_payload('b', parent_ref='a'),
+        ]}
+
+        res = self.client.post(BULK_IMPORT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Component.objects.exists())
+
+    def test_import_duplicate_ref_error(self):
+        """Test importing two components with the same ref fails."""
+        payload = {'components': [
+            component_payload('a'),
+            component_payload('a'),
+        ]}
+
+        res = self.client.post(BULK_IMPORT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Component.objects.exists())
@@ -0,0 +1,156 @@
+"""
+Tests for the cache of component responses.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import testing
+from core.models import Component, MassProperties
+
+
+COMPONENT_URL = reverse('component:component-list')
+
+
+def detail_url(component_id):
+    """Create and return a component detail URL."""
+    return reverse('component:component-detail', args=[component_id])
+
+
+def subtree_url(component_id):
+    """Create and return a component subtree URL."""
+    return reverse('component:component-subtree', args=[component_id])
+
+
+def massproperties_url(mass_props_id):
+    """Create and return a mass properties detail URL."""
+    return reverse('component:massproperties-detail', args=[mass_props_id])
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheAPITests(TestCase):
+    """Test caching and invalidating component responses."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.root = testing.create_components(self.user, 1)[0]
+        self.children = testing.create_components(self.user, 3, self.root)
+
+    def assertCached(self, url, params=None):
+        """Assert a request is served from the cache without queries."""
+        self.client.get(url, params)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['X-Cache'], 'hit')
+        return res
+
+    def test_hot_reads_skip_database(self):
+        """Test repeated list, detail and subtree reads run no queries."""
+        res = self.assertCached(COMPONENT_URL)
+        self.assertEqual(len(res.data['results']), 4)
+
+        res = self.assertCached(detail_url(self.root.id))
+        self.assertEqual(len(res.data['mass_properties']), 2)
+
+        res = self.assertCached(subtree_url(self.root.id), {'fields': 'id'})
+        self.assertEqual(len(res.data['results']), 4)
+
+    def test_query_parameters_are_cached_apart(self):
+        """Test different query parameters get their own entries."""
+        self.client.get(COMPONENT_URL, {'fields': 'id'})
+
+        res = self.client.get(COMPONENT_URL, {'fields': 'name'})
+
+        self.assertEqual(res['X-Cache'], 'miss')
+        self.assertEqual(list(res.data['results'][0]), ['name'])
+
+    def test_component_update_invalidates(self):
+        """Test updating a component invalidates the cached responses."""
+        self.client.get(detail_url(self.root.id))
+        self.client.get(COMPONENT_URL)
+
+        self.client.patch(detail_url(self.root.id), {'name': 'Renamed'})
+
+        res = self.client.get(detail_url(self.root.id))
+        self.assertEqual(res['X-Cache'], 'miss')
+        self.assertEqual(res.data['name'], 'Renamed')
+        res = self.client.get(COMPONENT_URL)
+        self.assertEqual(res.data['results'][0]['name'], 'Renamed')
+
+    def test_mass_properties_update_invalidates(self):
+        """Test updating linked mass properties invalidates components."""
+        mass_props = self.root.mass_properties.first()
+        self.client.get(detail_url(self.root.id))
+
+        self.client.patch(massproperties_url(mass_props.id), {
+            'mass': '[9, 9, 9]',
+        })
+
+        res = self.client.get(detail_url(self.root.id))
+        self.assertIn(
+            '[9.0, 9.0, 9.0]',
+            [mp['mass'] for mp in res.data['mass_properties']],
+        )
+
+    def test_link_change_invalidates(self):
+        """Test relinking mass properties invalidates components."""
+        self.client.get(detail_url(self.root.id))
+
+        self.root.mass_properties.clear()
+
+        res = self.client.get(detail_url(self.root.id))
+        self.assertEqual(res.data['mass_properties'], [])
+
+    def test_delete_invalidates(self):
+        """Test deleting a component invalidates the subtree."""
+        self.client.get(subtree_url(self.root.id))
+
+        Component.objects.get(id=self.children[0].id).delete()
+
+        res = self.client.get(subtree_url(self.root.id))
+        self.assertEqual(len(res.data['results']), 3)
+
+    def test_bulk_create_invalidates(self):
+        """Test bulk inserted components invalidate the list."""
+        self.client.get(COMPONENT_URL)
+
+        testing.create_components(self.user, 2)
+
+        res = self.client.get(COMPONENT_URL)
+        self.assertEqual(len(res.data['results']), 6)
+
+    def test_other_users_cache_is_kept(self):
+        """Test changes only invalidate the owner's cached responses."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123'
+        )
+        other_client = APIClient()
+        other_client.force_authenticate(other)
+        other_client.get(COMPONENT_URL)
+
+        MassProperties.objects.create(user=self.user, csys_name='NEW')
+
+        res = other_client.get(COMPONENT_URL)
+        self.assertEqual(res['X-Cache'], 'hit')
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_cache_disabled(self):
+        """Test responses are not cached when the cache is disabled."""
+        self.client.get(COMPONENT_URL)
+
+        res = self.client.get(COMPONENT_URL)
+
+        self.assertNotIn('X-Cache', res)
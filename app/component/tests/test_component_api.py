@@ -3,14 +3,21 @@ Tests for component API.
 """
 
 # from decimal import Decimal
+import json
+
+import msgpack
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.db.models import Prefetch
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from rest_framework.test import APIClient     # type: ignore
 from rest_framework import status             # type: ignore
 
+from core import testing
 from core.models import Component, MassProperties
 
 from component.serializers import (
@@ -62,7 +69,7 @@ class PublicComponentAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateComponentAPITests(TestCase):
+class PrivateComponentAPITests(testing.ScalingTestMixin, TestCase):
     """Test authenticated API requests."""
 
     def setUp(self):
@@ -74,16 +81,23 @@ class PrivateComponentAPITests(TestCase):
         self.client.force_authenticate(self.user)
 
     def test_retrieve_components(self):
-        """Test retrieving a list of components."""
-        create_component(user=self.user)
-        create_component(user=self.user)
-
-        res = self.client.get(COMPONENT_URL)
+        """Test retrieving a list of components in a flat query count."""
+        res = self.assertScales(
+            'component-list',
+            lambda size: self.client.get(COMPONENT_URL),
+            lambda count: testing.create_components(self.user, count),
+        )
 
-        components = Component.objects.all().order_by('id')
+        components = Component.objects.order_by('id').prefetch_related(
+            Prefetch(
+                'mass_properties',
+                queryset=MassProperties.objects.order_by('id'),
+            ),
+        )
         serializer = ComponentSerializer(components, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), testing.SIZES[-1])
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_components_list_limited_to_user(self):
         """Test that the list of components is limited to the authenticated user."""        # noqa: E501
@@ -99,7 +113,7 @@ class PrivateComponentAPITests(TestCase):
         components = Component.objects.filter(user=self.user)
         serializer = ComponentSerializer(components, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_get_component_detail(self):
         """Test retrieving a component's detail view."""
@@ -138,14 +152,21 @@ class PrivateComponentAPITests(TestCase):
             name="Original Component",
             description=original_desc
         )
-
-        payload = {'name': 'New Updated Component'}
         url = detail_url(component.id)
-        res = self.client.patch(url, payload)
+
+        # Not a query per mass property.
+        res = self.assertScales(
+            'component-partial-update',
+            lambda size: self.client.patch(url, {'name': f'Renamed {size}'}),
+            lambda count: component.mass_properties.add(
+                *testing.create_mass_properties(self.user, count)
+            ),
+        )
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['mass_properties']), testing.SIZES[-1])
         component.refresh_from_db()
-        self.assertEqual(component.name, payload['name'])
+        self.assertEqual(component.name, f'Renamed {testing.SIZES[-1]}')
         self.assertEqual(component.description, original_desc)
         self.assertEqual(component.user, self.user)
 
@@ -196,13 +217,25 @@ class PrivateComponentAPITests(TestCase):
 
     def test_delete_component(self):
         """Test deleting a component is successful."""
-        component = create_component(user=self.user)
-
-        url = detail_url(component.id)
-        res = self.client.delete(url)
+        components, deleted = [], []
+
+        def delete(size):
+            deleted.append(components.pop())
+            return self.client.delete(detail_url(deleted[-1].id))
+
+        # Not a query per sibling.
+        res = self.assertScales(
+            'component-delete',
+            delete,
+            lambda count: components.extend(
+                testing.create_components(self.user, count)
+            ),
+        )
 
         self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertFalse(Component.objects.filter(id=component.id).exists())
+        self.assertFalse(Component.objects.filter(
+            id__in=[component.id for component in deleted],
+        ).exists())
 
     def test_delete_other_users_component_error(self):
         """Test deleting a component created by another user throws error."""
@@ -224,19 +257,27 @@ class PrivateComponentAPITests(TestCase):
             'level': 0,
             'index': 0,
             'skeleton': 'Test Skeleton',
-            'mass_properties': [
-                {'csys_name': 'DEFAULT'},
-                {'csys_name': 'DEFAULT_1'}
-            ]
         }
-        res = self.client.post(COMPONENT_URL, payload, format='json')
+
+        def create(size):
+            payload['mass_properties'] = [
+                {'csys_name': f'CSYS_{size}_{i}'} for i in range(size)
+            ]
+            return self.client.post(COMPONENT_URL, payload, format='json')
+
+        # Not a query per mass property.
+        res = self.assertScales('component-create', create)
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        components = Component.objects.filter(user=self.user)
-        self.assertEqual(components.count(), 1)
-        self.assertEqual(components[0].mass_properties.count(), 2)
+        self.assertEqual(len(res.data['mass_properties']), testing.SIZES[-1])
+        component = Component.objects.get(id=res.data['id'])
+        self.assertEqual(component.user, self.user)
+        self.assertEqual(
+            component.mass_properties.count(),
+            len(payload['mass_properties']),
+        )
         for mp in payload['mass_properties']:
-            exists = components[0].mass_properties.filter(
+            exists = component.mass_properties.filter(
                 csys_name=mp['csys_name'],
                 user=self.user
             ).exists()
@@ -278,3 +319,233 @@ class PrivateComponentAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(component.mass_properties.count(), 0)
+
+    def test_retrieve_component_with_mass_properties_queries(self):
+        """Test retrieving a component loads mass properties in one query."""
+        component = testing.create_components(
+            self.user, 1, mass_properties=0,
+        )[0]
+        url = detail_url(component.id)
+
+        def add_mass_properties(count):
+            component.mass_properties.add(
+                *testing.create_mass_properties(self.user, count)
+            )
+
+        res = self.assertScales(
+            'component-detail',
+            lambda size: self.client.get(url),
+            add_mass_properties,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['mass_properties']), testing.SIZES[-1])
+        add_mass_properties(1)
+        # Two ETag aggregates, the component and its mass properties.
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+    def test_create_component_deduplicates_mass_properties(self):
+        """Test identical mass properties are stored once and reused."""
+        existing = MassProperties.objects.create(
+            user=self.user,
+            csys_name='DEFAULT',
+        )
+        payload = {
+            'name': 'Test Component 1',
+            'version': '1.0',
+            'type': 'PART',
+            'level': 0,
+            'index': 0,
+            'skeleton': 'Test Skeleton',
+            'mass_properties': [
+                {'csys_name': 'DEFAULT'},
+                {'csys_name': 'DEFAULT_1'},
+                {'csys_name': 'DEFAULT_1'},
+            ]
+        }
+        res = self.client.post(COMPONENT_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(MassProperties.objects.count(), 2)
+        component = Component.objects.get(id=res.data['id'])
+        self.assertEqual(component.mass_properties.count(), 2)
+        self.assertIn(existing, component.mass_properties.all())
+
+    def test_update_mass_properties_writes_only_difference(self):
+        """Test updating mass properties only touches changed links."""
+        component = create_component(user=self.user)
+        kept, removed = testing.create_mass_properties(self.user, 2)
+        component.mass_properties.add(kept, removed)
+        Through = Component.mass_properties.through
+        kept_link = Through.objects.get(massproperties=kept)
+
+        payload = {'mass_properties': [
+            {'csys_name': kept.csys_name, 'mass': kept.mass},
+            {'csys_name': 'ADDED'},
+        ]}
+        url = detail_url(component.id)
+        res = self.client.patch(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(component.mass_properties.values_list('csys_name', flat=True)),
+            {kept.csys_name, 'ADDED'},
+        )
+        self.assertTrue(Through.objects.filter(id=kept_link.id).exists())
+
+    def test_noop_update_does_not_write_mass_property_links(self):
+        """Test a no-op update makes no writes to the through table."""
+        component = create_component(user=self.user)
+        mass_props = testing.create_mass_properties(self.user, 3)
+        component.mass_properties.add(*mass_props)
+        payload = ComponentDetailSerializer(component).data
+        payload.pop('id')
+
+        url = detail_url(component.id)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.put(url, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        through_table = Component.mass_properties.through._meta.db_table
+        writes = [
+            query['sql'] for query in queries
+            if through_table in query['sql']
+            and not query['sql'].startswith('SELECT')
+        ]
+        self.assertEqual(writes, [])
+        self.assertEqual(component.mass_properties.count(), 3)
+
+    def test_list_components_paginated(self):
+        """Test following the cursors returns every component once."""
+        components = [create_component(user=self.user, index=i)
+                      for i in range(5)]
+
+        ids, url, pages = [], f'{COMPONENT_URL}?page_size=2', 0
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(c['id'] for c in res.data['results'])
+            url, pages = res.data['next'], pages + 1
+
+        self.assertEqual(ids, [c.id for c in components])
+        self.assertEqual(pages, 3)
+
+    @override_settings(MAX_PAGE_SIZE=3)
+    def test_list_components_page_size_is_capped(self):
+        """Test requesting a page above the maximum size is capped."""
+        for i in range(5):
+            create_component(user=self.user, index=i)
+
+        res = self.client.get(COMPONENT_URL, {'page_size': 10})
+
+        self.assertEqual(len(res.data['results']), 3)
+
+    def test_deep_page_query_count_matches_first_page(self):
+        """Test later pages run the same queries as the first page."""
+        mass_props = testing.create_mass_properties(self.user, 2)
+        for i in range(30):
+            component = create_component(user=self.user, index=i)
+            component.mass_properties.add(*mass_props)
+
+        with CaptureQueriesContext(connection) as first:
+            res = self.client.get(COMPONENT_URL, {'page_size': 5})
+        for _ in range(4):
+            res = self.client.get(res.data['next'])
+        with CaptureQueriesContext(connection) as deep:
+            res = self.client.get(res.data['next'])
+
+        self.assertEqual(len(res.data['results']), 5)
+        self.assertEqual(len(deep), len(first))
+        # The page follows the two ETag aggregates.
+        self.assertIn('"id" >', deep[2]['sql'])
+        self.assertNotIn('OFFSET', deep[2]['sql'])
+
+    def test_page_lookup_uses_user_id_index(self):
+        """Test a page is answered from the (user, id) index."""
+        with connection.cursor() as cursor:
+            for setting in ('seqscan', 'bitmapscan', 'sort'):
+                cursor.execute(f'SET LOCAL enable_{setting} = off')
+        plan = Component.objects.filter(
+            user=self.user,
+            id__gt=1000,
+        ).order_by('id')[:100].explain()
+
+        self.assertIn('core_component_user_id_idx', plan)
+
+    @override_settings(STREAM_CHUNK_SIZE=2)
+    def test_stream_components(self):
+        """Test streaming the whole list returns every component as JSON."""
+        mass_props = testing.create_mass_properties(self.user, 2)
+        for i in range(5):
+            component = create_component(user=self.user, index=i)
+            component.mass_properties.add(*mass_props)
+
+        res = self.client.get(COMPONENT_URL, {'stream': 'true'})
+        with CaptureQueriesContext(connection) as queries:
+            content = b''.join(res.streaming_content)
+
+        components = Component.objects.filter(
+            user=self.user,
+        ).order_by('id').prefetch_related(Prefetch(
+            'mass_properties',
+            queryset=MassProperties.objects.order_by('id'),
+        ))
+        serializer = ComponentSerializer(components, many=True)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/json')
+        self.assertEqual(
+            json.loads(content),
+            json.loads(json.dumps(serializer.data)),
+        )
+        # One cursor plus one prefetch query per chunk of two components.
+        self.assertEqual(len(queries), 4)
+
+    def test_stream_empty_list(self):
+        """Test streaming an empty list returns an empty JSON array."""
+        res = self.client.get(COMPONENT_URL, {'stream': 'true'})
+
+        self.assertEqual(json.loads(b''.join(res.streaming_content)), [])
+
+    def test_list_components_as_msgpack(self):
+        """Test requesting MessagePack returns the same data as JSON."""
+        component = create_component(user=self.user)
+        mass_props = testing.create_mass_properties(self.user, 2)
+        component.mass_properties.add(*mass_props)
+
+        res = self.client.get(COMPONENT_URL, HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/msgpack')
+        json_res = self.client.get(COMPONENT_URL)
+        self.assertEqual(
+            msgpack.unpackb(res.content),
+            json.loads(json_res.content),
+        )
+
+    def test_create_component_from_msgpack(self):
+        """Test creating a component from a MessagePack body."""
+        payload = {
+            'name': 'Packed Component',
+            'version': '1.0',
+            'type': 'component',
+            'level': 0,
+            'index': 0,
+            'skeleton': 'Skeleton Model',
+            'mass_properties': [{'csys_name': 'PACKED', 'mass': [1, 2, 3]}],
+        }
+
+        res = self.client.post(
+            COMPONENT_URL,
+            msgpack.packb(payload),
+            content_type='application/msgpack',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        component = Component.objects.get(id=res.data['id'])
+        self.assertEqual(component.name, payload['name'])
+        self.assertEqual(
+            component.mass_properties.get().mass,
+            [1.0, 2.0, 3.0],
+        )
@@ -0,0 +1,184 @@
+"""
+Tests for ETags and conditional GETs of components.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import testing
+from core.models import Component
+
+
+COMPONENT_URL = reverse('component:component-list')
+
+
+def detail_url(component_id):
+    """Create and return a component detail URL."""
+    return reverse('component:component-detail', args=[component_id])
+
+
+def subtree_url(component_id):
+    """Create and return a component subtree URL."""
+    return reverse('component:component-subtree', args=[component_id])
+
+
+def massproperties_url(mass_props_id):
+    """Create and return a mass properties detail URL."""
+    return reverse('component:massproperties-detail', args=[mass_props_id])
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ETagAPITests(TestCase):
+    """Test tagging component responses and answering conditional GETs."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.root = testing.create_components(self.user, 1)[0]
+        self.children = testing.create_components(self.user, 3, self.root)
+
+    def etag(self, url, params=None):
+        """Return the ETag of a response."""
+        res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res['ETag']
+
+    def test_not_modified(self):
+        """Test a matching If-None-Match returns 304 without serializing."""
+        for url in [
+            COMPONENT_URL,
+            detail_url(self.root.id),
+            subtree_url(self.root.id),
+        ]:
+            etag = self.etag(url)
+
+            with self.assertNumQueries(2):
+                res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(res['ETag'], etag)
+            self.assertEqual(res.content, b'')
+
+    def test_weak_and_listed_etags_match(self):
+        """Test If-None-Match accepts weak tags and lists of tags."""
+        url = detail_url(self.root.id)
+        etag = self.etag(url)
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_representations_are_tagged_apart(self):
+        """Test selected fields and media types have their own ETags."""
+        url = detail_url(self.root.id)
+
+        etags = {
+            self.etag(url),
+            self.etag(url, {'fields': 'id'}),
+            self.client.get(url, HTTP_ACCEPT='application/msgpack')['ETag'],
+        }
+
+        self.assertEqual(len(etags), 3)
+
+    def test_component_update_changes_etag(self):
+        """Test updating a component changes its ETag."""
+        url = detail_url(self.root.id)
+        etag = self.etag(url)
+
+        self.client.patch(url, {'name': 'Renamed'})
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], 'Renamed')
+        self.assertNotEqual(res['ETag'], etag)
+
+    def test_mass_properties_update_changes_etag(self):
+        """Test updating linked mass properties changes the subtree ETag."""
+        url = subtree_url(self.root.id)
+        etag = self.etag(url)
+        mass_props = self.children[0].mass_properties.first()
+
+        self.client.patch(massproperties_url(mass_props.id), {
+            'mass': '[9, 9, 9]',
+        })
+
+        self.assertNotEqual(self.etag(url), etag)
+
+    def test_relink_changes_etag(self):
+        """Test swapping mass properties changes the component ETag."""
+        url = detail_url(self.root.id)
+        other = self.children[0].mass_properties.first()
+        self.root.mass_properties.remove(self.root.mass_properties.first())
+        etag = self.etag(url)
+
+        self.root.mass_properties.remove(self.root.mass_properties.first())
+        self.root.mass_properties.add(other)
+
+        self.assertNotEqual(self.etag(url), etag)
+
+    def test_insert_and_delete_change_etag(self):
+        """Test adding or removing components changes the list ETag."""
+        etag = self.etag(COMPONENT_URL)
+        testing.create_components(self.user, 1)
+        added = self.etag(COMPONENT_URL)
+
+        Component.objects.get(id=self.children[0].id).delete()
+
+        self.assertNotEqual(added, etag)
+        self.assertNotIn(self.etag(COMPONENT_URL), {etag, added})
+
+    def test_missing_component_not_found(self):
+        """Test a conditional GET of a missing component is not found."""
+        res = self.client.get(detail_url(0), HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_concurrent_saves_each_bump_revision(self):
+        """Test saves of stale instances still bump the revision."""
+        first = Component.objects.get(id=self.root.id)
+        second = Component.objects.get(id=self.root.id)
+
+        first.save()
+        second.save()
+
+        self.root.refresh_from_db()
+        self.assertEqual(self.root.revision, 3)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_cached_etag_skips_database(self):
+        """Test repeated conditional GETs run no queries."""
+        url = subtree_url(self.root.id)
+        etag = self.etag(url)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_cached_etag_follows_data_version(self):
+        """Test cached ETags come from the data version, not aggregates."""
+        url = subtree_url(self.root.id)
+        etag = self.etag(url)
+        self.client.patch(detail_url(self.children[0].id), {'name': 'New'})
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertFalse(any(
+            'SUM(' in query['sql'] for query in queries.captured_queries
+        ))
+        res = self.client.get(detail_url(0), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
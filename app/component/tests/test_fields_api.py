@@ -0,0 +1,174 @@
+"""
+Tests for sparse fieldsets on the component APIs.
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import testing
+from core.models import Component, MassProperties
+
+
+COMPONENT_URL = reverse('component:component-list')
+MASS_PROPERTIES_URL = reverse('component:massproperties-list')
+THROUGH_TABLE = Component.mass_properties.through._meta.db_table
+
+
+def detail_url(component_id):
+    """Create and return a component detail URL."""
+    return reverse('component:component-detail', args=[component_id])
+
+
+class SparseFieldsAPITests(testing.ScalingTestMixin, TestCase):
+    """Test selecting response fields with ?fields= and ?omit=."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+        self.mass_props = MassProperties.objects.create(
+            user=self.user,
+            csys_name='CSYS',
+            mass=[1, 2, 3],
+        )
+        self.components = testing.create_components(
+            self.user, 3,
+            mass_properties=0,
+            name='Sample Component',
+            description='Sample Component Description',
+        )
+        for component in self.components:
+            component.mass_properties.add(self.mass_props)
+
+    def test_list_selected_fields(self):
+        """Test listing only the selected fields skips other columns."""
+        params = {'fields': 'id,name,parent,level,index'}
+        sql = []
+
+        def list_fields(size):
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.get(COMPONENT_URL, params)
+            sql.extend(query['sql'] for query in queries)
+            return res
+
+        res = self.assertScales(
+            'component-list-fields',
+            list_fields,
+            lambda count: testing.create_components(self.user, count),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 3 + testing.SIZES[-1])
+        self.assertEqual(
+            list(res.data['results'][0]),
+            ['id', 'name', 'parent', 'level', 'index'],
+        )
+        self.assertNotIn('"skeleton"', ' '.join(sql))
+        self.assertNotIn(THROUGH_TABLE, ' '.join(sql))
+
+    def test_list_omit_mass_properties(self):
+        """Test omitting mass properties skips the many-to-many query."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(COMPONENT_URL, {'omit': 'mass_properties'})
+
+        self.assertNotIn('mass_properties', res.data['results'][0])
+        self.assertIn('skeleton', res.data['results'][0])
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn(THROUGH_TABLE, sql)
+
+    def test_list_without_id_paginates(self):
+        """Test leaving out the id still returns a working next cursor."""
+        res = self.client.get(COMPONENT_URL, {
+            'fields': 'name,index',
+            'page_size': 2,
+        })
+
+        self.assertEqual(
+            res.data['results'],
+            [{'name': 'Sample Component', 'index': i} for i in range(2)],
+        )
+        res = self.client.get(res.data['next'])
+        self.assertEqual(res.data['results'], [
+            {'name': 'Sample Component', 'index': 2},
+        ])
+
+    def test_stream_selected_fields(self):
+        """Test streaming a list with selected fields."""
+        res = self.client.get(COMPONENT_URL, {
+            'fields': 'id,mass_properties',
+            'stream': 'true',
+        })
+
+        content = json.loads(b''.join(res.streaming_content))
+        self.assertEqual(
+            list(content[0]),
+            ['id', 'mass_properties'],
+        )
+        self.assertEqual(content[0]['mass_properties'][0]['csys_name'], 'CSYS')
+
+    def test_subtree_selected_fields(self):
+        """Test tree actions accept selected fields."""
+        url = reverse(
+            'component:component-subtree',
+            args=[self.components[0].id],
+        )
+
+        res = self.client.get(url, {'fields': 'id'})
+
+        self.assertEqual(
+            res.data['results'],
+            [{'id': self.components[0].id}],
+        )
+
+    def test_retrieve_selected_fields(self):
+        """Test retrieving selected fields defers the other columns."""
+        url = detail_url(self.components[0].id)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, {'fields': 'name,description'})
+
+        self.assertEqual(
+            res.data,
+            {
+                'name': 'Sample Component',
+                'description': 'Sample Component Description',
+            },
+        )
+        # The ETag of the component, then the component itself.
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('"skeleton"', queries[-1]['sql'])
+
+    def test_unknown_field_error(self):
+        """Test selecting an unknown field returns an error."""
+        res = self.client.get(COMPONENT_URL, {'fields': 'id,path'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('path', str(res.data['fields']))
+
+    def test_update_ignores_selected_fields(self):
+        """Test writes accept and return every field."""
+        url = f'{detail_url(self.components[0].id)}?fields=id'
+
+        res = self.client.patch(url, {'name': 'Renamed'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], 'Renamed')
+
+    def test_mass_properties_selected_fields(self):
+        """Test listing selected mass property fields."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(MASS_PROPERTIES_URL, {'fields': 'csys_name'})
+
+        self.assertEqual(res.data['results'], [{'csys_name': 'CSYS'}])
+        self.assertNotIn('"xform_matrix"', queries[-1]['sql'])
@@ -0,0 +1,178 @@
+"""
+Tests for filtering the component list.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import testing
+from core.models import Component
+
+
+COMPONENT_URL = reverse('component:component-list')
+
+
+class ComponentFilterAPITests(testing.ScalingTestMixin, TestCase):
+    """Test filtering the component list by query parameters."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def names(self, params):
+        """Return the names of the components listed for the parameters."""
+        res = self.client.get(COMPONENT_URL, {'fields': 'name', **params})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [component['name'] for component in res.data['results']]
+
+    def test_filter_by_skeleton_and_level(self):
+        """Test filtering by skeleton and level."""
+        testing.create_components(self.user, 1, name='A0', skeleton='A')
+        for name in ('A1', 'B1'):
+            testing.create_components(
+                self.user, 1, name=name, skeleton=name[0], level=1,
+            )
+
+        self.assertEqual(self.names({'skeleton': 'A'}), ['A0', 'A1'])
+        self.assertEqual(self.names({'skeleton': 'A', 'level': 1}), ['A1'])
+        self.assertEqual(self.names({'level': 1}), ['A1', 'B1'])
+
+    def test_filter_by_type_parent_and_version(self):
+        """Test filtering by type, parent and version."""
+        root = testing.create_components(
+            self.user, 1, name='Root', type='ASSEMBLY',
+        )[0]
+        testing.create_components(self.user, 1, name='Part', parent=root)
+        testing.create_components(
+            self.user, 1, root, name='New', version='2.0',
+        )
+
+        self.assertEqual(self.names({'type': 'ASSEMBLY'}), ['Root'])
+        self.assertEqual(self.names({'parent': root.id}), ['Part', 'New'])
+        self.assertEqual(self.names({'version': '2.0'}), ['New'])
+
+    def test_filter_limited_to_user(self):
+        """Test filters only match the authenticated user's components."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123'
+        )
+        testing.create_components(other, 1, name='Other', skeleton='A')
+
+        self.assertEqual(self.names({'skeleton': 'A'}), [])
+
+    def test_invalid_filter_rejected(self):
+        """Test a malformed filter value returns an error."""
+        res = self.client.get(COMPONENT_URL, {'level': 'top'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('level', res.data)
+
+    def test_filtered_responses_cached_apart(self):
+        """Test responses to different filters are not mixed up."""
+        testing.create_components(self.user, 1, name='A', skeleton='A')
+        testing.create_components(self.user, 1, name='B', skeleton='B')
+
+        self.assertEqual(self.names({'skeleton': 'A'}), ['A'])
+        self.assertEqual(self.names({'skeleton': 'B'}), ['B'])
+
+    def test_filtered_list_scales(self):
+        """Test the filtered list runs the same queries at any size."""
+        self.assertScales(
+            'component-list-filtered',
+            lambda size: self.client.get(COMPONENT_URL, {
+                'skeleton': 'Skeleton Model',
+                'level': 0,
+            }),
+            lambda size: testing.create_components(self.user, size),
+        )
+
+
+class ComponentFilterIndexTests(TestCase):
+    """Test filtered lookups are answered from the composite indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            get_user_model().objects.create_user(
+                email=f'user{i}@example.com',
+                password='testpass123'
+            )
+            for i in range(10)
+        ]
+        cls.user = users[0]
+        Component.objects.bulk_create(
+            Component(
+                user=user,
+                name=f'Component {i}',
+                version='1.0',
+                type=f'TYPE_{i % 20}',
+                level=i % 5,
+                index=i,
+                skeleton=f'Skeleton {i % 10}',
+                parent=i // 10 or None,
+            )
+            for i in range(1000)
+            for user in users
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_component')
+
+    def assertUsesIndex(self, index, **filters):
+        """Assert the user's components matching filters use an index."""
+        plan = Component.objects.filter(
+            user=self.user,
+            **filters,
+        ).order_by('id').explain()
+
+        self.assertIn(index, plan)
+
+    def test_skeleton_level_uses_index(self):
+        """Test skeleton and level lookups use the skeleton index."""
+        self.assertUsesIndex(
+            'core_component_skeleton_idx',
+            skeleton='Skeleton 3',
+            level=3,
+        )
+
+    def test_parent_uses_index(self):
+        """Test parent lookups use the (user, parent) index."""
+        self.assertUsesIndex('core_component_user_parent_idx', parent=42)
+
+    def test_type_uses_index(self):
+        """Test type lookups use the (user, type) index."""
+        self.assertUsesIndex('core_component_user_type_idx', type='TYPE_7')
+
+    def test_user_lookups_use_composite_indexes(self):
+        """Test lookups by user alone use a (user, ...) index."""
+        with connection.cursor() as cursor:
+            columns = [
+                constraint['columns'] for constraint in
+                connection.introspection.get_constraints(
+                    cursor, Component._meta.db_table,
+                ).values()
+                if constraint['index']
+            ]
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+        self.assertNotIn(['user_id'], columns)
+        # The list and its ETag, and deleting the components of users.
+        for queryset in (
+            Component.objects.filter(user=self.user).order_by('id'),
+            Component.objects.filter(user=self.user).values('user'),
+            Component.objects.filter(user_id__in=[self.user.id]),
+        ):
+            plan = queryset.explain()
+
+            self.assertNotIn('Seq Scan', plan)
+            self.assertRegex(plan, r'core_component_(user|skeleton)\w*_idx')
@@ -9,6 +9,7 @@ from django.urls import reverse
 from rest_framework import status           # type: ignore
 from rest_framework.test import APIClient   # type: ignore
 
+from core import testing
 from core.models import MassProperties
 
 from component.serializers import MassPropertiesSerializer
@@ -46,7 +47,7 @@ class PublicMassPropertiesAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateMassPropertiesAPITests(TestCase):
+class PrivateMassPropertiesAPITests(testing.ScalingTestMixin, TestCase):
     """Test unauthenticated API requests."""
 
     def setUp(self):
@@ -56,15 +57,17 @@ class PrivateMassPropertiesAPITests(TestCase):
 
     def test_retrieve_mass_properties(self):
         """Test retrieving a list of mass properties."""
-        create_mass_properties(user=self.user)
-        create_mass_properties(user=self.user)
-
-        res = self.client.get(MASS_PROPERTIES_URL)
+        res = self.assertScales(
+            'massproperties-list',
+            lambda size: self.client.get(MASS_PROPERTIES_URL),
+            lambda count: testing.create_mass_properties(self.user, count),
+        )
 
         mass_props = MassProperties.objects.all().order_by('id')
         serializer = MassPropertiesSerializer(mass_props, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), testing.SIZES[-1])
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_mass_properties_list_limited_to_user(self):
         """Test that the list of mass_properties is limited to the authenticated user."""        # noqa: E501
@@ -81,21 +84,89 @@ class PrivateMassPropertiesAPITests(TestCase):
         res = self.client.get(MASS_PROPERTIES_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]['csys_name'], mass_props.csys_name)
-        self.assertEqual(res.data[0]['id'], mass_props.id)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(
+            res.data['results'][0]['csys_name'],
+            mass_props.csys_name,
+        )
+        self.assertEqual(res.data['results'][0]['id'], mass_props.id)
+
+    def test_mass_properties_list_paginated(self):
+        """Test mass properties are listed in pages with a next cursor."""
+        for i in range(3):
+            create_mass_properties(user=self.user, csys_name=f'CSYS_{i}')
+
+        res = self.client.get(MASS_PROPERTIES_URL, {'page_size': 2})
+
+        self.assertEqual(len(res.data['results']), 2)
+        res = self.client.get(res.data['next'])
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertIsNone(res.data['next'])
 
     def test_update_ingrediant(self):
         """Test updating a mass properties."""
         mass_props = MassProperties.objects.create(user=self.user)
+        url = detail_url(mass_props.id)
+
+        def grow(count):
+            for component in testing.create_components(
+                self.user, count, mass_properties=0,
+            ):
+                component.mass_properties.add(mass_props)
+
+        # Not a query per component sharing the mass properties.
+        res = self.assertScales(
+            'massproperties-partial-update',
+            lambda size: self.client.patch(
+                url, {'csys_name': f'ORIG_DEFAULT_{size}'},
+            ),
+            grow,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        mass_props.refresh_from_db()
+        self.assertEqual(
+            mass_props.csys_name,
+            f'ORIG_DEFAULT_{testing.SIZES[-1]}',
+        )
 
-        payload = {'csys_name': 'ORIG_DEFAULT'}
+    def test_update_mass_properties_vectors(self):
+        """Test vectors are stored as numbers and returned as strings."""
+        mass_props = create_mass_properties(user=self.user)
+
+        payload = {'mass': '[1, 2.5, 3e1]', 'position': '0.5 0 -1'}
         url = detail_url(mass_props.id)
         res = self.client.patch(url, payload)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['mass'], '[1.0, 2.5, 30.0]')
+        self.assertEqual(res.data['cog_lsl'], '')
+        mass_props.refresh_from_db()
+        self.assertEqual(mass_props.mass, [1.0, 2.5, 30.0])
+        self.assertEqual(mass_props.position, [0.5, 0.0, -1.0])
+
+    def test_update_mass_properties_invalid_vector_error(self):
+        """Test vectors with the wrong number of values are rejected."""
+        mass_props = create_mass_properties(user=self.user)
+
+        url = detail_url(mass_props.id)
+        for value in ['[1, 2]', 'heavy', '[1, 2, 3, 4]']:
+            res = self.client.patch(url, {'mass': value})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_to_duplicate_mass_properties_error(self):
+        """Test updating mass properties to match another row fails."""
+        create_mass_properties(user=self.user, csys_name='DEFAULT')
+        mass_props = create_mass_properties(user=self.user, csys_name='OTHER')
+
+        payload = {'csys_name': 'DEFAULT'}
+        url = detail_url(mass_props.id)
+        res = self.client.patch(url, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
         mass_props.refresh_from_db()
-        self.assertEqual(mass_props.csys_name, payload['csys_name'])
+        self.assertEqual(mass_props.csys_name, 'OTHER')
 
     def test_delete_mass_properties(self):
         """Test deleting a component is successful."""
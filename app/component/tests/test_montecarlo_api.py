@@ -0,0 +1,172 @@
+"""
+Tests for the Monte Carlo analysis API.
+"""
+
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import testing
+from core.models import MassProperties
+
+from component import montecarlo
+
+
+def monte_carlo_url(component_id):
+    """Create and return a component Monte Carlo analysis URL."""
+    return reverse('component:component-monte-carlo', args=[component_id])
+
+
+class SamplingTests(SimpleTestCase):
+    """Test sampling part masses."""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.mass = np.array([[1.0, 2.0, 4.0], [5.0, 5.0, 5.0]])
+
+    def test_triangular_samples(self):
+        """Test triangular samples stay in bounds with the right mean."""
+        samples = montecarlo.sample_masses(
+            self.rng, self.mass, 100_000, 'triangular',
+        )
+
+        self.assertEqual(samples.shape, (100_000, 2))
+        self.assertGreaterEqual(samples[:, 0].min(), 1.0)
+        self.assertLessEqual(samples[:, 0].max(), 4.0)
+        self.assertAlmostEqual(samples[:, 0].mean(), 7 / 3, places=2)
+        self.assertTrue(np.all(samples[:, 1] == 5.0))
+
+    def test_pert_samples(self):
+        """Test PERT samples stay in bounds with the right mean."""
+        samples = montecarlo.sample_masses(
+            self.rng, self.mass, 100_000, 'pert',
+        )
+
+        self.assertGreaterEqual(samples[:, 0].min(), 1.0)
+        self.assertLessEqual(samples[:, 0].max(), 4.0)
+        self.assertAlmostEqual(samples[:, 0].mean(), 13 / 6, places=2)
+        self.assertTrue(np.all(samples[:, 1] == 5.0))
+
+
+class PrivateMonteCarloAPITests(testing.ScalingTestMixin, TestCase):
+    """Test authenticated Monte Carlo analysis requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+        self.root, child = testing.create_components(
+            self.user, 2, mass_properties=0, chain=True,
+        )
+        self.root.mass_properties.add(MassProperties.objects.create(
+            user=self.user,
+            csys_name='ROOT',
+            mass=[1, 2, 3],
+            cog_lsl=[0, 0, 0],
+            cog_usl=[0, 0, 0],
+        ))
+        child.mass_properties.add(MassProperties.objects.create(
+            user=self.user,
+            csys_name='CHILD',
+            mass=[2, 2, 2],
+            cog_lsl=[0, 0, 0],
+            cog_usl=[1, 1, 1],
+            xform_matrix=[1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 3, 0, 0, 1],
+        ))
+
+    def test_monte_carlo_distribution(self):
+        """Test sampling the mass and CoG distribution of a subtree."""
+        params = {'samples': 20000, 'bins': 10, 'seed': 1}
+
+        # Not a query per component of the subtree.
+        res = self.assertScales(
+            'component-monte-carlo',
+            lambda size: self.client.get(
+                monte_carlo_url(self.root.id), params,
+            ),
+            lambda count: testing.create_components(
+                self.user, count, self.root, mass_properties=0,
+            ),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['parts'], 2)
+        mass = res.data['mass']
+        self.assertAlmostEqual(mass['mean'], 4.0, places=1)
+        self.assertGreaterEqual(mass['percentiles']['p1'], 3.0)
+        self.assertLessEqual(mass['percentiles']['p99'], 5.0)
+        self.assertEqual(mass['histogram']['edges'][0], 3.0)
+        self.assertEqual(mass['histogram']['edges'][-1], 5.0)
+        self.assertEqual(sum(mass['histogram']['counts']), 20000)
+        self.assertGreater(res.data['cog']['x']['mean'], 1.0)
+        self.assertLess(res.data['cog']['x']['mean'], 2.0)
+
+    def test_monte_carlo_cog_bins_span_the_parts(self):
+        """Test CoG bins cover the parts, not the origin, when far away."""
+        part = testing.create_components(self.user, 1, mass_properties=0)[0]
+        part.mass_properties.add(MassProperties.objects.create(
+            user=self.user,
+            csys_name='FAR',
+            mass=[1, 1, 1],
+            cog_lsl=[100, 0, 0],
+            cog_usl=[101.5, 0, 0],
+        ))
+
+        res = self.client.get(
+            monte_carlo_url(part.id),
+            {'samples': 5000, 'bins': 10, 'seed': 1},
+        )
+
+        histogram = res.data['cog']['x']['histogram']
+        self.assertEqual(histogram['edges'][0], 100.0)
+        self.assertEqual(histogram['edges'][-1], 101.5)
+        self.assertTrue(all(count > 0 for count in histogram['counts']))
+        self.assertEqual(res.data['cog']['y']['histogram']['edges'][0], -0.5)
+
+    def test_monte_carlo_is_reproducible_with_seed(self):
+        """Test the same seed returns the same distribution."""
+        params = {'samples': 1000, 'seed': 7, 'distribution': 'pert'}
+
+        first = self.client.get(monte_carlo_url(self.root.id), params)
+        second = self.client.get(monte_carlo_url(self.root.id), params)
+
+        self.assertEqual(first.data, second.data)
+
+    def test_monte_carlo_shards_across_workers(self):
+        """Test sharded sampling merges all shards."""
+        params = {'samples': 3001, 'bins': 5, 'workers': 2}
+        with self.settings(MONTE_CARLO_MAX_WORKERS=2):
+            res = self.client.get(monte_carlo_url(self.root.id), params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(sum(res.data['mass']['histogram']['counts']), 3001)
+
+    def test_monte_carlo_without_mass(self):
+        """Test sampling a subtree without mass has no CoG."""
+        empty = testing.create_components(self.user, 1, mass_properties=0)[0]
+
+        res = self.client.get(monte_carlo_url(empty.id), {'samples': 10})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['mass']['mean'], 0.0)
+        self.assertIsNone(res.data['cog']['x'])
+
+    def test_monte_carlo_invalid_parameters_error(self):
+        """Test invalid analysis parameters are rejected."""
+        for params in [
+            {'samples': 0},
+            {'samples': 10_000_000},
+            {'distribution': 'normal'},
+        ]:
+            res = self.client.get(monte_carlo_url(self.root.id), params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,89 @@
+"""
+Tests for the lean component read path.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.test import TestCase
+
+from core import testing
+from core.models import Component, MassProperties
+from core.renderers import ORJSONRenderer
+
+from component.readers import serialize_components
+from component.serializers import ComponentSerializer
+
+
+class ComponentReaderTests(TestCase):
+    """Test serializing component lists from plain rows."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        root = testing.create_components(
+            self.user, 1, mass_properties=0, name='Gehäuse',
+        )[0]
+        child = testing.create_components(
+            self.user, 1, root, mass_properties=0, index=3,
+        )[0]
+        testing.create_components(self.user, 1, child, mass_properties=0)
+        shared = MassProperties.objects.create(
+            user=self.user,
+            csys_name='SHARED',
+            mass=[1, 2.5, 3],
+            cog_lsl=[-1e-9, 0, 1e12],
+        )
+        full = MassProperties.objects.create(
+            user=self.user,
+            csys_name='FULL',
+            is_csys_local=False,
+            xform_matrix=[float(i) for i in range(16)],
+            position=[0.1, 0.2, 0.3],
+            mass=[4, 5, 6],
+            cog_lsl=[1, 1, 1],
+            cog_usl=[2, 2, 2],
+        )
+        root.mass_properties.add(full, shared)
+        child.mass_properties.add(shared)
+
+    def serializer_output(self, queryset):
+        """Return the rendered output of `ComponentSerializer`."""
+        queryset = queryset.prefetch_related(Prefetch(
+            'mass_properties',
+            queryset=MassProperties.objects.order_by('id'),
+        ))
+        return ORJSONRenderer().render(
+            ComponentSerializer(queryset, many=True).data,
+        )
+
+    def test_output_matches_serializer(self):
+        """Test the lean output renders to the same bytes."""
+        queryset = Component.objects.filter(user=self.user).order_by('id')
+
+        self.assertEqual(
+            ORJSONRenderer().render(serialize_components(queryset)),
+            self.serializer_output(queryset),
+        )
+
+    def test_keeps_queryset_order(self):
+        """Test components are returned in the order of the queryset."""
+        queryset = Component.objects.filter(user=self.user).order_by('-id')
+
+        self.assertEqual(
+            ORJSONRenderer().render(serialize_components(queryset)),
+            self.serializer_output(queryset),
+        )
+
+    def test_query_count_is_constant(self):
+        """Test components and their mass properties take two queries."""
+        for component in testing.create_components(
+            self.user, 20, mass_properties=0,
+        ):
+            component.mass_properties.set(MassProperties.objects.all())
+
+        with self.assertNumQueries(2):
+            data = serialize_components(Component.objects.all())
+
+        self.assertEqual(len(data), 23)
@@ -0,0 +1,363 @@
+"""
+Tests for the mass property roll-up.
+"""
+
+import time
+from unittest import skipUnless
+
+import numpy as np
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import testing
+from core.management.commands.generate_assembly import generate_assembly
+from core.models import Component, MassProperties
+
+from component import rollup
+
+
+def rollup_url(component_id):
+    """Create and return a component roll-up URL."""
+    return reverse('component:component-rollup', args=[component_id])
+
+
+def massproperties_url(mass_props_id):
+    """Create and return a mass properties detail URL."""
+    return reverse('component:massproperties-detail', args=[mass_props_id])
+
+
+def component_url(component_id):
+    """Create and return a component detail URL."""
+    return reverse('component:component-detail', args=[component_id])
+
+
+def translation(x, y, z):
+    """Return a translation matrix in row-vector convention."""
+    return [1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, x, y, z, 1]
+
+
+class RollupEngineTests(SimpleTestCase):
+    """Test the vectorized roll-up engine."""
+
+    def test_vector_defaults_incomplete_values(self):
+        """Test incomplete vectors are replaced by the default."""
+        self.assertEqual(rollup.vector([1.0, 2.0, 3.0], 3, []), [1, 2, 3])
+        self.assertEqual(rollup.vector([1.0], 3, rollup.ORIGIN), [0, 0, 0])
+
+    def test_transform_bounds_rotation(self):
+        """Test rotating a CoG box returns its new bounding box."""
+        # 90 degrees about z maps x to y and y to -x.
+        xform = np.array([[
+            [0, 1, 0, 0],
+            [-1, 0, 0, 0],
+            [0, 0, 1, 0],
+            [10, 0, 0, 1],
+        ]], dtype=float)
+
+        lower, upper = rollup.transform_bounds(
+            np.array([[1.0, 2.0, 3.0]]),
+            np.array([[2.0, 4.0, 5.0]]),
+            xform,
+        )
+
+        np.testing.assert_allclose(lower, [[6.0, 1.0, 3.0]])
+        np.testing.assert_allclose(upper, [[8.0, 2.0, 5.0]])
+
+    def test_aggregate_sums_up_the_tree(self):
+        """Test totals are accumulated from the leaves to the root."""
+        parent_index = np.array([-1, 0, 1, 0])
+        depth = np.array([0, 1, 2, 1])
+        totals = rollup.aggregate(
+            parent_index,
+            depth,
+            np.array([2, 3]),
+            np.array([[1.0, 2.0, 3.0], [1.0, 1.0, 1.0]]),
+            np.zeros((2, 3)),
+            np.ones((2, 3)),
+            np.tile(np.eye(4), (2, 1, 1)),
+        )
+
+        np.testing.assert_allclose(totals[0, :3], [2.0, 3.0, 4.0])
+        np.testing.assert_allclose(totals[1, :3], [1.0, 2.0, 3.0])
+        np.testing.assert_allclose(totals[0, 6:9], [3.0, 3.0, 3.0])
+        np.testing.assert_allclose(totals[:, 9], [4, 2, 1, 1])
+
+    def test_aggregate_large_tree_is_fast(self):
+        """Test rolling up a 100k node tree takes well under a second."""
+        nodes = 100_000
+        rng = np.random.default_rng(0)
+        depth = np.minimum(np.arange(nodes) // 1000, 30)
+        parent_index = np.where(depth > 0, 0, -1)
+        links = rng.integers(0, nodes, nodes * 2)
+
+        start = time.perf_counter()
+        rollup.aggregate(
+            parent_index,
+            depth,
+            links,
+            rng.random((len(links), 3)),
+            rng.random((len(links), 3)),
+            rng.random((len(links), 3)),
+            np.tile(np.eye(4), (len(links), 1, 1)),
+        )
+
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+
+class PrivateRollupAPITests(testing.ScalingTestMixin, TestCase):
+    """Test authenticated roll-up API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_rollup_applies_transforms(self):
+        """Test rolling up a subtree sums masses and moves CoG bounds."""
+        root = testing.create_components(self.user, 1, mass_properties=0)[0]
+        left, right = testing.create_components(
+            self.user, 2, root, mass_properties=0,
+        )
+        leaf = testing.create_components(
+            self.user, 1, left, mass_properties=0,
+        )[0]
+        left.mass_properties.add(MassProperties.objects.create(
+            user=self.user,
+            csys_name='LEFT',
+            mass=[1, 2, 3],
+            cog_lsl=[0, 0, 0],
+            cog_usl=[1, 1, 1],
+            xform_matrix=translation(10, 0, 0),
+        ))
+        shared = MassProperties.objects.create(
+            user=self.user,
+            csys_name='SHARED',
+            mass=[2, 2, 2],
+            cog_lsl=[0, 0, 0],
+            cog_usl=[0, 0, 0],
+        )
+        right.mass_properties.add(shared)
+        leaf.mass_properties.add(shared)
+
+        # Not a query per component of the subtree.
+        res = self.assertScales(
+            'component-rollup',
+            lambda size: self.client.get(rollup_url(root.id)),
+            lambda count: testing.create_components(
+                self.user, count, right, mass_properties=0,
+            ),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['components'], 4 + testing.SIZES[-1])
+        self.assertEqual(res.data['mass'], [5.0, 6.0, 7.0])
+        np.testing.assert_allclose(res.data['cog_lsl'], [20 / 6, 0, 0])
+        np.testing.assert_allclose(res.data['cog_usl'], [22 / 6, 2 / 6, 2 / 6])
+
+        res = self.client.get(rollup_url(left.id))
+
+        self.assertEqual(res.data['components'], 2)
+        self.assertEqual(res.data['mass'], [3.0, 4.0, 5.0])
+
+    def test_rollup_transforms_are_absolute(self):
+        """Test local and parent CSYS transforms are applied as given."""
+        root, child, leaf = testing.create_components(
+            self.user, 3, mass_properties=0, chain=True,
+        )
+        for component, is_csys_local in ((child, False), (leaf, True)):
+            component.mass_properties.add(MassProperties.objects.create(
+                user=self.user,
+                csys_name=f'CSYS_{component.id}',
+                is_csys_local=is_csys_local,
+                mass=[1, 1, 1],
+                cog_lsl=[0, 0, 0],
+                cog_usl=[0, 0, 0],
+                xform_matrix=translation(10, 0, 0),
+            ))
+
+        res = self.client.get(rollup_url(root.id))
+
+        np.testing.assert_allclose(res.data['cog_lsl'], [10, 0, 0])
+        np.testing.assert_allclose(res.data['cog_usl'], [10, 0, 0])
+
+    def test_rollup_without_mass(self):
+        """Test rolling up a subtree without mass has no CoG."""
+        root = testing.create_components(self.user, 1, mass_properties=0)[0]
+
+        res = self.client.get(rollup_url(root.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['mass'], [0.0, 0.0, 0.0])
+        self.assertIsNone(res.data['cog_lsl'])
+
+    def test_rollup_other_users_component_error(self):
+        """Test rolling up another user's component is not found."""
+        other_user = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123'
+        )
+        root = testing.create_components(other_user, 1, mass_properties=0)[0]
+
+        res = self.client.get(rollup_url(root.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RollupStoreTests(TestCase):
+    """Test caching the roll-ups of a whole tree."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        cls.root = generate_assembly(cls.user, 300, 6, 5, 1.0, seed=0)
+
+    def test_cold_rollup_writes_one_update(self):
+        """Test a cold roll-up caches every total with a single UPDATE."""
+        with CaptureQueriesContext(connection) as queries:
+            rollup.rollup_subtree(self.root)
+
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertFalse(Component.objects.filter(rollup_dirty=True).exists())
+
+
+@skipUnless(
+    testing.budgets_enabled(),
+    'Time budgets are only checked with CHECK_PERF_BUDGETS=1.',
+)
+class RollupBudgetTests(testing.ScalingTestMixin, TestCase):
+    """Test the roll-up time of a tree of realistic size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        cls.root = generate_assembly(cls.user, 20_000, 8, 20, 1.0, seed=0)
+
+    def test_cold_rollup_within_budget(self):
+        """Test a cold roll-up of 20,000 components stays in budget."""
+        def cold_rollup(size):
+            # Roll back, so every roll-up starts from a cold cache.
+            with transaction.atomic():
+                rollup.rollup_subtree(self.root)
+                transaction.set_rollback(True)
+
+        self.assertWithinBudget('component-rollup-cold', cold_rollup)
+
+
+class RollupCacheAPITests(TestCase):
+    """Test the incremental roll-up cache."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+        self.root, self.branch, self.leaf = testing.create_components(
+            self.user, 3, mass_properties=0, chain=True,
+        )
+        self.sibling = testing.create_components(
+            self.user, 1, self.root, mass_properties=0,
+        )[0]
+        self.mass_props = MassProperties.objects.create(
+            user=self.user,
+            csys_name='LEAF',
+            mass=[1, 1, 1],
+        )
+        self.leaf.mass_properties.add(self.mass_props)
+        self.sibling.mass_properties.add(MassProperties.objects.create(
+            user=self.user,
+            csys_name='SIBLING',
+            mass=[2, 2, 2],
+        ))
+        self.client.get(rollup_url(self.root.id))
+
+    def dirty_ids(self):
+        """Return the ids of the components with a stale roll-up."""
+        return set(Component.objects.filter(
+            rollup_dirty=True,
+        ).values_list('id', flat=True))
+
+    def test_rollup_is_cached(self):
+        """Test a second roll-up read recomputes nothing."""
+        self.assertEqual(self.dirty_ids(), set())
+
+        with self.assertNumQueries(6):
+            res = self.client.get(rollup_url(self.root.id))
+
+        self.assertEqual(res.data['components'], 4)
+        self.assertEqual(res.data['mass'], [3.0, 3.0, 3.0])
+
+    def test_mass_properties_update_marks_ancestors(self):
+        """Test updating mass properties only marks its ancestor chain."""
+        payload = {'mass': '[5, 5, 5]'}
+        self.client.patch(massproperties_url(self.mass_props.id), payload)
+
+        self.assertEqual(
+            self.dirty_ids(),
+            {self.root.id, self.branch.id, self.leaf.id},
+        )
+        res = self.client.get(rollup_url(self.root.id))
+        self.assertEqual(res.data['mass'], [7.0, 7.0, 7.0])
+        self.assertEqual(self.dirty_ids(), set())
+
+    def test_mass_properties_delete_marks_ancestors(self):
+        """Test deleting mass properties marks its ancestor chain."""
+        self.client.delete(massproperties_url(self.mass_props.id))
+
+        self.assertEqual(
+            self.dirty_ids(),
+            {self.root.id, self.branch.id, self.leaf.id},
+        )
+        res = self.client.get(rollup_url(self.root.id))
+        self.assertEqual(res.data['mass'], [2.0, 2.0, 2.0])
+
+    def test_component_update_marks_ancestors(self):
+        """Test changing a component's mass properties marks its chain."""
+        payload = {'mass_properties': [{'csys_name': 'SIBLING'}]}
+        self.client.patch(
+            component_url(self.leaf.id),
+            payload,
+            format='json',
+        )
+
+        self.assertEqual(
+            self.dirty_ids(),
+            {self.root.id, self.branch.id, self.leaf.id},
+        )
+
+    def test_component_rename_keeps_cache(self):
+        """Test editing other component fields keeps the cache."""
+        self.client.patch(component_url(self.leaf.id), {'name': 'Renamed'})
+
+        self.assertEqual(self.dirty_ids(), set())
+
+    def test_component_delete_marks_ancestors(self):
+        """Test deleting a component marks its ancestors stale."""
+        self.client.delete(component_url(self.sibling.id))
+
+        self.assertEqual(self.dirty_ids(), {self.root.id})
+        res = self.client.get(rollup_url(self.root.id))
+        self.assertEqual(res.data['components'], 3)
+        self.assertEqual(res.data['mass'], [1.0, 1.0, 1.0])
@@ -0,0 +1,214 @@
+"""
+Tests for the component search API.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import testing
+from core.models import Component, MassProperties
+
+from component.search import (
+    linked_matches,
+    ranked_matches,
+    search_components,
+    search_query,
+)
+
+
+SEARCH_URL = reverse('component:component-search')
+
+
+class ComponentSearchAPITests(testing.ScalingTestMixin, TestCase):
+    """Test searching components."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def names(self, q, **params):
+        """Return the names of the components found for a search."""
+        res = self.client.get(SEARCH_URL, {'q': q, 'fields': 'name', **params})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [component['name'] for component in res.data]
+
+    def test_search_by_name_prefixes(self):
+        """Test every word of a search matches the start of a name word."""
+        testing.create_components(self.user, 1, name='BRACKET_LH_001')
+        testing.create_components(self.user, 1, name='BRACKET_RH_001')
+        testing.create_components(self.user, 1, name='Hinge')
+
+        self.assertEqual(self.names('brack lh'), ['BRACKET_LH_001'])
+        self.assertEqual(
+            self.names('Bracket'),
+            ['BRACKET_LH_001', 'BRACKET_RH_001'],
+        )
+        self.assertEqual(self.names('racket'), [])
+
+    def test_search_type_description_and_csys_name(self):
+        """Test searching types, descriptions and CSYS names."""
+        testing.create_components(self.user, 1, name='A', type='FASTENER')
+        testing.create_components(
+            self.user, 1, name='B', description='Titanium bolt',
+        )
+        linked = testing.create_components(self.user, 1, name='C')[0]
+        linked.mass_properties.add(
+            MassProperties.objects.create(user=self.user, csys_name='CS_PIN'),
+        )
+
+        self.assertEqual(self.names('fasten'), ['A'])
+        self.assertEqual(self.names('titan'), ['B'])
+        self.assertEqual(self.names('cs_pin'), ['C'])
+
+    def test_name_matches_rank_first(self):
+        """Test name matches rank above description and CSYS matches."""
+        by_csys = testing.create_components(self.user, 1, name='Linked')[0]
+        by_csys.mass_properties.add(
+            MassProperties.objects.create(user=self.user, csys_name='PANEL'),
+        )
+        testing.create_components(
+            self.user, 1, name='Cover', description='Side panel',
+        )
+        testing.create_components(self.user, 1, name='Panel')
+
+        self.assertEqual(self.names('panel'), ['Panel', 'Cover', 'Linked'])
+
+    def test_search_limit(self):
+        """Test the number of results is limited."""
+        testing.create_components(self.user, 5, name='Rib')
+
+        self.assertEqual(len(self.names('rib', limit=3)), 3)
+
+    def test_search_limited_to_user(self):
+        """Test only the authenticated user's components are found."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123'
+        )
+        component = testing.create_components(other, 1, name='Spar')[0]
+        component.mass_properties.add(
+            MassProperties.objects.create(user=other, csys_name='SPAR'),
+        )
+
+        self.assertEqual(self.names('spar'), [])
+
+    def test_invalid_search_rejected(self):
+        """Test searches without words or over the limit are rejected."""
+        for params in ({}, {'q': ' *& '}, {'q': 'rib', 'limit': 0}):
+            res = self.client.get(SEARCH_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_limit_capped(self):
+        """Test the limit may not exceed SEARCH_MAX_RESULTS."""
+        res = self.client.get(SEARCH_URL, {
+            'q': 'rib',
+            'limit': settings.SEARCH_MAX_RESULTS + 1,
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_sees_changes(self):
+        """Test renamed components are found by their new name."""
+        component = testing.create_components(self.user, 1, name='Rib')[0]
+        self.names('spar')
+
+        component.name = 'Spar'
+        component.save()
+
+        self.assertEqual(self.names('spar'), ['Spar'])
+
+    def test_search_scales(self):
+        """Test searches run the same queries at any number of matches."""
+        self.assertScales(
+            'component-search',
+            lambda size: self.client.get(SEARCH_URL, {
+                'q': 'component',
+                'limit': size,
+            }),
+            lambda size: testing.create_components(self.user, size),
+        )
+
+
+class ComponentSearchIndexTests(TestCase):
+    """Test searches are answered from the GIN indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            get_user_model().objects.create_user(
+                email=f'user{i}@example.com',
+                password='testpass123'
+            )
+            for i in range(2)
+        ]
+        cls.user = users[0]
+        components = Component.objects.bulk_create(
+            Component(
+                user=user,
+                name=f'PART_{i}',
+                version='1.0',
+                type='PART',
+                level=0,
+                index=i,
+                skeleton='Skeleton Model',
+            )
+            for i in range(5000)
+            for user in users
+        )
+        mass_properties = MassProperties.objects.bulk_create(
+            MassProperties(
+                user=user,
+                csys_name=f'CSYS_{i}',
+                content_hash=f'{i}',
+            )
+            for i in range(5000)
+            for user in users
+        )
+        Through = Component.mass_properties.through
+        Through.objects.bulk_create(
+            Through(component=component, massproperties=mass_props)
+            for component, mass_props in zip(components, mass_properties)
+        )
+        with connection.cursor() as cursor:
+            # Merge the pending GIN entries, as autovacuum would.
+            for index in ('core_component_search_idx',
+                          'core_massprops_search_idx'):
+                cursor.execute(
+                    'SELECT gin_clean_pending_list(%s::regclass)', [index],
+                )
+            cursor.execute(
+                'ANALYZE core_component, core_massproperties, '
+                'core_component_mass_properties'
+            )
+
+    def test_search_uses_indexes(self):
+        """Test both the component and mass properties indexes are used."""
+        query = search_query('421')
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+        plan = ranked_matches(self.user, query)[:20].explain()
+        self.assertIn('core_component_search_idx', plan)
+        plan = linked_matches(self.user, query).explain()
+        self.assertIn('core_massprops_search_idx', plan)
+
+    def test_search_queries(self):
+        """Test a search reads only the components it returns."""
+        with CaptureQueriesContext(connection) as queries:
+            components = list(search_components(self.user, '421', 20))
+
+        self.assertEqual(len(components), 11)
+        self.assertEqual(len(queries), 3)
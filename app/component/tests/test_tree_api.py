@@ -0,0 +1,443 @@
+"""
+Tests for the component tree APIs.
+"""
+
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import testing
+from core.models import Component
+
+
+def tree_url(component_id, action):
+    """Create and return a tree action URL for a component."""
+    return reverse(f'component:component-{action}', args=[component_id])
+
+
+def detail_url(component_id):
+    """Create and return a component detail URL."""
+    return reverse('component:component-detail', args=[component_id])
+
+
+class ComponentPathTests(TestCase):
+    """Test maintaining the materialized path of components."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+
+    def test_create_builds_path(self):
+        """Test creating components builds their path from the root."""
+        chain = []
+        for i in range(3):
+            chain.append(Component.objects.create(
+                user=self.user,
+                parent=chain[-1].id if chain else None,
+                name=str(i),
+                version='1.0',
+                type='PART',
+                level=i,
+                index=0,
+                skeleton='Skeleton Model',
+            ))
+        root, child, grandchild = chain
+
+        self.assertEqual(root.path, f'/{root.id}/')
+        self.assertEqual(child.path, f'/{root.id}/{child.id}/')
+        grandchild.refresh_from_db()
+        self.assertEqual(
+            grandchild.path,
+            f'/{root.id}/{child.id}/{grandchild.id}/',
+        )
+        self.assertEqual(grandchild.ancestor_ids, [root.id, child.id])
+
+    def test_reparent_rewrites_descendant_paths(self):
+        """Test moving a component rewrites the paths below it."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+        other_root = testing.create_components(self.user, 1)[0]
+
+        child.parent = other_root.id
+        child.save()
+
+        grandchild.refresh_from_db()
+        self.assertEqual(
+            grandchild.path,
+            f'/{other_root.id}/{child.id}/{grandchild.id}/',
+        )
+
+    def test_reparent_recomputes_levels(self):
+        """Test moving a component recomputes its and its subtree's levels."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+        other_child = testing.create_components(self.user, 2, chain=True)[1]
+
+        child.parent = other_child.id
+        child.save()
+
+        grandchild.refresh_from_db()
+        self.assertEqual((child.level, grandchild.level), (2, 3))
+        self.assertEqual(grandchild.revision, 2)
+
+        child.parent = None
+        child.save()
+
+        grandchild.refresh_from_db()
+        self.assertEqual((child.level, grandchild.level), (0, 1))
+
+    def test_reparent_below_descendant_raises_error(self):
+        """Test moving a component below its own subtree raises an error."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+
+        root.parent = grandchild.id
+        with self.assertRaises(ValueError):
+            root.save()
+
+    def test_move_subtree_rewrites_paths_and_levels(self):
+        """Test moving a subtree rewrites its paths and levels."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+        other_root = testing.create_components(self.user, 1)[0]
+        other_child = testing.create_components(self.user, 1, other_root)[0]
+
+        moved = Component.objects.move_subtree(child, other_child.id)
+
+        grandchild.refresh_from_db()
+        self.assertEqual(moved.parent, other_child.id)
+        self.assertEqual(moved.level, 2)
+        self.assertEqual(grandchild.level, 3)
+        self.assertEqual(
+            grandchild.path,
+            f'/{other_root.id}/{other_child.id}/{child.id}/{grandchild.id}/',
+        )
+        self.assertEqual(grandchild.revision, 2)
+
+    def test_move_subtree_to_root(self):
+        """Test moving a subtree without a parent makes it a root."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+
+        moved = Component.objects.move_subtree(child, None)
+
+        grandchild.refresh_from_db()
+        self.assertIsNone(moved.parent)
+        self.assertEqual(moved.path, f'/{child.id}/')
+        self.assertEqual((moved.level, grandchild.level), (0, 1))
+
+    def test_move_subtree_into_itself_raises_error(self):
+        """Test moving a component below its own subtree raises an error."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+
+        for parent in (root, grandchild):
+            with self.assertRaises(ValueError):
+                Component.objects.move_subtree(root, parent.id)
+
+        grandchild.refresh_from_db()
+        self.assertEqual(grandchild.path, f'/{root.id}/{child.id}/{grandchild.id}/')  # noqa: E501
+
+    def test_move_subtree_places_among_siblings(self):
+        """Test a moved component is appended or inserted among siblings."""
+        root = testing.create_components(self.user, 1)[0]
+        siblings = testing.create_components(self.user, 3, root)
+        first = testing.create_components(self.user, 1)[0]
+        second = testing.create_components(self.user, 1)[0]
+
+        Component.objects.move_subtree(first, root.id)
+        Component.objects.move_subtree(second, root.id, index=1)
+
+        self.assertEqual(
+            list(Component.objects.filter(
+                parent=root.id,
+            ).order_by('index').values_list('id', flat=True)),
+            [siblings[0].id, second.id, siblings[1].id, siblings[2].id,
+             first.id],
+        )
+
+    def test_move_subtree_marks_rollups_dirty(self):
+        """Test moving a subtree marks the old and new ancestors stale."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+        other_root = testing.create_components(self.user, 1)[0]
+        Component.objects.update(rollup_dirty=False)
+
+        Component.objects.move_subtree(child, other_root.id)
+
+        self.assertEqual(
+            set(Component.objects.filter(
+                rollup_dirty=True,
+            ).values_list('id', flat=True)),
+            {root.id, child.id, other_root.id},
+        )
+
+    def test_delete_reroots_orphaned_subtrees(self):
+        """Test deleting a component makes its children new roots."""
+        root, child, grandchild, leaf = testing.create_components(
+            self.user, 4, chain=True,
+        )
+
+        child.delete()
+
+        grandchild.refresh_from_db()
+        leaf.refresh_from_db()
+        self.assertEqual(grandchild.path, f'/{grandchild.id}/')
+        self.assertIsNone(grandchild.parent)
+        self.assertEqual(grandchild.level, 0)
+        self.assertEqual(leaf.path, f'/{grandchild.id}/{leaf.id}/')
+        self.assertEqual(leaf.parent, grandchild.id)
+        self.assertEqual(leaf.level, 1)
+
+    def test_subtree_lookup_uses_path_index(self):
+        """Test subtree lookups are answered from the path index."""
+        root = testing.create_components(self.user, 3, chain=True)[0]
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = Component.objects.filter(path__startswith=root.path).explain()
+
+        self.assertIn('core_component_path_idx', plan)
+
+
+class PrivateComponentTreeAPITests(testing.ScalingTestMixin, TestCase):
+    """Test authenticated component tree API requests."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_children(self):
+        """Test listing the direct children of a component."""
+        root = testing.create_components(self.user, 1)[0]
+        children = []
+
+        def grow(count):
+            children.extend(testing.create_components(self.user, count, root))
+            testing.create_components(self.user, 1, children[0])
+
+        res = self.assertScales(
+            'component-children',
+            lambda size: self.client.get(tree_url(root.id, 'children')),
+            grow,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [c['id'] for c in res.data['results']],
+            [c.id for c in children],
+        )
+
+    def test_subtree_of_deep_tree(self):
+        """Test listing a deep subtree in a fixed number of queries."""
+        chain = []
+        testing.create_components(self.user, 1)[0]
+
+        def grow(count):
+            chain.extend(testing.create_components(
+                self.user, count, chain[-1] if chain else None, chain=True,
+            ))
+
+        self.assertScales(
+            'component-subtree',
+            lambda size: self.client.get(tree_url(chain[0].id, 'subtree')),
+            grow,
+        )
+
+        # Two ETag aggregates, the component, the page and the links.
+        with self.assertNumQueries(6):
+            res = self.client.get(tree_url(chain[5].id, 'subtree'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [c['id'] for c in res.data['results']],
+            [c.id for c in chain[5:]],
+        )
+
+    def test_stream_subtree(self):
+        """Test streaming a subtree returns all of its components."""
+        chain = testing.create_components(self.user, 5, chain=True)
+        testing.create_components(self.user, 1)[0]
+
+        res = self.client.get(
+            tree_url(chain[1].id, 'subtree'),
+            {'stream': 'true'},
+        )
+
+        content = json.loads(b''.join(res.streaming_content))
+        self.assertEqual(
+            [c['id'] for c in content],
+            [c.id for c in chain[1:]],
+        )
+
+    def test_ancestors_of_deep_tree(self):
+        """Test listing the ancestors of a deep component, root first."""
+        chain = []
+
+        def grow(count):
+            chain.extend(testing.create_components(
+                self.user, count, chain[-1] if chain else None, chain=True,
+            ))
+
+        def ancestors(size):
+            with self.assertNumQueries(4):
+                return self.client.get(tree_url(chain[-1].id, 'ancestors'))
+
+        res = self.assertScales(
+            'component-ancestors',
+            ancestors,
+            grow,
+            sizes=(2, 10, 50),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [c['id'] for c in res.data],
+            [c.id for c in chain[:-1]],
+        )
+
+    def test_reparent_to_descendant_error(self):
+        """Test updating the parent to a descendant returns an error."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+
+        res = self.client.patch(detail_url(root.id), {'parent': grandchild.id})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        root.refresh_from_db()
+        self.assertIsNone(root.parent)
+
+    def test_reparent_updates_subtree(self):
+        """Test updating the parent moves the whole subtree."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+        other_root = testing.create_components(self.user, 1)[0]
+
+        payload = {'parent': other_root.id}
+        res = self.client.patch(detail_url(child.id), payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get(tree_url(other_root.id, 'subtree'))
+        self.assertEqual(
+            sorted((c['id'], c['level']) for c in res.data['results']),
+            sorted([(other_root.id, 0), (child.id, 1), (grandchild.id, 2)]),
+        )
+
+    def test_move(self):
+        """Test moving a component returns it below its new parent."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+        other_root = testing.create_components(self.user, 1)[0]
+
+        res = self.client.post(
+            tree_url(child.id, 'move'),
+            {'parent': other_root.id, 'index': 0},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['parent'], other_root.id)
+        self.assertEqual(res.data['level'], 1)
+        res = self.client.get(tree_url(other_root.id, 'subtree'))
+        self.assertEqual(
+            [(c['id'], c['level']) for c in res.data['results']],
+            [(child.id, 1), (grandchild.id, 2), (other_root.id, 0)],
+        )
+
+    def test_move_to_root(self):
+        """Test moving a component to a null parent makes it a root."""
+        root, child = testing.create_components(self.user, 2, chain=True)
+
+        res = self.client.post(
+            tree_url(child.id, 'move'),
+            {'parent': None},
+            format='json',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(res.data['parent'])
+        self.assertEqual(res.data['level'], 0)
+
+    def test_move_into_own_subtree_error(self):
+        """Test moving a component below its own subtree returns an error."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+
+        res = self.client.post(
+            tree_url(root.id, 'move'),
+            {'parent': grandchild.id},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('parent', res.data)
+
+    def test_move_below_other_users_component_error(self):
+        """Test moving a component below another user's one fails."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='testpass123'
+        )
+        component = testing.create_components(self.user, 1)[0]
+
+        res = self.client.post(
+            tree_url(component.id, 'move'),
+            {'parent': testing.create_components(other, 1)[0].id},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_move_invalidates_cached_subtree(self):
+        """Test moving a component changes the cached subtree and ETag."""
+        root, child, grandchild = testing.create_components(
+            self.user, 3, chain=True,
+        )
+        before = self.client.get(tree_url(child.id, 'subtree'))
+
+        self.client.post(tree_url(child.id, 'move'), {'parent': ''})
+
+        res = self.client.get(
+            tree_url(child.id, 'subtree'),
+            HTTP_IF_NONE_MATCH=before['ETag'],
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [c['level'] for c in res.data['results']],
+            [0, 1],
+        )
+
+    def test_move_scales(self):
+        """Test moving a subtree runs a flat query count as it grows."""
+        root = testing.create_components(self.user, 1)[0]
+        targets = testing.create_components(self.user, 2)
+        moves = iter(targets * 10)
+
+        self.assertScales(
+            'component-move',
+            lambda size: self.client.post(
+                tree_url(root.id, 'move'),
+                {'parent': next(moves).id},
+            ),
+            lambda count: testing.create_components(self.user, count, root),
+        )
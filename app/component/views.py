@@ -2,38 +2,255 @@
 Views for the Component APIs.
 """
 
-from rest_framework import viewsets, mixins                         # type: ignore  # noqa: E501
-from rest_framework.authentication import TokenAuthentication       # type: ignore  # noqa: E501
+from django.db.models import Prefetch, Subquery
+from django.db.models.functions import Length
+
+from rest_framework import viewsets, mixins, status                 # type: ignore  # noqa: E501
+from rest_framework.decorators import action                        # type: ignore  # noqa: E501
+from rest_framework.exceptions import ValidationError               # type: ignore  # noqa: E501
+from rest_framework.response import Response                        # type: ignore  # noqa: E501
 from rest_framework.permissions import IsAuthenticated              # type: ignore  # noqa: E501
 
+from core.authentication import CachedTokenAuthentication
+from core.metrics import measure
 from core.models import Component, MassProperties
 from component import serializers
+from component.caching import cache_response, etag_response
+from component.montecarlo import analyze_subtree
+from component.projection import SparseFieldsMixin
+from component.readers import (
+    component_rows,
+    serialize_components,
+    serialize_rows,
+)
+from component.rollup import rollup_subtree
+from component.search import search_components
+from component.streaming import streaming_response
 
 
-class ComponentViewSet(viewsets.ModelViewSet):
+class ComponentViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     """View for manage component APIs."""
     serializer_class = serializers.ComponentDetailSerializer
     queryset = Component.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         """Retrieve the component for the authenticated user."""
-        return self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(
+            user=self.request.user
+        ).order_by('id')
+
+        fields = self.get_selected_fields()
+        if self.action == 'retrieve' and fields is not None:
+            queryset = queryset.only('id', *[
+                field for field in fields if field != 'mass_properties'
+            ])
+        if fields is None or 'mass_properties' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'mass_properties',
+                queryset=MassProperties.objects.order_by('id'),
+            ))
+
+        return queryset
 
     def get_serializer_class(self):
         """Return the serializer class for request."""
-        if self.action == 'list':
+        if self.action in (
+            'list', 'children', 'subtree', 'ancestors', 'search',
+        ):
             return serializers.ComponentSerializer
+        elif self.action == 'bulk_import':
+            return serializers.ComponentImportSerializer
 
         return self.serializer_class
 
+    def filter_queryset(self, queryset):
+        """Filter the component list by the given query parameters.
+
+        `?skeleton=`, `?type=`, `?level=`, `?parent=` and `?version=` are
+        exact matches, answered from the composite indexes on the user's
+        components.
+        """
+        queryset = super().filter_queryset(queryset)
+        if self.action == 'list':
+            params = serializers.ComponentFilterSerializer(
+                data=self.request.query_params,
+            )
+            params.is_valid(raise_exception=True)
+            queryset = queryset.filter(**params.validated_data)
+
+        return queryset
+
+    def get_etag_queryset(self):
+        """Return the components the response of the action is made of."""
+        queryset = self.get_queryset()
+        if self.action == 'retrieve':
+            return queryset.filter(pk=self.kwargs['pk'])
+        if self.action == 'subtree':
+            return queryset.filter(path__startswith=Subquery(
+                queryset.filter(pk=self.kwargs['pk']).values('path'),
+            ))
+
+        return self.filter_queryset(queryset)
+
+    def _list_response(self, queryset):
+        """Return a page of the queryset, or all of it with ?stream=true.
+
+        Lists are read through `component.readers`, which produces the
+        output of `ComponentSerializer` from plain rows.
+        """
+        fields = self.get_selected_fields()
+        rows = component_rows(queryset, fields)
+        stream = self.request.query_params.get('stream', '').lower()
+        if stream in ('1', 'true', 'yes'):
+            return streaming_response(
+                rows,
+                lambda chunk: serialize_rows(chunk, fields),
+            )
+
+        page = self.paginate_queryset(rows)
+        with measure('serialize'):
+            data = serialize_rows(page, fields)
+
+        return self.get_paginated_response(data)
+
+    @etag_response
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        """List the components of the authenticated user."""
+        return self._list_response(self.filter_queryset(self.get_queryset()))
+
+    @etag_response
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a component of the authenticated user."""
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """Create a new component."""
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        """Delete a component and mark its ancestors' roll-ups stale."""
+        path = instance.path
+        instance.delete()
+        Component.objects.mark_rollup_dirty([path])
+
+    @action(methods=['GET'], detail=True)
+    def children(self, request, pk=None):
+        """List the direct children of a component."""
+        component = self.get_object()
+        queryset = self.get_queryset().filter(parent=component.id)
+
+        return self._list_response(queryset)
+
+    @action(methods=['GET'], detail=True)
+    @etag_response
+    @cache_response
+    def subtree(self, request, pk=None):
+        """List a component and all of its descendants."""
+        component = self.get_object()
+        queryset = self.get_queryset().filter(
+            path__startswith=component.path,
+        )
+
+        return self._list_response(queryset)
+
+    @action(methods=['GET'], detail=True)
+    def ancestors(self, request, pk=None):
+        """List the ancestors of a component, from the root down."""
+        component = self.get_object()
+        queryset = self.get_queryset().filter(
+            id__in=component.ancestor_ids,
+        ).order_by(Length('path'))
+
+        with measure('serialize'):
+            data = serialize_components(queryset, self.get_selected_fields())
+
+        return Response(data)
+
+    @action(methods=['POST'], detail=False, url_path='bulk-delete')
+    def bulk_delete(self, request):
+        """Delete components, or whole subtrees, in a single request."""
+        params = serializers.ComponentBulkDeleteSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        components, mass_properties = Component.objects.delete_many(
+            request.user,
+            **params.validated_data,
+        )
+
+        return Response({
+            'components': components,
+            'mass_properties': mass_properties,
+        })
+
+    @action(methods=['POST'], detail=True)
+    def move(self, request, pk=None):
+        """Move a component and its subtree below another parent."""
+        component = self.get_object()
+        params = serializers.ComponentMoveSerializer(
+            component,
+            data=request.data,
+        )
+        params.is_valid(raise_exception=True)
+        try:
+            component = Component.objects.move_subtree(
+                component,
+                **params.validated_data,
+            )
+        except ValueError as exc:
+            raise ValidationError({'parent': [str(exc)]})
+
+        return Response(self.get_serializer(component).data)
+
+    @action(methods=['GET'], detail=False)
+    @cache_response
+    def search(self, request):
+        """Search components by name, type, description and CSYS name."""
+        params = serializers.ComponentSearchSerializer(
+            data=request.query_params,
+        )
+        params.is_valid(raise_exception=True)
+        queryset = search_components(
+            request.user,
+            params.validated_data['q'],
+            params.validated_data['limit'],
+        )
+
+        with measure('serialize'):
+            data = serialize_components(queryset, self.get_selected_fields())
+
+        return Response(data)
+
+    @action(methods=['GET'], detail=True)
+    def rollup(self, request, pk=None):
+        """Roll the mass properties of a component's subtree up to it."""
+        component = self.get_object()
+
+        return Response({'id': component.id, **rollup_subtree(component)})
+
+    @action(methods=['GET'], detail=True, url_path='monte-carlo')
+    def monte_carlo(self, request, pk=None):
+        """Sample the mass and CoG distribution of a component's subtree."""
+        component = self.get_object()
+        params = serializers.MonteCarloSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        return Response(analyze_subtree(component, **params.validated_data))
+
+    @action(methods=['POST'], detail=False, url_path='bulk-import')
+    def bulk_import(self, request):
+        """Create a whole component tree in a single request."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=self.request.user)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
 class MassPropertiesViewSet(
+                                SparseFieldsMixin,
                                 mixins.DestroyModelMixin,
                                 mixins.UpdateModelMixin,
                                 mixins.ListModelMixin,
@@ -42,9 +259,32 @@ class MassPropertiesViewSet(
     """Manage mass properties in the database."""
     serializer_class = serializers.MassPropertiesSerializer
     queryset = MassProperties.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         """Filter queryset to authenticated user."""
-        return self.queryset.filter(user=self.request.user).order_by('id')
+        queryset = self.queryset.filter(user=self.request.user).order_by('id')
+        fields = self.get_selected_fields()
+        if fields is not None:
+            queryset = queryset.only(*fields)
+
+        return queryset
+
+    def _linked_component_paths(self, instance):
+        """Return the paths of the components using the mass properties."""
+        return list(Component.objects.filter(
+            mass_properties=instance,
+        ).values_list('path', flat=True))
+
+    def perform_update(self, serializer):
+        """Update mass properties and mark the affected roll-ups stale."""
+        paths = self._linked_component_paths(serializer.instance)
+        serializer.save()
+        Component.objects.mark_rollup_dirty(paths)
+
+    def perform_destroy(self, instance):
+        """Delete mass properties and mark the affected roll-ups stale."""
+        paths = self._linked_component_paths(instance)
+        instance.delete()
+        Component.objects.mark_rollup_dirty(paths)
@@ -4,9 +4,12 @@ Django admin customization.
 
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.http import FileResponse, Http404
+from django.urls import path, reverse
+from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 
-from core import models
+from core import models, profiling
 
 
 class UserAdmin(BaseUserAdmin):
@@ -44,6 +47,79 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Define the admin pages for request profiles."""
+    list_display = [
+        'created_at', 'method', 'path', 'status_code', 'duration',
+        'query_count', 'query_time', 'user', 'downloads',
+    ]
+    list_filter = ['route', 'method', 'status_code']
+    search_fields = ['path', 'user__email']
+    readonly_fields = [
+        'user', 'created_at', 'method', 'path', 'route', 'status_code',
+        'duration', 'query_count', 'query_time', 'downloads',
+    ]
+    exclude = ['name']
+    files = {
+        'profile': profiling.PROFILE_SUFFIX,
+        'queries': profiling.QUERIES_SUFFIX,
+    }
+
+    def has_module_permission(self, request):
+        return request.user.is_active and request.user.is_staff
+
+    def has_view_permission(self, request, obj=None):
+        return request.user.is_active and request.user.is_staff
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:object_id>/download/<str:kind>/',
+                self.admin_site.admin_view(self.download),
+                name='core_requestprofile_download',
+            ),
+            *super().get_urls(),
+        ]
+
+    @admin.display(description=_('Downloads'))
+    def downloads(self, obj):
+        return format_html(
+            '<a href="{}">{}</a> / <a href="{}">{}</a>',
+            reverse('admin:core_requestprofile_download',
+                    args=[obj.id, 'profile']),
+            _('Profile'),
+            reverse('admin:core_requestprofile_download',
+                    args=[obj.id, 'queries']),
+            _('SQL'),
+        )
+
+    def download(self, request, object_id, kind):
+        """Return a file of a profile as an attachment."""
+        profile = self.get_object(request, object_id)
+        if (
+            profile is None or kind not in self.files or
+            not self.has_view_permission(request, profile)
+        ):
+            raise Http404
+
+        file_path = profiling.profile_path(profile.name, self.files[kind])
+        if not file_path.exists():
+            raise Http404
+
+        return FileResponse(
+            open(file_path, 'rb'),
+            as_attachment=True,
+            filename=f'profile-{profile.id}{self.files[kind]}',
+        )
+
+
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.Component)
 admin.site.register(models.MassProperties)
+admin.site.register(models.RequestProfile, RequestProfileAdmin)
@@ -0,0 +1,115 @@
+"""
+Token authentication with an in-process cache and expiring tokens.
+
+Token lookups are cached per process for TOKEN_CACHE_TIMEOUT seconds, so
+a revoked token or deactivated user stops working in this process at
+once and in every other worker within that time.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.authentication import TokenAuthentication      # type: ignore  # noqa: E501
+from rest_framework.authtoken.models import Token                   # type: ignore  # noqa: E501
+from rest_framework.exceptions import AuthenticationFailed          # type: ignore  # noqa: E501
+
+
+class TTLCache:
+    """Thread-safe mapping evicting the least recently used entries.
+
+    Entries also expire `timeout` seconds after they were stored.
+    """
+
+    def __init__(self, maxsize, timeout, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return the value stored for the key, or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= self.clock():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store a value for the key, evicting the oldest if full."""
+        with self.lock:
+            self.entries[key] = (value, self.clock() + self.timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        """Remove the entry of the key, if any."""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def discard_where(self, predicate):
+        """Remove the entries whose value matches the predicate."""
+        with self.lock:
+            for key in [
+                key for key, (value, _) in self.entries.items()
+                if predicate(value)
+            ]:
+                del self.entries[key]
+
+    def clear(self):
+        """Remove all entries."""
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TTLCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TIMEOUT)
+
+
+def token_expired(token):
+    """Return whether a token is older than TOKEN_EXPIRY."""
+    if settings.TOKEN_EXPIRY is None:
+        return False
+
+    return token.created + settings.TOKEN_EXPIRY <= timezone.now()
+
+
+def rotate_token(user):
+    """Revoke the tokens of a user and return a new one."""
+    Token.objects.filter(user=user).delete()
+    return Token.objects.create(user=user)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication caching lookups and rejecting expired tokens.
+
+    Each request gets its own copy of the cached user, so requests do not
+    share model instances.
+    """
+
+    def authenticate_credentials(self, key):
+        entry = token_cache.get(key)
+        if entry is None:
+            entry = super().authenticate_credentials(key)
+            token_cache.set(key, entry)
+
+        user, token = entry
+        if token_expired(token):
+            token_cache.discard(key)
+            raise AuthenticationFailed(_('Token has expired.'))
+
+        return copy.copy(user), token
@@ -0,0 +1,61 @@
+"""
+Versions of the data of each user, keying the cache of API responses.
+
+Responses are cached under the version of the requesting user's data.
+Signal handlers bump the version whenever one of the user's components or
+mass properties changes, which invalidates all of their cached responses
+at once; the old entries are left for the cache to evict.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def get_cache():
+    """Return the cache of API responses."""
+    return caches[settings.RESPONSE_CACHE]
+
+
+def version_key(user_id):
+    return f'version:{user_id}'
+
+
+def get_version(user_id):
+    """Return the current version of the user's data."""
+    cache = get_cache()
+    version = cache.get(version_key(user_id))
+    if version is None:
+        # Evicted versions restart from the clock, never from a value
+        # older entries may still be cached under.
+        cache.add(version_key(user_id), time.time_ns(), timeout=None)
+        version = cache.get(version_key(user_id))
+
+    return version
+
+
+def _bump_version(user_id):
+    cache = get_cache()
+    try:
+        cache.incr(version_key(user_id))
+    except ValueError:
+        cache.set(version_key(user_id), time.time_ns(), timeout=None)
+
+
+def invalidate_user(user_id):
+    """Invalidate the cached responses of a user.
+
+    The version is bumped again on commit, so responses read from the old
+    rows while the transaction was open are not served afterwards.
+    """
+    _bump_version(user_id)
+    transaction.on_commit(lambda: _bump_version(user_id))
+
+
+def response_key(user_id, url):
+    """Return the cache key of the response to a user's request."""
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f'response:{user_id}:{get_version(user_id)}:{digest}'
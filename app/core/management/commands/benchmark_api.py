@@ -0,0 +1,292 @@
+"""
+Django command to benchmark the component APIs on a synthetic assembly.
+"""
+
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient     # type: ignore
+
+from core.management.commands.generate_assembly import (
+    generate_assembly,
+    mass_properties,
+)
+from core.models import Component
+
+
+PERCENTILES = [50, 90, 95, 99]
+
+
+def percentile(values, q):
+    """Return the q-th percentile of the values, interpolated linearly."""
+    values = sorted(values)
+    rank = (len(values) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def summarize(timings, queries, statuses):
+    """Return latency percentiles, throughput and query counts of a run."""
+    total = sum(timings)
+    result = {
+        'iterations': len(timings),
+        'mean_ms': statistics.fmean(timings) * 1000,
+        'min_ms': min(timings) * 1000,
+        'max_ms': max(timings) * 1000,
+        'throughput_rps': len(timings) / total if total else None,
+        'queries': max(queries),
+        'statuses': sorted(set(statuses)),
+    }
+    for q in PERCENTILES:
+        result[f'p{q}_ms'] = percentile(timings, q) * 1000
+
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Return the regressions of the results against a baseline run.
+
+    A scenario regresses when its median latency grows by more than the
+    tolerance, as a fraction of the baseline, or it runs more queries.
+    """
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        if current['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append(
+                f'{name}: p50 {previous["p50_ms"]:.2f}ms -> '
+                f'{current["p50_ms"]:.2f}ms'
+            )
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                f'{name}: queries {previous["queries"]} -> '
+                f'{current["queries"]}'
+            )
+
+    return regressions
+
+
+class Benchmark:
+    """Requests against the component APIs of a generated assembly."""
+
+    def __init__(self, user, root, seed=None):
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.rng = random.Random(seed)
+        self.root = root
+        self.ids = list(Component.objects.filter(
+            path__startswith=root.path,
+        ).values_list('id', flat=True))
+        self.leaves = list(Component.objects.filter(
+            path__startswith=root.path,
+            type='part',
+        ).values_list('path', flat=True)) or [root.path]
+        self.created = 0
+
+    def list(self):
+        """List the components."""
+        with override_settings(RESPONSE_CACHE_ENABLED=False):
+            return self.client.get(reverse('component:component-list'))
+
+    def detail(self):
+        """Retrieve a random component."""
+        pk = self.rng.choice(self.ids)
+        with override_settings(RESPONSE_CACHE_ENABLED=False):
+            return self.client.get(
+                reverse('component:component-detail', args=[pk]),
+            )
+
+    def subtree_cached(self):
+        """List the whole assembly, served from the response cache."""
+        with override_settings(RESPONSE_CACHE_ENABLED=True):
+            return self.client.get(
+                reverse('component:component-subtree', args=[self.root.id]),
+            )
+
+    def create(self):
+        """Create a component with new mass properties."""
+        self.created += 1
+        payload = {
+            'name': f'Benchmark-{self.created}',
+            'parent': self.rng.choice(self.ids),
+            'version': '1.0',
+            'type': 'part',
+            'level': 1,
+            'index': self.created,
+            'skeleton': self.root.skeleton,
+            'mass_properties': [
+                mass_properties(self.rng, f'NEW_{self.created}_{i}')
+                for i in range(2)
+            ],
+        }
+        return self.client.post(
+            reverse('component:component-list'),
+            payload,
+            format='json',
+        )
+
+    def update(self):
+        """Rename a component and replace its mass properties."""
+        pk = self.rng.choice(self.ids)
+        payload = {
+            'name': f'Updated-{pk}',
+            'mass_properties': [mass_properties(self.rng, f'UPD_{pk}')],
+        }
+        return self.client.patch(
+            reverse('component:component-detail', args=[pk]),
+            payload,
+            format='json',
+        )
+
+    def rollup_prepare(self):
+        """Mark a random leaf chain stale, as an edit would."""
+        Component.objects.mark_rollup_dirty([self.rng.choice(self.leaves)])
+
+    def rollup(self):
+        """Roll up the whole assembly."""
+        return self.client.get(
+            reverse('component:component-rollup', args=[self.root.id]),
+        )
+
+    def run(self, name, iterations, warmup):
+        """Run one scenario, returning its timings and query counts."""
+        request = getattr(self, name)
+        prepare = getattr(self, f'{name}_prepare', None)
+        timings, queries, statuses = [], [], []
+        for i in range(warmup + iterations):
+            if prepare is not None:
+                prepare()
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                res = request()
+                elapsed = time.perf_counter() - start
+            if res.status_code >= 400:
+                raise CommandError(
+                    f'{name} returned {res.status_code}: {res.content[:200]}'
+                )
+            if i >= warmup:
+                timings.append(elapsed)
+                queries.append(len(context.captured_queries))
+                statuses.append(res.status_code)
+
+        return summarize(timings, queries, statuses)
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the component APIs."""
+    help = (
+        'Benchmark the component APIs on a generated assembly and report '
+        'latency percentiles, throughput and query counts as JSON. All data '
+        'is created in a transaction that is rolled back afterwards.'
+    )
+
+    scenarios = [
+        'list', 'detail', 'subtree_cached', 'create', 'update', 'rollup',
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000,
+                            help='Number of components.')
+        parser.add_argument('--depth', type=int, default=6,
+                            help='Maximum number of tree levels.')
+        parser.add_argument('--fanout', type=int, default=8,
+                            help='Maximum number of children per component.')
+        parser.add_argument('--density', type=float, default=2.0,
+                            help='Mean mass properties per component.')
+        parser.add_argument('--iterations', type=int, default=50,
+                            help='Measured requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Unmeasured requests per scenario.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed for the assembly and requests.')
+        parser.add_argument('--scenario', action='append',
+                            choices=self.scenarios,
+                            help='Scenario to run, all by default.')
+        parser.add_argument('--output', help='Write the results to a file.')
+        parser.add_argument('--baseline',
+                            help='Results of an earlier run to compare with.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p50 slowdown against the baseline.')
+
+    def handle(self, *args, **options):
+        """Entry point for command."""
+        if options['iterations'] < 1:
+            raise CommandError('At least one iteration is required.')
+
+        results = {
+            'timestamp': timezone.now().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'parameters': {
+                key: options[key] for key in [
+                    'size', 'depth', 'fanout', 'density', 'iterations',
+                    'warmup', 'seed',
+                ]
+            },
+            'scenarios': {},
+        }
+
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(ALLOWED_HOSTS=hosts), transaction.atomic():
+            user = get_user_model().objects.create_user(
+                f'benchmark-{uuid.uuid4().hex}@example.com',
+            )
+            start = time.perf_counter()
+            root = generate_assembly(
+                user,
+                options['size'],
+                options['depth'],
+                options['fanout'],
+                options['density'],
+                skeleton='Benchmark',
+                seed=options['seed'],
+            )
+            results['generate_s'] = time.perf_counter() - start
+
+            benchmark = Benchmark(user, root, seed=options['seed'])
+            results['components'] = len(benchmark.ids)
+            for name in options['scenario'] or self.scenarios:
+                results['scenarios'][name] = benchmark.run(
+                    name,
+                    options['iterations'],
+                    options['warmup'],
+                )
+            transaction.set_rollback(True)
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if options['baseline']:
+            with open(options['baseline']) as file:
+                regressions = compare(
+                    results,
+                    json.load(file),
+                    options['tolerance'],
+                )
+            if regressions:
+                raise CommandError(
+                    'Regressions against the baseline:\n'
+                    + '\n'.join(regressions)
+                )
+            self.stderr.write(self.style.SUCCESS('No regressions found.'))
@@ -0,0 +1,127 @@
+"""
+Django command to benchmark the REST API renderers and parsers.
+"""
+
+import io
+import json
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from rest_framework.parsers import JSONParser                       # type: ignore  # noqa: E501
+from rest_framework.renderers import JSONRenderer                   # type: ignore  # noqa: E501
+
+from core import parsers, renderers
+from core.management.commands.generate_assembly import generate_assembly
+from core.models import Component
+
+from component.serializers import ComponentSerializer
+
+
+def formats():
+    """Return the available (name, renderer, parser) pairs to compare."""
+    available = [('json', JSONRenderer(), JSONParser())]
+    if renderers.orjson is not None:
+        available.append(
+            ('orjson', renderers.ORJSONRenderer(), parsers.ORJSONParser()),
+        )
+    if renderers.msgpack is not None:
+        available.append((
+            'msgpack',
+            renderers.MessagePackRenderer(),
+            parsers.MessagePackParser(),
+        ))
+
+    return available
+
+
+def measure(function, iterations):
+    """Return the median duration of calling the function, in seconds."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the renderers and parsers."""
+    help = (
+        'Compare encode and decode throughput of the available renderers '
+        'and parsers on a serialized synthetic assembly, as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000,
+                            help='Number of components in the payload.')
+        parser.add_argument('--density', type=float, default=2.0,
+                            help='Mean mass properties per component.')
+        parser.add_argument('--iterations', type=int, default=20,
+                            help='Timed runs per format and direction.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed for the assembly.')
+        parser.add_argument('--output', help='Write the results to a file.')
+
+    def handle(self, *args, **options):
+        """Entry point for command."""
+        if options['iterations'] < 1:
+            raise CommandError('At least one iteration is required.')
+
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                f'benchmark-{uuid.uuid4().hex}@example.com',
+            )
+            root = generate_assembly(
+                user,
+                options['size'],
+                depth=8,
+                fanout=10,
+                density=options['density'],
+                seed=options['seed'],
+            )
+            components = Component.objects.filter(
+                path__startswith=root.path,
+            ).prefetch_related('mass_properties').order_by('id')
+            payload = ComponentSerializer(components, many=True).data
+            transaction.set_rollback(True)
+
+        results = {'components': len(payload), 'formats': {}}
+        for name, renderer, parser in formats():
+            content = renderer.render(payload)
+            encode = measure(
+                lambda: renderer.render(payload),
+                options['iterations'],
+            )
+            decode = measure(
+                lambda: parser.parse(io.BytesIO(content)),
+                options['iterations'],
+            )
+            results['formats'][name] = {
+                'bytes': len(content),
+                'encode_ms': encode * 1000,
+                'decode_ms': decode * 1000,
+                'encode_mb_s': len(content) / encode / 1e6,
+                'decode_mb_s': len(content) / decode / 1e6,
+            }
+
+        baseline = results['formats']['json']
+        for result in results['formats'].values():
+            result['encode_speedup'] = (
+                baseline['encode_ms'] / result['encode_ms']
+            )
+            result['decode_speedup'] = (
+                baseline['decode_ms'] / result['decode_ms']
+            )
+
+        output = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
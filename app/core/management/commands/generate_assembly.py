@@ -0,0 +1,163 @@
+"""
+Django command to generate a synthetic component assembly.
+"""
+
+import math
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.models import Component, MassProperties
+
+
+def rotation(rng):
+    """Return a random rotation about z and translation, row-vector form."""
+    angle = rng.uniform(0, 2 * math.pi)
+    cos, sin = math.cos(angle), math.sin(angle)
+    x, y, z = (rng.uniform(-500, 500) for _ in range(3))
+
+    return [cos, sin, 0, 0, -sin, cos, 0, 0, 0, 0, 1, 0, x, y, z, 1]
+
+
+def mass_properties(rng, number):
+    """Return random mass properties for a part."""
+    likely = rng.uniform(0.01, 50)
+    lower = [rng.uniform(-100, 100) for _ in range(3)]
+
+    return {
+        'csys_name': f'CSYS_{number}',
+        'is_csys_local': rng.random() < 0.5,
+        'xform_matrix': rotation(rng),
+        'position': [rng.uniform(-500, 500) for _ in range(3)],
+        'mass': [
+            likely * rng.uniform(0.9, 1),
+            likely,
+            likely * rng.uniform(1, 1.1),
+        ],
+        'cog_lsl': lower,
+        'cog_usl': [value + rng.uniform(0, 5) for value in lower],
+    }
+
+
+def build_levels(size, depth, fanout, density, skeleton='Synthetic',
+                 seed=None):
+    """Return the levels of a random tree for `Component.objects.create_tree`.
+
+    Components are added breadth first, each with 1 to `fanout` children,
+    until `size` components exist or the tree is `depth` levels deep, so
+    shallow trees with a small fan-out can end up smaller than `size`.
+    Every component gets `density` mass properties on average.
+    """
+    rng = random.Random(seed)
+    levels = [[{'ref': 0, 'parent_ref': None}]]
+    count = 1
+    while count < size and len(levels) < depth:
+        level = []
+        for parent in levels[-1]:
+            for index in range(rng.randint(1, fanout)):
+                if count >= size:
+                    break
+                level.append({
+                    'ref': count,
+                    'parent_ref': parent['ref'],
+                    'index': index,
+                })
+                count += 1
+        levels.append(level)
+
+    parents = {item['parent_ref'] for level in levels for item in level}
+    mp_number = 0
+    for tree_level, level in enumerate(levels):
+        for item in level:
+            number = int(density) + (rng.random() < density % 1)
+            item.update({
+                'name': f'{skeleton}-{item["ref"]:07d}',
+                'description': f'Synthetic component {item["ref"]}',
+                'version': '1.0',
+                'type': 'assembly' if item['ref'] in parents else 'part',
+                'level': tree_level,
+                'index': item.get('index', 0),
+                'skeleton': skeleton,
+                'mass_properties': [
+                    mass_properties(rng, mp_number + i) for i in range(number)
+                ],
+            })
+            mp_number += number
+
+    return levels
+
+
+def generate_assembly(user, size, depth, fanout, density,
+                      skeleton='Synthetic', seed=None):
+    """Generate a synthetic assembly for the user and return its root.
+
+    The tables are analyzed afterwards, so the planner does not keep
+    estimating the bulk loaded tables as near empty.
+    """
+    levels = build_levels(size, depth, fanout, density, skeleton, seed)
+    root = Component.objects.create_tree(user, levels)[0]
+
+    tables = [
+        Component._meta.db_table,
+        Component.mass_properties.through._meta.db_table,
+        MassProperties._meta.db_table,
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE ' + ', '.join(
+            connection.ops.quote_name(table) for table in tables
+        ))
+
+    return root
+
+
+class Command(BaseCommand):
+    """Django command to generate a synthetic component assembly."""
+    help = 'Generate a synthetic component tree with mass properties.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='Owner, created if missing.')
+        parser.add_argument('--size', type=int, default=1000,
+                            help='Number of components.')
+        parser.add_argument('--depth', type=int, default=6,
+                            help='Maximum number of tree levels.')
+        parser.add_argument('--fanout', type=int, default=8,
+                            help='Maximum number of children per component.')
+        parser.add_argument('--density', type=float, default=2.0,
+                            help='Mean mass properties per component.')
+        parser.add_argument('--skeleton', default='Synthetic',
+                            help='Skeleton name of the generated components.')
+        parser.add_argument('--seed', type=int, default=None,
+                            help='Random seed for a reproducible tree.')
+
+    def handle(self, *args, **options):
+        """Entry point for command."""
+        if options['size'] < 1 or options['depth'] < 1 \
+                or options['fanout'] < 1 or options['density'] < 0:
+            raise CommandError(
+                'Size, depth and fan-out must be positive and density '
+                'must not be negative.'
+            )
+
+        user = get_user_model().objects.filter(email=options['email']).first()
+        if user is None:
+            user = get_user_model().objects.create_user(options['email'])
+
+        start = time.perf_counter()
+        root = generate_assembly(
+            user,
+            options['size'],
+            options['depth'],
+            options['fanout'],
+            options['density'],
+            skeleton=options['skeleton'],
+            seed=options['seed'],
+        )
+        count = Component.objects.filter(path__startswith=root.path).count()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {count} components below root {root.id} '
+            f'in {time.perf_counter() - start:.2f}s.'
+        ))
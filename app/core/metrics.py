@@ -0,0 +1,148 @@
+"""
+In-process request metrics, exposed in the Prometheus text format.
+
+Each worker process keeps its own histograms, so Prometheus should
+scrape every worker, or the totals should be read per process.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+SECONDS = [
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+]
+QUERIES = [0, 1, 2, 3, 5, 10, 20, 50, 100, 200, 500]
+BYTES = [100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000]
+
+# (name, help, bucket boundaries) of the histograms recorded per request.
+HISTOGRAMS = [
+    ('latency', 'Total request latency in seconds.', SECONDS),
+    ('db', 'Time spent executing database queries in seconds.', SECONDS),
+    ('serialize', 'Time spent serializing responses in seconds.', SECONDS),
+    ('render', 'Time spent rendering responses in seconds.', SECONDS),
+    ('queries', 'Database queries executed per request.', QUERIES),
+    ('response_size', 'Response body size in bytes.', BYTES),
+]
+UNITS = {
+    'latency': 'seconds', 'db': 'seconds', 'serialize': 'seconds',
+    'render': 'seconds', 'queries': 'total', 'response_size': 'bytes',
+}
+PREFIX = 'wms_request'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    """Counts of observations per bucket, with their sum."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """Histograms of request metrics, keyed by route and method."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget all recorded requests."""
+        with self.lock:
+            self.histograms = {}
+            self.responses = {}
+
+    def record(self, route, method, status, values):
+        """Record the metric values of one request."""
+        key = (route, method)
+        with self.lock:
+            histograms = self.histograms.get(key)
+            if histograms is None:
+                histograms = self.histograms[key] = {
+                    name: Histogram(buckets)
+                    for name, _, buckets in HISTOGRAMS
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+            status_key = (route, method, status)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+    def render(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        with self.lock:
+            snapshot = {
+                key: {
+                    name: (list(h.counts), h.sum)
+                    for name, h in histograms.items()
+                }
+                for key, histograms in self.histograms.items()
+            }
+            responses = dict(self.responses)
+
+        lines = [
+            f'# HELP {PREFIX}s_total Requests handled, by response status.',
+            f'# TYPE {PREFIX}s_total counter',
+        ]
+        for (route, method, status), count in sorted(responses.items()):
+            lines.append(
+                f'{PREFIX}s_total{{route="{route}",method="{method}",'
+                f'status="{status}"}} {count}'
+            )
+
+        for name, help_text, buckets in HISTOGRAMS:
+            metric = f'{PREFIX}_{name}_{UNITS[name]}'
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} histogram')
+            for (route, method), histograms in sorted(snapshot.items()):
+                counts, total = histograms[name]
+                labels = f'route="{route}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip([*buckets, '+Inf'], counts):
+                    cumulative += count
+                    lines.append(
+                        f'{metric}_bucket{{{labels},le="{bound}"}} '
+                        f'{cumulative}'
+                    )
+                lines.append(f'{metric}_sum{{{labels}}} {total}')
+                lines.append(f'{metric}_count{{{labels}}} {cumulative}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def start_request():
+    """Start collecting the phase timings of the current request."""
+    stats = {'serialize': 0.0, 'render': 0.0}
+    return stats, _current.set(stats)
+
+
+def finish_request(token):
+    """Stop collecting the phase timings of the current request."""
+    _current.reset(token)
+
+
+@contextmanager
+def measure(phase):
+    """Add the time spent in the block to a phase of the current request."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats[phase] += time.perf_counter() - start
@@ -0,0 +1,131 @@
+"""
+Middleware for the REST APIs.
+"""
+
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from rest_framework.exceptions import AuthenticationFailed          # type: ignore  # noqa: E501
+
+from core import metrics, profiling
+from core.authentication import CachedTokenAuthentication
+from core.models import RequestProfile
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries and their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Record query, timing and size metrics of every request per route.
+
+    Routes are labelled by URL name, e.g. `component-list`. Streamed
+    responses are timed to their first byte and have no recorded size.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        stats, token = metrics.start_request()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                response = self.get_response(request)
+        finally:
+            metrics.finish_request(token)
+
+        values = {
+            'latency': time.perf_counter() - start,
+            'db': counter.duration,
+            'queries': counter.count,
+            **stats,
+        }
+        if not response.streaming:
+            values['response_size'] = len(response.content)
+
+        match = request.resolver_match
+        metrics.registry.record(
+            (match.url_name or 'unnamed') if match else 'unmatched',
+            request.method,
+            response.status_code,
+            values,
+        )
+
+        return response
+
+
+class ProfilingMiddleware:
+    """Profile requests staff ask for with the PROFILE_HEADER header.
+
+    The user is authenticated by token, or else by session, before the
+    request runs, and only requests of active staff are profiled. These
+    run under cProfile with their queries recorded, and the id of the
+    profile is returned in the `X-Profile-Id` response header. Streamed
+    responses are profiled up to their first byte. A profile that cannot
+    be written is logged, and the response is returned without the id.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def authenticate(self, request):
+        """Return the user making the request, by token or session."""
+        try:
+            credentials = CachedTokenAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return None
+        if credentials is not None:
+            return credentials[0]
+
+        return getattr(request, 'user', None)
+
+    def __call__(self, request):
+        if not request.headers.get(settings.PROFILE_HEADER):
+            return self.get_response(request)
+
+        user = self.authenticate(request)
+        if user is None or not (user.is_active and user.is_staff):
+            return self.get_response(request)
+
+        response, profiler, queries, duration = profiling.profile_request(
+            request, self.get_response,
+        )
+        try:
+            profile = RequestProfile.objects.create_from_capture(
+                user, request, response, profiler, queries, duration,
+            )
+        except OSError:
+            logger.exception('Could not write the profile of %s %s.',
+                             request.method, request.path)
+        else:
+            response['X-Profile-Id'] = str(profile.id)
+
+        return response
@@ -0,0 +1,63 @@
+# Generated by Django 5.1 on 2026-10-18 06:10
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+
+HASHED_FIELDS = [
+    'csys_name', 'is_csys_local', 'xform_matrix', 'position', 'mass',
+    'cog_lsl', 'cog_usl',
+]
+
+
+def populate_content_hash(apps, schema_editor):
+    """Hash the existing mass properties and merge duplicate rows."""
+    MassProperties = apps.get_model('core', 'MassProperties')
+    Component = apps.get_model('core', 'Component')
+    Through = Component.mass_properties.through
+
+    keep = {}
+    for mp in MassProperties.objects.order_by('id').iterator():
+        values = [getattr(mp, field) for field in HASHED_FIELDS]
+        mp.content_hash = hashlib.sha256(
+            json.dumps(values).encode()
+        ).hexdigest()
+
+        key = (mp.user_id, mp.content_hash)
+        if key not in keep:
+            keep[key] = mp.id
+            mp.save(update_fields=['content_hash'])
+            continue
+
+        for link in Through.objects.filter(massproperties_id=mp.id):
+            if not Through.objects.filter(
+                component_id=link.component_id,
+                massproperties_id=keep[key],
+            ).exists():
+                Through.objects.create(
+                    component_id=link.component_id,
+                    massproperties_id=keep[key],
+                )
+        mp.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_alter_component_mass_properties'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='massproperties',
+            name='content_hash',
+            field=models.CharField(default='', editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(
+            populate_content_hash,
+            migrations.RunPython.noop,
+        ),
+    ]
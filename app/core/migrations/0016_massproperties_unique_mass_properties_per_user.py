@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-18 06:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_massproperties_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='massproperties',
+            constraint=models.UniqueConstraint(fields=('user', 'content_hash'), name='unique_mass_properties_per_user'),       # noqa: E501
+        ),
+    ]
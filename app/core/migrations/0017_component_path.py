@@ -0,0 +1,64 @@
+# Generated by Django 5.1 on 2026-10-18 06:30
+
+from django.db import migrations, models
+
+
+def populate_path(apps, schema_editor):
+    """Build the materialized path of every existing component."""
+    Component = apps.get_model('core', 'Component')
+
+    nodes = {
+        pk: (user_id, parent)
+        for pk, user_id, parent in Component.objects.values_list(
+            'id', 'user_id', 'parent'
+        )
+    }
+    paths = {}
+
+    def build(pk):
+        chain = []
+        while pk not in paths:
+            chain.append(pk)
+            user_id, parent = nodes[pk]
+            if parent not in nodes or nodes[parent][0] != user_id \
+                    or parent in chain:
+                paths[pk] = f'/{pk}/'
+                chain.pop()
+                break
+            pk = parent
+        for child in reversed(chain):
+            paths[child] = f'{paths[pk]}{child}/'
+            pk = child
+
+    for pk in nodes:
+        build(pk)
+
+    Component.objects.bulk_update(
+        [Component(id=pk, path=path) for pk, path in paths.items()],
+        ['path'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_massproperties_unique_mass_properties_per_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='path',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(populate_path, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['path'], name='core_component_path_idx', opclasses=['text_pattern_ops']),     # noqa: E501
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['parent'], name='core_component_parent_idx'),     # noqa: E501
+        ),
+    ]
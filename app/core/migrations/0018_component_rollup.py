@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:18
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_component_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='rollup',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), editable=False, null=True, size=9),     # noqa: E501
+        ),
+        migrations.AddField(
+            model_name='component',
+            name='rollup_dirty',
+            field=models.BooleanField(default=True, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(condition=models.Q(('rollup_dirty', True)), fields=['path'], name='core_component_dirty_path_idx', opclasses=['text_pattern_ops']),     # noqa: E501
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.1 on 2026-10-18 07:00
+
+import hashlib
+import json
+import re
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+NUMBER_RE = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+VECTOR_FIELDS = ['xform_matrix', 'position', 'mass', 'cog_lsl', 'cog_usl']
+HASHED_FIELDS = [
+    'csys_name', 'is_csys_local', 'xform_matrix', 'position', 'mass',
+    'cog_lsl', 'cog_usl',
+]
+
+
+def parse_vectors(apps, schema_editor):
+    """Parse the formatted strings into arrays and rehash the rows."""
+    MassProperties = apps.get_model('core', 'MassProperties')
+    Component = apps.get_model('core', 'Component')
+    Through = Component.mass_properties.through
+
+    keep = {}
+    for mp in MassProperties.objects.order_by('id').iterator():
+        values = {
+            field: [
+                float(number)
+                for number in NUMBER_RE.findall(getattr(mp, field) or '')
+            ]
+            for field in VECTOR_FIELDS
+        }
+        for field, value in values.items():
+            setattr(mp, f'{field}_values', value)
+        values['csys_name'] = mp.csys_name
+        values['is_csys_local'] = mp.is_csys_local
+        mp.content_hash = hashlib.sha256(json.dumps(
+            [values[field] for field in HASHED_FIELDS]
+        ).encode()).hexdigest()
+
+        # Strings such as "1" and "1.0" now hold the same numbers.
+        key = (mp.user_id, mp.content_hash)
+        if key not in keep:
+            keep[key] = mp
+            continue
+
+        for link in Through.objects.filter(massproperties_id=mp.id):
+            if not Through.objects.filter(
+                component_id=link.component_id,
+                massproperties_id=keep[key].id,
+            ).exists():
+                Through.objects.create(
+                    component_id=link.component_id,
+                    massproperties_id=keep[key].id,
+                )
+        mp.delete()
+
+    MassProperties.objects.bulk_update(
+        keep.values(),
+        ['content_hash'] + [f'{field}_values' for field in VECTOR_FIELDS],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_component_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='massproperties',
+            name='xform_matrix_values',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), blank=True, default=list, size=16),     # noqa: E501
+        ),
+        migrations.AddField(
+            model_name='massproperties',
+            name='position_values',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), blank=True, default=list, size=3),     # noqa: E501
+        ),
+        migrations.AddField(
+            model_name='massproperties',
+            name='mass_values',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), blank=True, default=list, size=3),     # noqa: E501
+        ),
+        migrations.AddField(
+            model_name='massproperties',
+            name='cog_lsl_values',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), blank=True, default=list, size=3),     # noqa: E501
+        ),
+        migrations.AddField(
+            model_name='massproperties',
+            name='cog_usl_values',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), blank=True, default=list, size=3),     # noqa: E501
+        ),
+        migrations.RunPython(parse_vectors, migrations.RunPython.noop),
+    ]
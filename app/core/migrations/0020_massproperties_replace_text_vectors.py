@@ -0,0 +1,58 @@
+# Generated by Django 5.1 on 2026-10-18 07:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_massproperties_numeric_arrays'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='massproperties',
+            name='xform_matrix',
+        ),
+        migrations.RenameField(
+            model_name='massproperties',
+            old_name='xform_matrix_values',
+            new_name='xform_matrix',
+        ),
+        migrations.RemoveField(
+            model_name='massproperties',
+            name='position',
+        ),
+        migrations.RenameField(
+            model_name='massproperties',
+            old_name='position_values',
+            new_name='position',
+        ),
+        migrations.RemoveField(
+            model_name='massproperties',
+            name='mass',
+        ),
+        migrations.RenameField(
+            model_name='massproperties',
+            old_name='mass_values',
+            new_name='mass',
+        ),
+        migrations.RemoveField(
+            model_name='massproperties',
+            name='cog_lsl',
+        ),
+        migrations.RenameField(
+            model_name='massproperties',
+            old_name='cog_lsl_values',
+            new_name='cog_lsl',
+        ),
+        migrations.RemoveField(
+            model_name='massproperties',
+            name='cog_usl',
+        ),
+        migrations.RenameField(
+            model_name='massproperties',
+            old_name='cog_usl_values',
+            new_name='cog_usl',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_massproperties_replace_text_vectors'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['user', 'id'], name='core_component_user_id_idx'),     # noqa: E501
+        ),
+        migrations.AddIndex(
+            model_name='massproperties',
+            index=models.Index(fields=['user', 'id'], name='core_massprops_user_id_idx'),     # noqa: E501
+        ),
+    ]
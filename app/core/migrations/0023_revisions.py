@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_request_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='revision',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='massproperties',
+            name='revision',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_revisions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='component',
+            name='core_component_parent_idx',
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['user', 'skeleton', 'level', 'index'], name='core_component_skeleton_idx'),     # noqa: E501
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['user', 'parent'], name='core_component_user_parent_idx'),     # noqa: E501
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['user', 'type'], name='core_component_user_type_idx'),     # noqa: E501
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:59
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_component_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='search',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('name', config='simple', weight='A'), '||', django.contrib.postgres.search.SearchVector('type', config='simple', weight='B'), django.contrib.postgres.search.SearchConfig('simple')), '||', django.contrib.postgres.search.SearchVector('description', config='simple', weight='C'), django.contrib.postgres.search.SearchConfig('simple')), output_field=django.contrib.postgres.search.SearchVectorField()),     # noqa: E501
+        ),
+        migrations.AddField(
+            model_name='massproperties',
+            name='search',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('csys_name', config='simple'), output_field=django.contrib.postgres.search.SearchVectorField()),     # noqa: E501
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search'], name='core_component_search_idx'),     # noqa: E501
+        ),
+        migrations.AddIndex(
+            model_name='massproperties',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search'], name='core_massprops_search_idx'),     # noqa: E501
+        ),
+    ]
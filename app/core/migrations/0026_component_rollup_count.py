@@ -0,0 +1,27 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:56
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+def invalidate_rollups(apps, schema_editor):
+    """Mark every cached roll-up stale, it lacks the component count."""
+    Component = apps.get_model('core', 'Component')
+
+    Component.objects.update(rollup=None, rollup_dirty=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='component',
+            name='rollup',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), editable=False, null=True, size=10),     # noqa: E501
+        ),
+        migrations.RunPython(invalidate_rollups, migrations.RunPython.noop),
+    ]
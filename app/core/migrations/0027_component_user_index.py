@@ -0,0 +1,20 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_component_rollup_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='component',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),     # noqa: E501
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-18 11:03
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_component_user_index'),
+    ]
+
+    operations = [
+        # An index on rollup_dirty, even as a predicate, and full pages
+        # both rule out HOT updates, so storing roll-ups rewrote every
+        # index of the table.
+        migrations.RemoveIndex(
+            model_name='component',
+            name='core_component_dirty_path_idx',
+        ),
+        migrations.RunSQL(
+            'ALTER TABLE core_component SET (fillfactor = 70)',
+            'ALTER TABLE core_component RESET (fillfactor)',
+        ),
+    ]
@@ -2,14 +2,24 @@
 Database models.
 """
 
+import hashlib
+import json
+import uuid
+
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import connection, models, transaction
+from django.db.models.functions import Concat, Substr
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin
 )
 
+from core import caching, profiling
+
 
 class UserManager(BaseUserManager):
     """Manager for users."""
@@ -46,11 +56,303 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
 
 
+def bump_revision(instance, save_kwargs):
+    """Increment the revision of an instance about to be updated.
+
+    The increment runs in the database, so concurrent saves each count.
+    """
+    if instance._state.adding:
+        return
+
+    instance.revision = models.F('revision') + 1
+    update_fields = save_kwargs.get('update_fields')
+    if update_fields is not None:
+        save_kwargs['update_fields'] = {*update_fields, 'revision'}
+
+
+def insert_many(objs, suffix='', batch_size=1000):
+    """Insert unsaved instances, `batch_size` rows per statement.
+
+    Each batch travels as a single JSON parameter, which skips compiling
+    a placeholder per value, where most of a large `bulk_create` goes.
+    `suffix` is appended to every statement and the rows it returns, e.g.
+    with RETURNING, are collected and returned.
+    """
+    if not objs:
+        return []
+
+    meta = objs[0]._meta
+    with_pk = objs[0].pk is not None
+    fields = [
+        field for field in meta.concrete_fields
+        if not field.generated and (with_pk or not field.primary_key)
+    ]
+    table = connection.ops.quote_name(meta.db_table)
+    columns = ', '.join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    returned = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            rows = [
+                {field.column: getattr(obj, field.attname) for field in fields}
+                for obj in objs[start:start + batch_size]
+            ]
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) SELECT {columns} '
+                f'FROM jsonb_populate_recordset(NULL::{table}, %s) {suffix}',
+                [json.dumps(rows, default=str, ensure_ascii=False)],
+            )
+            if cursor.description:
+                returned.extend(cursor.fetchall())
+    for obj in objs if with_pk else []:
+        obj._state.adding = False
+        obj._state.db = 'default'
+
+    return returned
+
+
+class ComponentManager(models.Manager):
+    """Manager for components."""
+
+    def mark_rollup_dirty(self, paths):
+        """Mark the components on the given paths and their ancestors stale.
+
+        Rows are updated even when already stale, so the update waits for
+        a roll-up refresh holding their locks and is not lost behind it.
+        """
+        ids = {int(pk) for path in paths for pk in path.strip('/').split('/')
+               if pk}
+        if ids:
+            self.filter(id__in=ids).update(rollup_dirty=True)
+
+    def reroot_descendants(self, path):
+        """Make the descendants of the component on `path` new roots.
+
+        Its children lose their parent, and every descendant moves up by
+        the depth of the component.
+        """
+        ids = path.strip('/').split('/')
+        self.filter(path__startswith=path).update(
+            path=Concat(models.Value('/'), Substr('path', len(path) + 1)),
+            parent=models.Case(
+                models.When(parent=int(ids[-1]), then=None),
+                default=models.F('parent'),
+            ),
+            level=models.F('level') - len(ids),
+            revision=models.F('revision') + 1,
+        )
+
+    @transaction.atomic
+    def delete_many(self, user, ids, subtree=False,
+                    collect_mass_properties=False):
+        """Delete the user's components with set-based deletes.
+
+        With `subtree`, the whole subtrees below the components are deleted
+        too; otherwise their descendants become new roots, as when a single
+        component is deleted. The mass property links go in one delete,
+        and with `collect_mass_properties` the mass properties no longer
+        linked to any component are deleted as well. Rows are deleted
+        without loading them, so no signals are sent.
+
+        Return the numbers of deleted components and mass properties.
+        """
+        paths = sorted(self.filter(
+            user=user,
+            id__in=ids,
+        ).values_list('path', flat=True))
+        if not paths:
+            return 0, 0
+
+        if subtree:
+            # Sorted paths list each subtree right after its root.
+            roots = []
+            for path in paths:
+                if not roots or not path.startswith(roots[-1]):
+                    roots.append(path)
+            condition = models.Q()
+            for path in roots:
+                condition |= models.Q(path__startswith=path)
+            components = self.filter(condition, user=user)
+        else:
+            components = self.filter(user=user, id__in=ids)
+
+        Through = self.model.mass_properties.through
+        links = Through.objects.filter(component__in=components)
+        if collect_mass_properties:
+            mass_props_ids = list(links.values_list(
+                'massproperties_id',
+                flat=True,
+            ).distinct())
+        links.delete()
+        deleted = components._raw_delete(components.db)
+
+        if not subtree:
+            # Deepest first, so each descendant is rerooted below its
+            # closest deleted ancestor.
+            for path in sorted(paths, key=len, reverse=True):
+                self.reroot_descendants(path)
+        self.mark_rollup_dirty(paths)
+
+        collected = 0
+        if collect_mass_properties and mass_props_ids:
+            orphans = MassProperties.objects.filter(
+                ~models.Exists(Through.objects.filter(
+                    massproperties_id=models.OuterRef('pk'),
+                )),
+                user=user,
+                id__in=mass_props_ids,
+            )
+            collected = orphans._raw_delete(orphans.db)
+        caching.invalidate_user(user.id)
+
+        return deleted, collected
+
+    @transaction.atomic
+    def move_subtree(self, component, parent, index=None):
+        """Move a component and its subtree below another parent.
+
+        `parent` is the id of the new parent, or None to make the component
+        a root. The paths and levels of the whole subtree are rewritten in
+        one update. With `index`, the new siblings from that index on are
+        shifted up to make room; otherwise the component is placed after
+        the last of them. The old siblings keep their indexes.
+
+        The component and the new parent are locked first and re-read, so
+        concurrent moves cannot create a cycle. Return the moved component.
+        """
+        locked = {
+            node.id: node for node in self.select_for_update().filter(
+                user_id=component.user_id,
+                id__in={component.pk, parent} - {None},
+            ).order_by('id').only('id', 'path', 'level', 'parent')
+        }
+        component = locked[component.pk]
+        if parent is not None and parent not in locked:
+            raise ValueError('The parent does not exist.')
+        parent_path = '/' if parent is None else locked[parent].path
+        if parent_path.startswith(component.path):
+            raise ValueError('A component cannot be its own ancestor.')
+
+        old_path = component.path
+        new_path = f'{parent_path}{component.pk}/'
+        level = 0 if parent is None else locked[parent].level + 1
+        siblings = self.filter(
+            user_id=component.user_id,
+            parent=parent,
+        ).exclude(pk=component.pk)
+        if index is None:
+            last = siblings.aggregate(last=models.Max('index'))['last']
+            index = 0 if last is None else last + 1
+        else:
+            siblings.filter(index__gte=index).update(
+                index=models.F('index') + 1,
+                revision=models.F('revision') + 1,
+            )
+
+        if new_path != old_path or level != component.level:
+            self.filter(path__startswith=old_path).update(
+                path=Concat(
+                    models.Value(new_path),
+                    Substr('path', len(old_path) + 1),
+                ),
+                level=models.F('level') + (level - component.level),
+                revision=models.F('revision') + 1,
+            )
+        self.filter(pk=component.pk).update(
+            parent=parent,
+            index=index,
+            revision=models.F('revision') + 1,
+        )
+        self.mark_rollup_dirty([old_path, new_path])
+        # Queryset updates send no signals.
+        caching.invalidate_user(component.user_id)
+
+        return self.get(pk=component.pk)
+
+    def reserve_ids(self, count):
+        """Draw `count` ids from the primary key sequence and return them."""
+        table = self.model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT nextval(pg_get_serial_sequence(%s, %s)) '
+                'FROM generate_series(1, %s)',
+                [table, self.model._meta.pk.column, count],
+            )
+            return [pk for pk, in cursor.fetchall()]
+
+    @transaction.atomic
+    def create_tree(self, user, levels, batch_size=1000):
+        """Bulk insert components level by level and return them by ref.
+
+        `levels` lists the components of each tree depth, parents first.
+        Each item holds the component fields plus a unique `ref`, and
+        optionally the `parent_ref` of an item of an earlier level or the
+        id of an existing `parent`, and a list of `mass_properties`.
+        """
+        components = {}
+        parent_paths = dict(self.filter(user=user, id__in={
+            item['parent']
+            for level in levels
+            for item in level if item.get('parent') is not None
+        }).values_list('id', 'path'))
+        self.mark_rollup_dirty(parent_paths.values())
+
+        # Ids are drawn from the sequence up front, so every path is known
+        # before the rows are inserted in one pass.
+        ids = iter(self.reserve_ids(sum(len(level) for level in levels)))
+        for level in levels:
+            for item in level:
+                item = dict(item)
+                ref = item.pop('ref')
+                parent_ref = item.pop('parent_ref', None)
+                item.pop('mass_properties', None)
+                if parent_ref is not None:
+                    item['parent'] = components[parent_ref].id
+                component = self.model(id=next(ids), user=user, **item)
+                component.path = component.build_path(
+                    parent_path=parent_paths.get(component.parent, ''),
+                )
+                parent_paths[component.id] = component.path
+                components[ref] = component
+
+        insert_many(list(components.values()), batch_size=batch_size)
+
+        entries = [
+            (components[item['ref']].id, mp)
+            for level in levels
+            for item in level
+            for mp in item.get('mass_properties', [])
+        ]
+        mass_prop_ids = MassProperties.objects.get_or_create_ids(
+            user,
+            [mp for _, mp in entries],
+            batch_size=batch_size,
+        )
+        links = {
+            (component_id, mp_id)
+            for (component_id, _), mp_id in zip(entries, mass_prop_ids)
+        }
+        Through = self.model.mass_properties.through
+        insert_many(
+            [
+                Through(component_id=component_id, massproperties_id=mp_id)
+                for component_id, mp_id in sorted(links)
+            ],
+            batch_size=batch_size,
+        )
+        # Bulk inserts send no signals.
+        caching.invalidate_user(user.id)
+
+        return components
+
+
 class Component(models.Model):
     """Component object."""
-    user = models.ForeignKey(
+    user = models.ForeignKey(                                       # Indexed by the (user, ...) indexes    # noqa: E501
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_index=False,
     )
 
     name = models.TextField(max_length=63)                          # Component name                        # noqa: E501
@@ -66,13 +368,211 @@ class Component(models.Model):
         # related_name='+',
         # blank=True
     )
+    path = models.TextField(blank=True, editable=False)             # Materialized path of ids, "/1/5/9/"   # noqa: E501
+    rollup = ArrayField(                                            # Cached subtree totals, see component.rollup  # noqa: E501
+        models.FloatField(),
+        size=10,
+        null=True,
+        editable=False,
+    )
+    rollup_dirty = models.BooleanField(default=True, editable=False)  # Cached roll-up is stale, unindexed for HOT updates  # noqa: E501
+    revision = models.PositiveIntegerField(default=1, editable=False)  # Bumped on every change, for ETags  # noqa: E501
+    search = models.GeneratedField(                                 # Search terms, see component.search    # noqa: E501
+        expression=(
+            SearchVector('name', config='simple', weight='A')
+            + SearchVector('type', config='simple', weight='B')
+            + SearchVector('description', config='simple', weight='C')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = ComponentManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['path'],
+                name='core_component_path_idx',
+                opclasses=['text_pattern_ops'],
+            ),
+            models.Index(
+                fields=['user', 'id'],
+                name='core_component_user_id_idx',
+            ),
+            models.Index(
+                fields=['user', 'skeleton', 'level', 'index'],
+                name='core_component_skeleton_idx',
+            ),
+            models.Index(
+                fields=['user', 'parent'],
+                name='core_component_user_parent_idx',
+            ),
+            models.Index(
+                fields=['user', 'type'],
+                name='core_component_user_type_idx',
+            ),
+            GinIndex(fields=['search'], name='core_component_search_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded parent and level to detect reparenting."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_parent = instance.__dict__.get('parent')
+        instance._loaded_level = instance.__dict__.get('level')
+        return instance
+
+    @property
+    def ancestor_ids(self):
+        """Return the ids of the ancestors, from the root down."""
+        return [int(pk) for pk in self.path.strip('/').split('/')[:-1]]
+
+    def build_path(self, parent_path=None):
+        """Return the materialized path of the component.
+
+        A parent that does not exist for the same user makes the component
+        a root, like a component without a parent.
+        """
+        if parent_path is None and self.parent is not None:
+            parent_path = Component.objects.filter(
+                user_id=self.user_id,
+                id=self.parent,
+            ).values_list('path', flat=True).first()
+
+        if parent_path and f'/{self.pk}/' in parent_path:
+            raise ValueError('A component cannot be its own ancestor.')
+
+        return f'{parent_path or "/"}{self.pk}/'
+
+    def save(self, *args, **kwargs):
+        """Save the component, keeping the tree paths and levels current.
+
+        Reparenting places the component one level below its new parent,
+        or at level 0 without one, and shifts its descendants alike. A
+        parent that does not exist keeps the given level.
+        """
+        adding = self._state.adding
+        bump_revision(self, kwargs)
+        reparented = getattr(self, '_loaded_parent', None) != self.parent
+        if not adding and self.path and not reparented:
+            return super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'path', 'level'}
+
+        with transaction.atomic():
+            old_path = self.path
+            old_level = getattr(self, '_loaded_level', None)
+            if old_level is None:
+                old_level = self.level
+            if not adding:
+                parent = self.parent is not None and Component.objects.filter(
+                    user_id=self.user_id,
+                    id=self.parent,
+                ).values('path', 'level').first()
+                self.path = self.build_path(parent['path'] if parent else '')
+                if reparented and parent:
+                    self.level = parent['level'] + 1
+                elif reparented and self.parent is None:
+                    self.level = 0
+            super().save(*args, **kwargs)
+
+            if adding:
+                self.path = self.build_path()
+                Component.objects.filter(pk=self.pk).update(path=self.path)
+            elif old_path and old_path != self.path:
+                Component.objects.filter(
+                    path__startswith=old_path,
+                ).exclude(pk=self.pk).update(
+                    path=Concat(
+                        models.Value(self.path),
+                        Substr('path', len(old_path) + 1),
+                    ),
+                    level=models.F('level') + (self.level - old_level),
+                    revision=models.F('revision') + 1,
+                )
+
+        self._loaded_parent = self.parent
+        self._loaded_level = self.level
+
+
+class MassPropertiesManager(models.Manager):
+    """Manager for mass properties."""
+
+    def insert_missing(self, mass_props, found, batch_size=1000):
+        """Insert the unsaved mass properties whose hash is not in `found`.
+
+        Duplicates are inserted once, `batch_size` rows per statement, and
+        the inserted mass properties are returned by their content hash.
+        """
+        missing = {
+            mp_obj.content_hash: mp_obj
+            for mp_obj in mass_props if mp_obj.content_hash not in found
+        }
+        for content_hash, pk in insert_many(
+            list(missing.values()),
+            'ON CONFLICT (user_id, content_hash) '
+            'DO UPDATE SET content_hash = EXCLUDED.content_hash '
+            'RETURNING content_hash, id',
+            batch_size=batch_size,
+        ):
+            missing[content_hash].id = pk
+            missing[content_hash]._state.adding = False
+
+        return missing
+
+    def get_or_create_ids(self, user, entries, batch_size=1000):
+        """Return the ids of saved mass properties for the entries.
+
+        Like `get_or_create_many`, without loading the existing ones.
+        """
+        mass_props = [self.model(user=user, **mp) for mp in entries]
+        for mp_obj in mass_props:
+            mp_obj.content_hash = mp_obj.compute_content_hash()
+
+        found = dict(self.filter(
+            user=user,
+            content_hash__in={mp_obj.content_hash for mp_obj in mass_props},
+        ).values_list('content_hash', 'id'))
+        found.update(
+            (content_hash, mp_obj.id) for content_hash, mp_obj
+            in self.insert_missing(mass_props, found, batch_size).items()
+        )
+
+        return [found[mp_obj.content_hash] for mp_obj in mass_props]
+
+    def get_or_create_many(self, user, entries, batch_size=1000):
+        """Return saved mass properties for the entries, in their order.
+
+        Entries are matched on their content hash with one lookup, and the
+        missing ones are inserted `batch_size` rows per statement.
+        """
+        mass_props = [self.model(user=user, **mp) for mp in entries]
+        for mp_obj in mass_props:
+            mp_obj.content_hash = mp_obj.compute_content_hash()
+
+        hashes = {mp_obj.content_hash for mp_obj in mass_props}
+        found = {
+            mp_obj.content_hash: mp_obj
+            for mp_obj in self.filter(user=user, content_hash__in=hashes)
+        }
+        found.update(self.insert_missing(mass_props, found, batch_size))
+
+        return [found[mp_obj.content_hash] for mp_obj in mass_props]
+
 
 class MassProperties(models.Model):
     """MassProperties object."""
+    HASHED_FIELDS = [
+        'csys_name', 'is_csys_local', 'xform_matrix', 'position', 'mass',
+        'cog_lsl', 'cog_usl',
+    ]
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -84,11 +584,103 @@ class MassProperties(models.Model):
     #     'Component',
     #     on_delete=models.CASCADE
     # )
-    xform_matrix = models.TextField(blank=True)         # Formatted String for the Array of [00, 01, 02, 03, 10, 11, 12, 13, 20, 21, 22, 23, 30, 31, 32, 33]     # noqa: E501
-    position = models.TextField(blank=True)             # Formatted String for the Array of [x, y, z]             # noqa: E501
-    mass = models.TextField(blank=True)                 # Formatted String for the Array of [LSL, LIKELY, USL]    # noqa: E501
-    cog_lsl = models.TextField(blank=True)              # Formatted String for the Array of [x, y, z]             # noqa: E501
-    cog_usl = models.TextField(blank=True)              # Formatted String for the Array of [x, y, z]             # noqa: E501
+    xform_matrix = ArrayField(models.FloatField(), size=16, blank=True, default=list)   # Array of [00, 01, 02, 03, 10, 11, 12, 13, 20, 21, 22, 23, 30, 31, 32, 33]     # noqa: E501
+    position = ArrayField(models.FloatField(), size=3, blank=True, default=list)        # Array of [x, y, z]             # noqa: E501
+    mass = ArrayField(models.FloatField(), size=3, blank=True, default=list)            # Array of [LSL, LIKELY, USL]    # noqa: E501
+    cog_lsl = ArrayField(models.FloatField(), size=3, blank=True, default=list)         # Array of [x, y, z]             # noqa: E501
+    cog_usl = ArrayField(models.FloatField(), size=3, blank=True, default=list)         # Array of [x, y, z]             # noqa: E501
+    content_hash = models.CharField(max_length=64, editable=False)  # SHA-256 of the hashed fields         # noqa: E501
+    revision = models.PositiveIntegerField(default=1, editable=False)  # Bumped on every change, for ETags  # noqa: E501
+    search = models.GeneratedField(                                 # Search terms, see component.search    # noqa: E501
+        expression=SearchVector('csys_name', config='simple'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = MassPropertiesManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'content_hash'],
+                name='unique_mass_properties_per_user',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', 'id'],
+                name='core_massprops_user_id_idx',
+            ),
+            GinIndex(fields=['search'], name='core_massprops_search_idx'),
+        ]
 
     def __str__(self):
         return self.csys_name
+
+    def compute_content_hash(self):
+        """Return the hash identifying the content of the mass properties."""
+        values = [getattr(self, field) for field in self.HASHED_FIELDS]
+        values = [
+            [float(v) for v in value] if isinstance(value, list) else value
+            for value in values
+        ]
+        return hashlib.sha256(json.dumps(values).encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        """Save the mass properties, keeping the content hash current."""
+        self.content_hash = self.compute_content_hash()
+        bump_revision(self, kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'content_hash'}
+
+        super().save(*args, **kwargs)
+
+
+class RequestProfileManager(models.Manager):
+    """Manager for request profiles."""
+
+    def create_from_capture(self, user, request, response, profiler,
+                            queries, duration):
+        """Write a user's captured request profile to disk and record it."""
+        name = uuid.uuid4().hex
+        profiling.write_profile(name, profiler, queries)
+        match = request.resolver_match
+
+        return self.create(
+            user=user,
+            name=name,
+            method=request.method,
+            path=request.get_full_path(),
+            route=(match.url_name or '') if match else '',
+            status_code=response.status_code,
+            duration=duration,
+            query_count=len(queries),
+            query_time=sum(query['time'] for query in queries),
+        )
+
+
+class RequestProfile(models.Model):
+    """Profile of one request, captured on demand by staff."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+    )
+    name = models.CharField(max_length=32, unique=True, editable=False)  # Stem of the files in PROFILE_DIR   # noqa: E501
+    created_at = models.DateTimeField(auto_now_add=True)
+    method = models.CharField(max_length=7)
+    path = models.TextField()                                       # Path and query string                 # noqa: E501
+    route = models.TextField(blank=True)                            # URL name, e.g. component-detail       # noqa: E501
+    status_code = models.PositiveSmallIntegerField()
+    duration = models.FloatField()                                  # Seconds, under the profiler           # noqa: E501
+    query_count = models.PositiveIntegerField()
+    query_time = models.FloatField()                                # Seconds spent in queries              # noqa: E501
+
+    objects = RequestProfileManager()
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.method} {self.path}'
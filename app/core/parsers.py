@@ -0,0 +1,36 @@
+"""
+Fast parsers for the REST APIs.
+
+See `core.renderers` for the optional dependencies.
+"""
+
+from rest_framework.exceptions import ParseError                    # type: ignore  # noqa: E501
+from rest_framework.parsers import BaseParser, JSONParser           # type: ignore  # noqa: E501
+
+from core.renderers import msgpack, orjson
+
+
+class ORJSONParser(JSONParser):
+    """Parse JSON with orjson, falling back to the standard library."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parse the incoming JSON bytes."""
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackParser(BaseParser):
+    """Parse MessagePack request bodies."""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """Parse the incoming MessagePack bytes."""
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
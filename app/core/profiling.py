@@ -0,0 +1,83 @@
+"""
+On-demand profiling of single requests.
+
+A profile holds two files in PROFILE_DIR: `<name>.prof`, the cProfile
+statistics (open with snakeviz, or `flameprof` for a flamegraph), and
+`<name>.sql.json`, every query the request executed with its duration.
+"""
+
+import cProfile
+import json
+import marshal
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+
+PROFILE_SUFFIX = '.prof'
+QUERIES_SUFFIX = '.sql.json'
+
+
+class QueryRecorder:
+    """Database execute wrapper recording every query with its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'params': repr(params),
+                'many': many,
+                'time': time.perf_counter() - start,
+            })
+
+
+def profile_request(request, get_response):
+    """Return the response with its profiler, queries and duration."""
+    profiler = cProfile.Profile()
+    recorder = QueryRecorder()
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+
+    return response, profiler, recorder.queries, time.perf_counter() - start
+
+
+def profile_path(name, suffix):
+    """Return the path of a profile file."""
+    return Path(settings.PROFILE_DIR) / f'{name}{suffix}'
+
+
+def write_profile(name, profiler, queries):
+    """Write the statistics and queries of a profile to PROFILE_DIR."""
+    Path(settings.PROFILE_DIR).mkdir(parents=True, exist_ok=True)
+
+    # Same format as Profile.dump_stats(), readable by pstats.
+    profiler.create_stats()
+    profile_path(name, PROFILE_SUFFIX).write_bytes(
+        marshal.dumps(profiler.stats)
+    )
+    profile_path(name, QUERIES_SUFFIX).write_text(
+        json.dumps(queries, indent=2)
+    )
+
+
+def delete_profile(name):
+    """Delete the files of a profile."""
+    for suffix in (PROFILE_SUFFIX, QUERIES_SUFFIX):
+        profile_path(name, suffix).unlink(missing_ok=True)
@@ -0,0 +1,76 @@
+"""
+Fast renderers for the REST APIs.
+
+orjson and msgpack are optional. Without orjson, JSON is rendered with
+DRF's encoder, and MessagePack is only offered when msgpack is installed.
+"""
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer     # type: ignore  # noqa: E501
+from rest_framework.utils.encoders import JSONEncoder               # type: ignore  # noqa: E501
+
+from core.metrics import measure
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Converts the types orjson and msgpack do not know, such as Decimal.
+encode_default = JSONEncoder().default
+
+
+def json_dumps(data, indent=False):
+    """Return the data encoded as compact JSON bytes."""
+    if orjson is None:
+        return JSONRenderer().render(data, renderer_context={
+            'indent': 2 if indent else None,
+        })
+
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, default=encode_default, option=option)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Render JSON with orjson, falling back to DRF's encoder."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render the data into JSON bytes."""
+        if data is None:
+            return b''
+
+        with measure('render'):
+            if orjson is None:
+                return super().render(
+                    data, accepted_media_type, renderer_context,
+                )
+
+            renderer_context = renderer_context or {}
+            indent = self.get_indent(accepted_media_type, renderer_context)
+
+            return json_dumps(data, indent=bool(indent))
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Render MessagePack, a compact binary form of the JSON data model."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render the data into MessagePack bytes."""
+        if data is None:
+            return b''
+
+        with measure('render'):
+            return msgpack.packb(
+                data, default=encode_default, use_bin_type=True,
+            )
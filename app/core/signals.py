@@ -0,0 +1,69 @@
+"""
+Signal handlers for the core models.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token     # type: ignore
+
+from core import caching, profiling
+from core.authentication import token_cache
+from core.models import Component, MassProperties, RequestProfile
+
+
+@receiver(post_delete, sender=Component)
+def reroot_orphaned_components(sender, instance, **kwargs):
+    """Make the subtrees left behind by a deleted component new roots."""
+    if instance.path:
+        Component.objects.reroot_descendants(instance.path)
+
+
+@receiver([post_save, post_delete], sender=Component)
+@receiver([post_save, post_delete], sender=MassProperties)
+def invalidate_cached_responses(sender, instance, **kwargs):
+    """Invalidate the cached responses of the owner of a changed row."""
+    caching.invalidate_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Component.mass_properties.through)
+def invalidate_cached_responses_on_links(sender, instance, action, **kwargs):
+    """Invalidate cached responses when mass properties are relinked."""
+    if action.startswith('post_'):
+        caching.invalidate_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Component.mass_properties.through)
+def bump_revision_on_links(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Bump the revision of components whose mass properties change."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        components = Component.objects.filter(pk=instance.pk)
+    elif pk_set:
+        components = Component.objects.filter(pk__in=pk_set)
+    else:
+        return
+    components.update(revision=F('revision') + 1)
+
+
+@receiver(post_delete, sender=Token)
+def forget_revoked_token(sender, instance, **kwargs):
+    """Stop accepting a deleted token from the cache of this process."""
+    token_cache.discard(instance.key)
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def forget_changed_user_tokens(sender, instance, **kwargs):
+    """Reload changed users, e.g. deactivated ones, on their next request."""
+    token_cache.discard_where(lambda entry: entry[0].pk == instance.pk)
+
+
+@receiver(post_delete, sender=RequestProfile)
+def delete_profile_files(sender, instance, **kwargs):
+    """Delete the files of a deleted request profile."""
+    profiling.delete_profile(instance.name)
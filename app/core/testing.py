@@ -0,0 +1,188 @@
+"""
+Test utilities guarding the query count and latency of API endpoints.
+
+`ScalingTestMixin.assertScales` grows the data behind an endpoint and
+asserts the endpoint runs the same number of queries at every size, so
+N+1 regressions fail the tests. Wall-clock time depends on the machine,
+so time budgets are only checked with CHECK_PERF_BUDGETS=1: the time of
+a request at the largest size must then stay within the budget recorded
+for the endpoint in perf_budgets.json. Run the tests with
+RECORD_PERF_BUDGETS=1 to record budgets, and set PERF_BUDGET_FACTOR to
+loosen them on slow machines.
+"""
+
+import itertools
+import json
+import os
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Component, MassProperties
+
+
+# Numbers of items behind an endpoint at which its queries are counted.
+SIZES = (1, 10, 50)
+
+BUDGET_FILE = Path(__file__).resolve().parent / 'perf_budgets.json'
+
+# Recorded budgets are the measured time times HEADROOM, at least
+# MIN_BUDGET seconds, so that they hold on a loaded machine.
+HEADROOM = 4
+MIN_BUDGET = 0.1
+
+_refs = itertools.count()
+_budget_lock = threading.Lock()
+
+
+def create_components(user, count, parent=None, mass_properties=2,
+                      chain=False, **fields):
+    """Create `count` components below a parent and return them.
+
+    Components are siblings, or nested one below the other with `chain`.
+    Each gets its own `mass_properties` mass properties. `fields`, e.g.
+    `name` or `skeleton`, override the generated component fields.
+    """
+    items = []
+    for i in range(count):
+        ref = str(next(_refs))
+        items.append({
+            'ref': ref,
+            'name': f'Component {ref}',
+            'version': '1.0',
+            'type': 'PART',
+            'level': 0 if parent is None else parent.level + 1,
+            'index': i,
+            'skeleton': 'Skeleton Model',
+            'parent': None if parent is None else parent.id,
+            'mass_properties': [
+                {'csys_name': f'CSYS_{ref}_{j}', 'mass': [1.0, 2.0, 3.0]}
+                for j in range(mass_properties)
+            ],
+            **fields,
+        })
+
+    levels = [items]
+    if chain:
+        for i, item in enumerate(items[1:], 1):
+            item.update(level=item['level'] + i, index=0, parent=None,
+                        parent_ref=items[i - 1]['ref'])
+        levels = [[item] for item in items]
+
+    components = Component.objects.create_tree(user, levels)
+    return [components[item['ref']] for item in items]
+
+
+def create_mass_properties(user, count):
+    """Create `count` distinct mass properties and return them."""
+    return [
+        MassProperties.objects.create(
+            user=user,
+            csys_name=f'CSYS_{next(_refs)}',
+            mass=[1.0, 2.0, 3.0],
+        )
+        for _ in range(count)
+    ]
+
+
+def budgets_enabled():
+    """Return whether time budgets are checked or recorded."""
+    return (
+        os.environ.get('CHECK_PERF_BUDGETS') == '1'
+        or os.environ.get('RECORD_PERF_BUDGETS') == '1'
+    )
+
+
+def load_budgets():
+    """Return the recorded time budgets in seconds by endpoint."""
+    if not BUDGET_FILE.exists():
+        return {}
+
+    return json.loads(BUDGET_FILE.read_text())
+
+
+def record_budget(name, seconds):
+    """Record the time budget of an endpoint from a measured time."""
+    with _budget_lock:
+        budgets = load_budgets()
+        budgets[name] = round(max(seconds * HEADROOM, MIN_BUDGET), 3)
+        BUDGET_FILE.write_text(
+            json.dumps(dict(sorted(budgets.items())), indent=2) + '\n'
+        )
+
+
+class ScalingTestMixin:
+    """Assertions that an endpoint scales with the data behind it."""
+
+    def assertConstantQueries(self, request, grow=None, sizes=SIZES):
+        """Assert `request(size)` runs as many queries at every size.
+
+        Before each request, `grow(count)` adds `count` items so that
+        `size` items exist. Return the response at the largest size.
+        """
+        counts = {}
+        existing = 0
+        for size in sizes:
+            if grow is not None:
+                grow(size - existing)
+                existing = size
+            with CaptureQueriesContext(connection) as queries:
+                response = request(size)
+            counts[size] = len(queries)
+
+        if len(set(counts.values())) > 1:
+            self.fail(
+                f'Query count grows with the data: {counts}\n' +
+                '\n'.join(query['sql'] for query in queries.captured_queries)
+            )
+
+        return response
+
+    def assertWithinBudget(self, name, request, size=SIZES[-1], repeat=3):
+        """Assert the median time of `request(size)` is within budget.
+
+        Does nothing unless CHECK_PERF_BUDGETS=1 or RECORD_PERF_BUDGETS=1.
+        """
+        if not budgets_enabled():
+            return
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            request(size)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+
+        if os.environ.get('RECORD_PERF_BUDGETS') == '1':
+            record_budget(name, median)
+            return
+
+        budget = load_budgets().get(name)
+        if budget is None:
+            self.fail(
+                f'No time budget recorded for {name!r}; run the tests '
+                f'with RECORD_PERF_BUDGETS=1 to record it.'
+            )
+
+        budget *= float(os.environ.get('PERF_BUDGET_FACTOR', 1))
+        self.assertLessEqual(
+            median, budget,
+            f'{name} took {median:.3f}s, over its {budget:.3f}s budget',
+        )
+
+    def assertScales(self, name, request, grow=None, sizes=SIZES):
+        """Assert an endpoint has a flat query count and stays in budget.
+
+        The budget is checked as in assertWithinBudget().
+
+        See assertConstantQueries() for `request` and `grow`. Return the
+        response at the largest size.
+        """
+        response = self.assertConstantQueries(request, grow, sizes)
+        self.assertWithinBudget(name, request, sizes[-1])
+
+        return response
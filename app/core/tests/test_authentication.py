@@ -0,0 +1,157 @@
+"""
+Tests for cached token authentication.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status                   # type: ignore
+from rest_framework.authtoken.models import Token   # type: ignore
+from rest_framework.test import APIClient           # type: ignore
+
+from core.authentication import TTLCache, token_cache
+
+
+ME_URL = reverse('user:me')
+COMPONENT_URL = reverse('component:component-list')
+
+
+class TTLCacheTests(SimpleTestCase):
+    """Test the bounded cache of token lookups."""
+
+    def setUp(self):
+        self.now = 0
+        self.cache = TTLCache(2, 60, clock=lambda: self.now)
+
+    def test_entries_expire(self):
+        """Test entries are forgotten after the timeout."""
+        self.cache.set('a', 1)
+
+        self.now = 59
+        self.assertEqual(self.cache.get('a'), 1)
+        self.now = 60
+        self.assertIsNone(self.cache.get('a'))
+
+    def test_least_recently_used_evicted(self):
+        """Test the least recently used entry is evicted when full."""
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+
+        self.cache.set('c', 3)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), 1)
+
+    def test_discard_where(self):
+        """Test removing the entries matching a predicate."""
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+
+        self.cache.discard_where(lambda value: value == 1)
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.get('b'), 2)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test authenticating API requests with cached tokens."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            name='Test name',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def token_queries(self, url=ME_URL):
+        """Return the token lookups run by a request."""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [q for q in queries if 'authtoken_token' in q['sql']]
+
+    def test_lookup_is_cached(self):
+        """Test only the first request looks the token up."""
+        self.assertEqual(len(self.token_queries()), 1)
+        self.assertEqual(self.token_queries(COMPONENT_URL), [])
+
+    def test_invalid_token_rejected(self):
+        """Test an unknown token is rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoked_token_rejected(self):
+        """Test a deleted token stops working although it was cached."""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test a deactivated user is rejected although it was cached."""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_changes_are_reloaded(self):
+        """Test changes to the user are seen on the next request."""
+        self.client.get(ME_URL)
+
+        self.user.name = 'Renamed'
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.data['name'], 'Renamed')
+
+    def test_expired_token_rejected(self):
+        """Test a token older than the expiry is rejected."""
+        Token.objects.filter(key=self.token.key).update(
+            created=timezone.now() - timedelta(days=31),
+        )
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('expired', str(res.data['detail']))
+
+    def test_cached_token_expires(self):
+        """Test a cached token is rejected once it expires."""
+        self.client.get(ME_URL)
+
+        with override_settings(TOKEN_EXPIRY=timedelta(0)):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_EXPIRY=None)
+    def test_tokens_without_expiry(self):
+        """Test tokens never expire without TOKEN_EXPIRY."""
+        Token.objects.filter(key=self.token.key).update(
+            created=timezone.now() - timedelta(days=3650),
+        )
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
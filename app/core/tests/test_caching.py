@@ -0,0 +1,56 @@
+"""
+Tests for the versions keying the cache of API responses.
+"""
+
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from core import caching
+
+
+class SharedVersionTests(TestCase):
+    """Test versions kept in a cache shared by several workers."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'responses': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': directory.name,
+            },
+        })
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # One cache instance per worker, as each process opens its own.
+        self.workers = [caches.create_connection('responses')
+                        for _ in range(2)]
+
+    def worker(self, index):
+        """Run the caching functions through one worker's cache."""
+        return patch('core.caching.get_cache',
+                     return_value=self.workers[index])
+
+    def test_invalidation_seen_by_other_workers(self):
+        """Test a version bumped by one worker changes another's keys."""
+        with self.worker(1):
+            version = caching.get_version(1)
+            other = caching.get_version(2)
+            key = caching.response_key(1, '/api/component/')
+
+        with self.worker(0):
+            caching.invalidate_user(1)
+
+        with self.worker(1):
+            self.assertGreater(caching.get_version(1), version)
+            self.assertNotEqual(
+                caching.response_key(1, '/api/component/'), key,
+            )
+            self.assertEqual(caching.get_version(2), other)
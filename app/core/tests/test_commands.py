@@ -2,13 +2,21 @@
 Test custom Django management commands.
 """
 
+import json
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
 from psycopg2 import OperationalError as Psycopg2Error
 
-from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
 from django.db import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+
+from core.management.commands.benchmark_api import compare
+from core.models import Component
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -33,3 +41,106 @@ class CommandTests(SimpleTestCase):
 
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=['default'])
+
+
+class GenerateAssemblyCommandTests(TestCase):
+    """Test generating synthetic assemblies."""
+
+    def test_generate_assembly(self):
+        """Test generating a tree of the requested shape and density."""
+        call_command(
+            'generate_assembly',
+            'bench@example.com',
+            size=200,
+            depth=5,
+            fanout=10,
+            density=1.5,
+            seed=1,
+            stdout=StringIO(),
+        )
+
+        user = get_user_model().objects.get(email='bench@example.com')
+        components = Component.objects.filter(user=user)
+        self.assertEqual(components.count(), 200)
+        self.assertEqual(components.filter(parent__isnull=True).count(), 1)
+        self.assertLessEqual(max(c.level for c in components), 4)
+        for component in components:
+            self.assertEqual(component.path.count('/') - 2, component.level)
+        links = Component.mass_properties.through.objects.filter(
+            component__user=user,
+        ).count()
+        self.assertAlmostEqual(links / 200, 1.5, delta=0.3)
+
+    def test_generate_assembly_invalid_size(self):
+        """Test generating an empty tree raises an error."""
+        with self.assertRaises(CommandError):
+            call_command('generate_assembly', 'bench@example.com', size=0)
+
+
+class BenchmarkCommandTests(TestCase):
+    """Test benchmarking the component APIs."""
+
+    def test_benchmark_writes_results(self):
+        """Test a benchmark run reports every scenario and leaves no data."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command(
+                'benchmark_api',
+                size=30,
+                iterations=2,
+                warmup=1,
+                output=output,
+            )
+            with open(output) as file:
+                results = json.load(file)
+
+        self.assertEqual(results['components'], 30)
+        self.assertEqual(
+            set(results['scenarios']),
+            {'list', 'detail', 'subtree_cached', 'create', 'update',
+             'rollup'},
+        )
+        for name, scenario in results['scenarios'].items():
+            self.assertEqual(scenario['iterations'], 2)
+            if name == 'subtree_cached':
+                self.assertEqual(scenario['queries'], 0)
+            else:
+                self.assertGreater(scenario['queries'], 0)
+            self.assertLessEqual(scenario['p50_ms'], scenario['p99_ms'])
+        self.assertFalse(Component.objects.exists())
+
+    def test_compare_reports_regressions(self):
+        """Test comparing against a baseline flags slower scenarios."""
+        baseline = {'scenarios': {
+            'list': {'p50_ms': 10.0, 'queries': 2},
+            'detail': {'p50_ms': 5.0, 'queries': 2},
+        }}
+        results = {'scenarios': {
+            'list': {'p50_ms': 11.0, 'queries': 2},
+            'detail': {'p50_ms': 7.0, 'queries': 3},
+            'create': {'p50_ms': 9.0, 'queries': 10},
+        }}
+
+        regressions = compare(results, baseline, tolerance=0.2)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(all(r.startswith('detail') for r in regressions))
+
+
+class BenchmarkRenderersCommandTests(TestCase):
+    """Test benchmarking the renderers and parsers."""
+
+    def test_benchmark_renderers(self):
+        """Test every available format is compared with stdlib JSON."""
+        out = StringIO()
+
+        call_command('benchmark_renderers', size=20, iterations=2, stdout=out)
+
+        results = json.loads(out.getvalue())
+        self.assertEqual(results['components'], 20)
+        self.assertEqual(
+            set(results['formats']),
+            {'json', 'orjson', 'msgpack'},
+        )
+        self.assertEqual(results['formats']['json']['encode_speedup'], 1.0)
+        self.assertFalse(Component.objects.exists())
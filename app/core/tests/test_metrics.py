@@ -0,0 +1,136 @@
+"""
+Tests for the request metrics.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status             # type: ignore
+from rest_framework.test import APIClient     # type: ignore
+
+from core import metrics
+from core.middleware import MetricsMiddleware
+
+
+METRICS_URL = reverse('metrics')
+COMPONENT_URL = reverse('component:component-list')
+
+
+class RegistryTests(SimpleTestCase):
+    """Test recording and rendering histograms."""
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_render_cumulative_buckets(self):
+        """Test histograms render cumulative buckets, sum and count."""
+        for latency in (0.003, 0.003, 0.2):
+            self.registry.record('component-list', 'GET', 200, {
+                'latency': latency,
+            })
+        self.registry.record('component-list', 'GET', 404, {})
+
+        text = self.registry.render()
+
+        labels = 'route="component-list",method="GET"'
+        self.assertIn(
+            f'wms_request_latency_seconds_bucket{{{labels},le="0.0025"}} 0',
+            text,
+        )
+        self.assertIn(
+            f'wms_request_latency_seconds_bucket{{{labels},le="0.005"}} 2',
+            text,
+        )
+        self.assertIn(
+            f'wms_request_latency_seconds_bucket{{{labels},le="+Inf"}} 3',
+            text,
+        )
+        self.assertIn(f'wms_request_latency_seconds_count{{{labels}}} 3', text)
+        self.assertIn(
+            f'wms_requests_total{{{labels},status="404"}} 1',
+            text,
+        )
+
+    def test_measure_outside_request(self):
+        """Test measuring outside a recorded request does nothing."""
+        with metrics.measure('serialize'):
+            pass
+
+    def test_measure_adds_to_current_request(self):
+        """Test measured blocks add up per phase."""
+        stats, token = metrics.start_request()
+        try:
+            with metrics.measure('render'):
+                pass
+            with metrics.measure('render'):
+                pass
+        finally:
+            metrics.finish_request(token)
+
+        self.assertGreater(stats['render'], 0)
+        self.assertEqual(stats['serialize'], 0)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_middleware_disabled(self):
+        """Test the middleware removes itself when metrics are disabled."""
+        with self.assertRaises(MiddlewareNotUsed):
+            MetricsMiddleware(lambda request: None)
+
+
+class MetricsAPITests(TestCase):
+    """Test recording requests and exposing the metrics."""
+
+    def setUp(self):
+        metrics.registry.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+
+    def histograms(self, route, method='GET'):
+        """Return the recorded histograms of a route."""
+        return metrics.registry.histograms[(route, method)]
+
+    def test_request_metrics_recorded_per_route(self):
+        """Test a request records its queries, timings and size."""
+        self.client.force_authenticate(self.user)
+
+        res = self.client.get(COMPONENT_URL)
+
+        histograms = self.histograms('component-list')
+        self.assertEqual(histograms['latency'].counts[-1], 0)
+        self.assertGreater(histograms['latency'].sum, 0)
+        self.assertGreater(histograms['queries'].sum, 0)
+        self.assertGreater(histograms['db'].sum, 0)
+        self.assertGreater(histograms['serialize'].sum, 0)
+        self.assertGreater(histograms['render'].sum, 0)
+        self.assertEqual(histograms['response_size'].sum, len(res.content))
+
+    def test_metrics_require_admin(self):
+        """Test only admins can read the metrics."""
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(self.user)
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_prometheus_text(self):
+        """Test admins read the metrics in the Prometheus text format."""
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        self.client.get(COMPONENT_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        self.assertIn(
+            'wms_request_queries_total_count'
+            '{route="component-list",method="GET"} 1',
+            res.content.decode(),
+        )
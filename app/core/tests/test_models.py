@@ -4,6 +4,7 @@ Tests for models.
 
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db.models import Avg, Sum
 
 from core import models
 
@@ -84,3 +85,72 @@ class ModelTests(TestCase):
         )
 
         self.assertEqual(str(mass_prop), mass_prop.csys_name)
+
+    def test_mass_properties_content_hash(self):
+        """Test the content hash follows the mass properties' values."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'testpass@123'
+        )
+
+        mass_prop = models.MassProperties.objects.create(
+            user=user,
+            csys_name='DEFAULT'
+        )
+        original_hash = mass_prop.content_hash
+        mass_prop.mass = [1.0, 2.0, 3.0]
+        mass_prop.save()
+
+        self.assertEqual(len(original_hash), 64)
+        self.assertNotEqual(mass_prop.content_hash, original_hash)
+        mass_prop.mass = [1, 2, 3]
+        self.assertEqual(
+            mass_prop.compute_content_hash(),
+            mass_prop.content_hash,
+        )
+
+    def test_get_or_create_many_mass_properties(self):
+        """Test getting or creating mass properties in one batch."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'testpass@123'
+        )
+        existing = models.MassProperties.objects.create(
+            user=user,
+            csys_name='DEFAULT'
+        )
+
+        with self.assertNumQueries(2):
+            mass_props = models.MassProperties.objects.get_or_create_many(
+                user,
+                [
+                    {'csys_name': 'DEFAULT'},
+                    {'csys_name': 'NEW'},
+                    {'csys_name': 'NEW'},
+                ]
+            )
+
+        self.assertEqual(mass_props[0].id, existing.id)
+        self.assertIsNotNone(mass_props[1].id)
+        self.assertEqual(mass_props[1].id, mass_props[2].id)
+        self.assertEqual(models.MassProperties.objects.count(), 2)
+
+    def test_aggregate_mass_properties_in_database(self):
+        """Test mass property vectors are aggregated as numbers in SQL."""
+        user = get_user_model().objects.create_user(
+            'test@example.com',
+            'testpass@123'
+        )
+        for i, mass in enumerate([[1.0, 2.0, 3.0], [3.0, 4.0, 5.0]]):
+            models.MassProperties.objects.create(
+                user=user,
+                csys_name=f'CSYS_{i}',
+                mass=mass,
+            )
+
+        totals = models.MassProperties.objects.aggregate(
+            likely=Sum('mass__1'),
+            usl=Avg('mass__2'),
+        )
+
+        self.assertEqual(totals, {'likely': 6.0, 'usl': 4.0})
@@ -0,0 +1,171 @@
+"""
+Tests for on-demand request profiling.
+"""
+
+import json
+import pstats
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token     # type: ignore
+from rest_framework.test import APIClient             # type: ignore
+
+from core import profiling
+from core.models import RequestProfile
+
+
+COMPONENT_URL = reverse('component:component-list')
+
+
+def download_url(profile_id, kind):
+    """Create and return a profile download URL."""
+    return reverse(
+        'admin:core_requestprofile_download',
+        args=[profile_id, kind],
+    )
+
+
+class ProfilingTests(TestCase):
+    """Test capturing, listing and downloading request profiles."""
+
+    def setUp(self):
+        profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(profile_dir.cleanup)
+        settings = self.settings(PROFILE_DIR=profile_dir.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_user(
+            email='staff@example.com',
+            password='testpass123',
+            is_staff=True,
+        )
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+        )
+
+    def authenticate(self, user):
+        """Send the user's API token with the following requests."""
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def capture(self):
+        """Profile a component list request of a staff user."""
+        self.authenticate(self.staff)
+        res = self.client.get(COMPONENT_URL, HTTP_X_PROFILE='1')
+        return res, RequestProfile.objects.get(id=res['X-Profile-Id'])
+
+    def test_staff_request_profiled(self):
+        """Test a staff request with the header writes a profile."""
+        res, profile = self.capture()
+
+        self.assertEqual(profile.user, self.staff)
+        self.assertEqual(profile.route, 'component-list')
+        self.assertEqual(profile.status_code, res.status_code)
+        self.assertGreater(profile.query_count, 0)
+
+        path = profiling.profile_path(profile.name, profiling.PROFILE_SUFFIX)
+        stats = pstats.Stats(str(path))
+        self.assertGreater(stats.total_calls, 0)
+
+        path = profiling.profile_path(profile.name, profiling.QUERIES_SUFFIX)
+        queries = json.loads(path.read_text())
+        self.assertEqual(len(queries), profile.query_count)
+        self.assertIn('core_component', ' '.join(q['sql'] for q in queries))
+
+    def test_request_without_header_not_profiled(self):
+        """Test requests are not profiled without the header."""
+        self.authenticate(self.staff)
+
+        res = self.client.get(COMPONENT_URL)
+
+        self.assertNotIn('X-Profile-Id', res)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    @patch('core.profiling.profile_request')
+    def test_non_staff_request_not_profiled(self, patched_profile):
+        """Test the header is ignored for users who are not staff."""
+        self.authenticate(self.user)
+
+        res = self.client.get(COMPONENT_URL, HTTP_X_PROFILE='1')
+
+        self.assertNotIn('X-Profile-Id', res)
+        self.assertFalse(RequestProfile.objects.exists())
+        patched_profile.assert_not_called()
+
+    @patch('core.profiling.profile_request')
+    def test_anonymous_request_not_profiled(self, patched_profile):
+        """Test requests without or with invalid tokens are not profiled."""
+        for client in (self.client, APIClient(HTTP_AUTHORIZATION='Token x')):
+            res = client.get(COMPONENT_URL, HTTP_X_PROFILE='1')
+
+            self.assertNotIn('X-Profile-Id', res)
+        patched_profile.assert_not_called()
+
+    def test_unwritable_profile_dir_returns_response(self):
+        """Test a profile that cannot be written still returns the response."""
+        self.authenticate(self.staff)
+
+        with tempfile.NamedTemporaryFile() as file, \
+                self.settings(PROFILE_DIR=f'{file.name}/profiles'), \
+                self.assertLogs('core.middleware', 'ERROR'):
+            res = self.client.get(COMPONENT_URL, HTTP_X_PROFILE='1')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('X-Profile-Id', res)
+        self.assertFalse(RequestProfile.objects.exists())
+
+    def test_staff_session_request_profiled(self):
+        """Test requests of staff logged in to the admin are profiled."""
+        client = Client()
+        client.force_login(self.staff)
+
+        res = client.get(
+            reverse('admin:core_requestprofile_changelist'),
+            HTTP_X_PROFILE='1',
+        )
+
+        profile = RequestProfile.objects.get(id=res['X-Profile-Id'])
+        self.assertEqual(profile.user, self.staff)
+
+    def test_admin_list_and_download(self):
+        """Test staff list and download profiles in the admin."""
+        _, profile = self.capture()
+        client = Client()
+        client.force_login(self.staff)
+
+        res = client.get(reverse('admin:core_requestprofile_changelist'))
+        self.assertContains(res, download_url(profile.id, 'profile'))
+
+        res = client.get(download_url(profile.id, 'queries'))
+        self.assertIn('attachment', res['Content-Disposition'])
+        queries = json.loads(b''.join(res.streaming_content))
+        self.assertEqual(len(queries), profile.query_count)
+
+        res = client.get(download_url(profile.id, 'other'))
+        self.assertEqual(res.status_code, 404)
+
+    def test_admin_requires_staff(self):
+        """Test users who are not staff cannot download profiles."""
+        _, profile = self.capture()
+        client = Client()
+        client.force_login(self.user)
+
+        res = client.get(download_url(profile.id, 'profile'))
+
+        self.assertEqual(res.status_code, 302)
+
+    def test_delete_removes_files(self):
+        """Test deleting a profile deletes its files."""
+        _, profile = self.capture()
+        path = profiling.profile_path(profile.name, profiling.PROFILE_SUFFIX)
+
+        profile.delete()
+
+        self.assertFalse(path.exists())
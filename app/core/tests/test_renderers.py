@@ -0,0 +1,102 @@
+"""
+Tests for the REST API renderers and parsers.
+"""
+
+import io
+import json
+from decimal import Decimal
+from unittest.mock import patch
+
+import msgpack
+
+from django.test import SimpleTestCase
+
+from rest_framework.exceptions import ParseError        # type: ignore
+from rest_framework.renderers import JSONRenderer       # type: ignore
+
+from core import parsers, renderers
+
+
+PAYLOAD = [
+    {
+        'id': 1,
+        'name': 'Bracket é',
+        'mass': '[1.0, 2.5, 3.0]',
+        'parent': None,
+        'density': Decimal('7.85'),
+        'mass_properties': [{'id': 4, 'is_csys_local': True}],
+    },
+]
+
+
+class RendererTests(SimpleTestCase):
+    """Test rendering API responses."""
+
+    def test_orjson_renders_same_data_as_json(self):
+        """Test orjson output decodes to the same data as DRF's JSON."""
+        content = renderers.ORJSONRenderer().render(PAYLOAD)
+
+        self.assertEqual(
+            json.loads(content),
+            json.loads(JSONRenderer().render(PAYLOAD)),
+        )
+        self.assertEqual(json.loads(content)[0]['density'], 7.85)
+
+    def test_orjson_renders_none_as_empty(self):
+        """Test rendering no data returns an empty body."""
+        self.assertEqual(renderers.ORJSONRenderer().render(None), b'')
+
+    def test_orjson_indents_on_request(self):
+        """Test an indent in the accepted media type indents the output."""
+        content = renderers.ORJSONRenderer().render(
+            {'id': 1},
+            accepted_media_type='application/json; indent=4',
+        )
+
+        self.assertIn(b'\n  "id"', content)
+
+    @patch('core.renderers.orjson', None)
+    def test_json_fallback_without_orjson(self):
+        """Test JSON is rendered by DRF when orjson is not installed."""
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(PAYLOAD),
+            JSONRenderer().render(PAYLOAD),
+        )
+
+    def test_msgpack_round_trip(self):
+        """Test MessagePack output parses back to the JSON data."""
+        content = renderers.MessagePackRenderer().render(PAYLOAD)
+
+        self.assertEqual(
+            parsers.MessagePackParser().parse(io.BytesIO(content)),
+            json.loads(JSONRenderer().render(PAYLOAD)),
+        )
+
+
+class ParserTests(SimpleTestCase):
+    """Test parsing API requests."""
+
+    def test_orjson_parses_json(self):
+        """Test parsing JSON request bodies."""
+        data = parsers.ORJSONParser().parse(io.BytesIO(b'{"a": [1, 2.5]}'))
+
+        self.assertEqual(data, {'a': [1, 2.5]})
+
+    def test_orjson_invalid_json_error(self):
+        """Test parsing invalid JSON raises a parse error."""
+        with self.assertRaises(ParseError):
+            parsers.ORJSONParser().parse(io.BytesIO(b'{"a": NaN}'))
+
+    @patch('core.parsers.orjson', None)
+    def test_json_fallback_without_orjson(self):
+        """Test JSON is parsed by DRF when orjson is not installed."""
+        data = parsers.ORJSONParser().parse(io.BytesIO(b'[1]'))
+
+        self.assertEqual(data, [1])
+
+    def test_msgpack_invalid_body_error(self):
+        """Test parsing malformed MessagePack raises a parse error."""
+        content = msgpack.packb({'a': 1}) + b'\xc1'
+
+        with self.assertRaises(ParseError):
+            parsers.MessagePackParser().parse(io.BytesIO(content))
@@ -0,0 +1,70 @@
+"""
+Tests for the query count and latency test utilities.
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core import testing
+from core.models import Component
+
+
+class ScalingTestMixinTests(testing.ScalingTestMixin, TestCase):
+    """Test the scaling assertions catch regressions."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+
+    def grow(self, count):
+        testing.create_components(self.user, count)
+
+    def test_query_per_item_fails(self):
+        """Test running a query per item fails the assertion."""
+        def request(size):
+            for component in Component.objects.all():
+                component.mass_properties.count()
+
+        with self.assertRaisesMessage(AssertionError, 'Query count grows'):
+            self.assertConstantQueries(request, self.grow)
+
+    def test_constant_queries_pass(self):
+        """Test a fixed number of queries passes the assertion."""
+        self.assertConstantQueries(
+            lambda size: list(Component.objects.all()),
+            self.grow,
+        )
+
+        self.assertEqual(Component.objects.count(), testing.SIZES[-1])
+
+    @mock.patch.dict('os.environ', {'CHECK_PERF_BUDGETS': '1'})
+    def test_over_budget_fails(self):
+        """Test a request slower than its budget fails the assertion."""
+        with mock.patch.object(testing, 'load_budgets', return_value={
+            'endpoint': 0.0,
+        }), self.assertRaisesMessage(AssertionError, 'over its'):
+            self.assertWithinBudget('endpoint', lambda size: None)
+
+    @mock.patch.dict('os.environ', {'CHECK_PERF_BUDGETS': '1'})
+    def test_missing_budget_fails(self):
+        """Test an endpoint without a recorded budget fails."""
+        with mock.patch.object(testing, 'load_budgets', return_value={}), \
+                self.assertRaisesMessage(AssertionError, 'RECORD_PERF'):
+            self.assertWithinBudget('endpoint', lambda size: None)
+
+    @mock.patch.dict('os.environ', {
+        'CHECK_PERF_BUDGETS': '',
+        'RECORD_PERF_BUDGETS': '',
+    })
+    def test_budgets_opt_in(self):
+        """Test time budgets are not checked unless asked for."""
+        request = mock.Mock()
+
+        with mock.patch.object(testing, 'load_budgets', return_value={}):
+            self.assertWithinBudget('endpoint', request)
+
+        request.assert_not_called()
@@ -0,0 +1,29 @@
+"""
+Views for the core APIs.
+"""
+
+from django.http import HttpResponse
+
+from rest_framework.authentication import SessionAuthentication    # type: ignore  # noqa: E501
+from rest_framework.permissions import IsAdminUser                  # type: ignore  # noqa: E501
+from rest_framework.views import APIView                            # type: ignore  # noqa: E501
+
+from core.authentication import CachedTokenAuthentication
+from core.metrics import registry
+
+
+class MetricsView(APIView):
+    """Expose the request metrics of this process to Prometheus."""
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SessionAuthentication,
+    ]
+    permission_classes = [IsAdminUser]
+    schema = None
+
+    def get(self, request):
+        """Return the metrics in the Prometheus text format."""
+        return HttpResponse(
+            registry.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
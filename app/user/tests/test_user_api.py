@@ -2,17 +2,25 @@
 Tests for the user API.
 """
 
+from datetime import timedelta
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils import timezone
 
 from rest_framework.test import APIClient     # type: ignore
 from rest_framework import status             # type: ignore
+from rest_framework.authtoken.models import Token     # type: ignore
+
+from core import testing
 
 
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
 ME_URL = reverse('user:me')
+ROTATE_TOKEN_URL = reverse('user:token-rotate')
+REVOKE_TOKEN_URL = reverse('user:token-revoke')
 
 
 def create_user(**params):
@@ -20,7 +28,7 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
-class PublicUserApiTests(TestCase):
+class PublicUserApiTests(testing.ScalingTestMixin, TestCase):
     """Test the public features of the user API."""
 
     def setUp(self):
@@ -28,16 +36,22 @@ class PublicUserApiTests(TestCase):
 
     def test_create_user_success(self):
         """Test creating a new user with a valid payload is successful."""
-        payload = {
-            'email': 'test@example.com',
-            'password': 'testpass123',
-            'name': 'Test User',
-        }
-        res = self.client.post(CREATE_USER_URL, payload)
+        payloads = []
+
+        def create(size):
+            payloads.append({
+                'email': f'user{len(payloads)}@example.com',
+                'password': 'testpass123',
+                'name': 'Test User',
+            })
+            return self.client.post(CREATE_USER_URL, payloads[-1])
+
+        # Not a query per existing user.
+        res = self.assertScales('user-create', create)
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        user = get_user_model().objects.get(email=payload['email'])
-        self.assertTrue(user.check_password(payload['password']))
+        user = get_user_model().objects.get(email=payloads[-1]['email'])
+        self.assertTrue(user.check_password(payloads[-1]['password']))
         self.assertNotIn('password', res.data)
 
     def test_user_with_email_exists_error(self):
@@ -69,21 +83,70 @@ class PublicUserApiTests(TestCase):
 
     def test_create_token_for_user(self):
         """Test generates token for vaild credentials."""
-        user_details = {
-            'name': 'Test Name',
+        users = []
+
+        def grow(count):
+            for _ in range(count):
+                users.append(create_user(
+                    name='Test Name',
+                    email=f'user{len(users)}@example.com',
+                    password='test-user-pass123',
+                ))
+
+        # Not a query per existing user.
+        res = self.assertScales(
+            'user-token',
+            lambda size: self.client.post(TOKEN_URL, {
+                'email': users[-1].email,
+                'password': 'test-user-pass123',
+            }),
+            grow,
+        )
+
+        self.assertIn('token', res.data)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_create_token_replaces_expired_token(self):
+        """Test logging in with an expired token issues a new one."""
+        user = create_user(email='test@example.com', password='testpass123')
+        token = Token.objects.create(user=user)
+        Token.objects.filter(key=token.key).update(
+            created=timezone.now() - timedelta(days=31),
+        )
+
+        res = self.client.post(TOKEN_URL, {
             'email': 'test@example.com',
-            'password': 'test-user-pass123'
-        }
-        create_user(**user_details)
+            'password': 'testpass123',
+        })
 
-        payload = {
-            'email': user_details['email'],
-            'password': user_details['password'],
-        }
-        res = self.client.post(TOKEN_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['token'], token.key)
+        self.assertFalse(Token.objects.filter(key=token.key).exists())
+
+    def test_rotate_token(self):
+        """Test rotating a token revokes the old one."""
+        user = create_user(email='test@example.com', password='testpass123')
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        res = self.client.post(ROTATE_TOKEN_URL)
 
-        self.assertIn('token', res.data)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(Token.objects.get(user=user).key, res.data['token'])
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke_token(self):
+        """Test revoking a token stops it from working."""
+        user = create_user(email='test@example.com', password='testpass123')
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        res = self.client.post(REVOKE_TOKEN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_create_token_bad_credentials(self):
         """Test returns error for invaild credentials while generating token."""        # noqa: E501
@@ -116,7 +179,7 @@ class PublicUserApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateUserApiTests(TestCase):
+class PrivateUserApiTests(testing.ScalingTestMixin, TestCase):
     """Test API requests that require authentication."""
 
     def setUp(self):
@@ -131,7 +194,12 @@ class PrivateUserApiTests(TestCase):
 
     def test_retrieve_profile_success(self):
         """Test retrieving profile for logged in user."""
-        res = self.client.get(ME_URL)
+        # Not a query per component of the user.
+        res = self.assertScales(
+            'user-me',
+            lambda size: self.client.get(ME_URL),
+            lambda count: testing.create_components(self.user, count),
+        )
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, {
@@ -2,10 +2,18 @@
 Views for the user API.
 """
 
-from rest_framework import generics, authentication, permissions    # type: ignore  # noqa: E501
+from rest_framework import generics, permissions, status, views    # type: ignore  # noqa: E501
+from rest_framework.authtoken.models import Token                   # type: ignore  # noqa: E501
 from rest_framework.authtoken.views import ObtainAuthToken          # type: ignore  # noqa: E501
+from rest_framework.response import Response                        # type: ignore  # noqa: E501
 from rest_framework.settings import api_settings                    # type: ignore  # noqa: E501
 
+from core.authentication import (
+    CachedTokenAuthentication,
+    rotate_token,
+    token_expired,
+)
+
 from user.serializers import (
     UserSerializer,
     AuthTokenSerializer
@@ -22,11 +30,44 @@ class CreateTokenView(ObtainAuthToken):
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
+    def post(self, request, *args, **kwargs):
+        """Return the user's token, replacing it once it has expired."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, created = Token.objects.get_or_create(user=user)
+        if token_expired(token):
+            token = rotate_token(user)
+
+        return Response({'token': token.key})
+
+
+class RotateTokenView(views.APIView):
+    """Replace the token of the authenticated user with a new one."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        """Revoke the current token and return a new one."""
+        return Response({'token': rotate_token(request.user).key})
+
+
+class RevokeTokenView(views.APIView):
+    """Revoke the token of the authenticated user."""
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        """Delete the current token."""
+        Token.objects.filter(user=request.user).delete()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):